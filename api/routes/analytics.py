@@ -0,0 +1,120 @@
+"""
+Analytics endpoints for the dashboard. They only read the pre-aggregated
+rollups of the AnalyticsStore (src/analytics.py) through read-only
+connections, never the event log, and never the recommendation path's state.
+
+    GET /api/analytics/rollups?granularity=hour|day&since=<epoch>&until=<epoch>&category=Food
+    GET /api/analytics/charts/co2
+    GET /api/analytics/charts/cost
+    GET /api/analytics/charts/materials?top=10
+
+Exports stream the raw event log instead (same granularity/since/until/category
+filters; the range is widened to whole buckets, end exclusive, in both):
+
+    GET /api/analytics/export.xlsx
+    GET /api/analytics/export.pdf
+"""
+import os
+import tempfile
+from datetime import datetime, timezone
+
+from flask import Blueprint, Response, current_app, jsonify, request
+
+from dashboard.charts.co2_trends import co2_trends
+from dashboard.charts.cost_savings import cost_savings
+from dashboard.charts.material_usage import material_usage
+from dashboard.reports.export_excel import stream_xlsx
+from dashboard.reports.export_pdf import stream_pdf
+from src.request_control import SharedSlots
+
+analytics_bp = Blueprint("analytics", __name__)
+
+CHARTS = {
+    "co2": co2_trends,
+    "cost": cost_savings,
+    "materials": material_usage,
+}
+
+EXPORT_TYPES = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "pdf": "application/pdf",
+}
+# Character widths of the PDF table columns (id, ts, source, category, material_id, candidates, ...)
+PDF_WIDTHS = [10, 19, 9, 12, 11, 10, 14, 13, 11, 10]
+# Exports hold a worker thread for the whole download: at most this many at once across all
+# workers on the host, so a few large exports cannot take the pool away from recommendation traffic
+export_slots = SharedSlots(
+    os.getenv("EXPORT_SLOT_DIR", os.path.join(tempfile.gettempdir(), "ecopack-export-slots")),
+    int(os.getenv("EXPORT_MAX_CONCURRENT", 2)),
+    name="export"
+)
+
+
+def query_args():
+    since = request.args.get("since", type=float)
+    until = request.args.get("until", type=float)
+    return {
+        "granularity": request.args.get("granularity", "day"),
+        "since": since,
+        "until": until,
+        "category": request.args.get("category"),
+    }
+
+
+@analytics_bp.route("/analytics/rollups", methods=["GET"])
+def rollups():
+    store = current_app.extensions["analytics_store"]
+    try:
+        return jsonify({"rollups": store.rollup(**query_args())})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+
+@analytics_bp.route("/analytics/charts/<name>", methods=["GET"])
+def chart(name):
+    if name not in CHARTS:
+        return jsonify({"error": f"Unknown chart, expected one of {sorted(CHARTS)}"}), 404
+    store = current_app.extensions["analytics_store"]
+    options = query_args()
+    if name == "materials":
+        options["top"] = min(request.args.get("top", 10, type=int), 100)
+    try:
+        return jsonify(CHARTS[name](store, **options))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+
+def export_rows(events):
+    for row in events:
+        # openpyxl only writes naive datetimes; the timestamps are UTC
+        yield (row[0], datetime.fromtimestamp(row[1], timezone.utc).replace(tzinfo=None)) + tuple(row[2:])
+
+
+@analytics_bp.route("/analytics/export.<fmt>", methods=["GET"])
+def export(fmt):
+    """
+    Streams the matching events as a chunked download. Rows are read from the
+    store in batches and written out as they arrive (write-only workbook, or one
+    PDF page at a time), so memory stays flat however long the range is.
+    """
+    if fmt not in EXPORT_TYPES:
+        return jsonify({"error": f"Unknown export format, expected one of {sorted(EXPORT_TYPES)}"}), 404
+    store = current_app.extensions["analytics_store"]
+    options = query_args()
+    try:
+        events = store.iter_events(options["since"], options["until"], options["category"], options["granularity"])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    slot = export_slots.try_acquire()
+    if slot is None:
+        return jsonify({"error": "Too many exports in progress, retry later"}), 503, {"Retry-After": "30"}
+
+    rows = export_rows(events)
+    if fmt == "xlsx":
+        body = stream_xlsx(rows, store.export_columns)
+    else:
+        body = stream_pdf(rows, store.export_columns, PDF_WIDTHS, "EcoPackAI recommendation history")
+    response = Response(body, mimetype=EXPORT_TYPES[fmt],
+                        headers={"Content-Disposition": f'attachment; filename="recommendations.{fmt}"'})
+    response.call_on_close(lambda: export_slots.release(slot))
+    return response
@@ -1,40 +1,40 @@
 import pandas as pd
 from pathlib import Path
-from joblib import load
-from src.models.recommender import rank_materials
+from src.models.recommender import get_recommender, rank_materials
+from src.models.category_index import CategoryIndex
+from src.data_pipeline.data_loader import DatasetCache
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
-MODEL_PATH = BASE_DIR / "models_artifacts"
 DATA_PATH = BASE_DIR / "data" / "final" / "ml_dataset.csv"
+MATERIALS_PATH = BASE_DIR / "data" / "feature_engineered_materials.csv"
 
-cost_model = load(MODEL_PATH / "cost_model.pkl")
-co2_model = load(MODEL_PATH / "co2_model.pkl")
-scaler = load(MODEL_PATH / "scaler.pkl")
-encoders = load(MODEL_PATH / "encoders.pkl")
+# Same inference core (preprocessor + cost/CO2 models) as the Flask app
+recommender = get_recommender()
 
-CATEGORICAL_COLS = ["eco_alternative", "category"]
-NUMERICAL_COLS = ["weight_capacity_upto"]
+PREDICTION_COLS = ["material_id", "sustainability_score", "predicted_cost", "predicted_co2"]
 
-def preprocess_input(df):
-    for col in CATEGORICAL_COLS:
-        df[col] = encoders[col].transform(df[col])
+def prepare_dataset(df):
+    # Predictions are per material, so they are computed once per material and joined onto the map
+    materials = recommender.index_catalog(pd.read_csv(MATERIALS_PATH))
+    dataset = df.merge(materials[PREDICTION_COLS], on="material_id", how="left")
+    return CategoryIndex(dataset), dataset
 
-    df[NUMERICAL_COLS] = scaler.transform(df[NUMERICAL_COLS])
-    return df
+# ml_dataset.csv is parsed, indexed and scored once, and again only when it or the material data changes
+dataset_cache = DatasetCache(
+    DATA_PATH,
+    prepare=prepare_dataset,
+    version_fn=lambda: MATERIALS_PATH.stat().st_mtime_ns
+)
 
-def recommend_material(user_input, top_n=5):
-    dataset = pd.read_csv(DATA_PATH)
-
-    filtered = dataset[
-        (dataset["category"] == user_input["category"]) &
-        (dataset["weight_capacity_upto"] >= user_input["weight_capacity_upto"])
-    ].copy()
+def cache_stats():
+    return dataset_cache.stats()
 
-    filtered_processed = preprocess_input(filtered)
+def recommend_material(user_input, top_n=5):
+    index, dataset = dataset_cache.get().prepared
 
-    filtered["predicted_cost"] = cost_model.predict(filtered_processed)
-    filtered["predicted_co2"] = co2_model.predict(filtered_processed)
+    rows = index.lookup(user_input["category"], user_input["weight_capacity_upto"])
+    filtered = dataset.iloc[rows].copy()
 
     ranked = rank_materials(filtered, top_n)
 
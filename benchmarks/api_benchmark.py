@@ -0,0 +1,317 @@
+"""
+Load-test and benchmark suite for the recommendation hot paths.
+
+Scenarios (each reports throughput and p50/p95/p99 latency):
+    rank_materials     PackagingRecommender.rank_materials on a synthetic catalog (predict + rank)
+    recommend_material the category service path, mixed category/capacity requirements
+    flask_recommend    POST /api/recommend through the Flask test client, synthetic catalog
+    server_recommend   POST /api/recommend against a local multi-worker gunicorn server,
+                       driven by concurrent keep-alive clients
+
+Catalogs and requirement mixes are generated from fixed seeds, so runs are
+reproducible. The request mix repeats payloads, so the HTTP scenarios run with
+the response cache off (RESPONSE_CACHE_SIZE=0) and every request is computed;
+export RESPONSE_CACHE_SIZE to measure the cached path instead. Results can be saved as a JSON baseline; --check compares a run
+against it and exits 1 when a scenario's p95 latency or throughput regressed
+by more than --tolerance. Baselines are machine-specific: record them on the
+machine (CI runner) that checks against them.
+
+Run from the project root:
+    python benchmarks/api_benchmark.py                                   # quick profile
+    python benchmarks/api_benchmark.py --sizes 100 10000 1000000 --requests 500
+    python benchmarks/api_benchmark.py --save benchmarks/baseline.json
+    python benchmarks/api_benchmark.py --check benchmarks/baseline.json --tolerance 0.5
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR))
+sys.path.append(str(BASE_DIR / "benchmarks"))
+
+from filter_benchmark import make_queries
+
+CATALOG_PATH = BASE_DIR / "data" / "feature_engineered_materials.csv"
+PRODUCT_MAP_PATH = BASE_DIR / "data" / "final" / "ml_dataset.csv"
+
+SCENARIOS = ["rank_materials", "recommend_material", "flask_recommend", "server_recommend"]
+QUICK_SIZES = [100, 10_000]
+# Columns jittered when synthesizing materials, with their valid ranges
+NUMERIC_RANGES = {
+    "strength": (1, 10),
+    "weight_capacity_kg": (1, 30),
+    "biodegradability_score": (0, 100),
+    "recyclability_percent": (0, 100),
+    "co2_emission_score": (0.5, 6),
+    "cost_per_unit_inr": (5, 80),
+}
+
+
+def make_material_catalog(n, seed=42):
+    """
+    n synthetic materials with every column of feature_engineered_materials.csv:
+    real rows resampled with jittered attributes, so they are valid model input.
+    """
+    rng = np.random.default_rng(seed)
+    base = pd.read_csv(CATALOG_PATH)
+    df = base.iloc[rng.integers(0, len(base), n)].reset_index(drop=True)
+    for column, (lo, hi) in NUMERIC_RANGES.items():
+        jittered = df[column].to_numpy(dtype=float) * rng.uniform(0.8, 1.2, n)
+        df[column] = np.clip(np.round(jittered), lo, hi).astype(base[column].dtype)
+    df["water_resistance"] = rng.random(n) < 0.4
+    df["material_id"] = [f"MAT{i:07d}" for i in range(n)]
+    return df
+
+
+def make_category_queries(count, seed=7):
+    """Requirements drawn from the product map, so (almost) every query has candidates."""
+    rng = np.random.default_rng(seed)
+    products = pd.read_csv(PRODUCT_MAP_PATH)
+    products = products.iloc[rng.integers(0, len(products), count)]
+    return [
+        {"category": category, "weight_capacity_upto": int(rng.integers(1, capacity + 1))}
+        for category, capacity in zip(products["category"], products["weight_capacity_upto"])
+    ]
+
+
+def summarize(latencies, elapsed):
+    ms = np.asarray(latencies) * 1000
+    return {
+        "requests": len(ms),
+        "throughput_rps": round(len(ms) / elapsed, 1),
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+    }
+
+
+def time_calls(fn, payloads, warmup=5):
+    for payload in payloads[:warmup]:
+        fn(payload)
+    latencies = []
+    start = time.perf_counter()
+    for payload in payloads:
+        t0 = time.perf_counter()
+        fn(payload)
+        latencies.append(time.perf_counter() - t0)
+    return summarize(latencies, time.perf_counter() - start)
+
+
+def bench_rank_materials(size, n_requests):
+    from src.models.recommender import get_recommender
+
+    recommender = get_recommender()
+    catalog = make_material_catalog(size)
+    # Big catalogs predict every row per call: fewer repetitions
+    repeats = max(3, min(n_requests, 2_000_000 // size))
+    return time_calls(lambda _: recommender.rank_materials(catalog, top_k=10), [None] * repeats, warmup=1)
+
+
+def bench_recommend_material(size, n_requests):
+    from api.services.recommendation_service import recommend_material
+
+    return time_calls(recommend_material, make_category_queries(n_requests))
+
+
+class FrameCatalogSource:
+    """In-memory catalog source for the Flask scenarios."""
+
+    incremental = False
+
+    def __init__(self, df):
+        self.df = df
+
+    def current_version(self):
+        return len(self.df)
+
+    def fetch(self, since=None):
+        return self.df
+
+
+def bench_flask_recommend(size, n_requests):
+    os.environ.setdefault("CATALOG_CSV", str(CATALOG_PATH))
+    # Synthetic traffic must not land in the real data/analytics.db
+    os.environ.setdefault("ANALYTICS_DB", str(Path(tempfile.mkdtemp()) / "analytics.db"))
+    os.environ.setdefault("RESPONSE_CACHE_SIZE", "0")
+    import src.app as app_module
+    from src.data_pipeline.catalog_provider import CatalogProvider
+    from src.models.catalog_filter import CatalogFilterEngine
+
+    provider = CatalogProvider(FrameCatalogSource(make_material_catalog(size)),
+                               app_module.recommender.index_catalog, CatalogFilterEngine)
+    provider.refresh()
+    app_module.catalog_provider.stop()
+    app_module.catalog_provider = provider
+
+    client = app_module.app.test_client()
+
+    def call(payload):
+        response = client.post("/api/recommend", json=payload)
+        assert response.status_code == 200, response.data
+
+    return time_calls(call, make_queries(n_requests))
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(port, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/api/health")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.25)
+    raise RuntimeError(f"server on port {port} not ready after {timeout}s")
+
+
+def bench_server_recommend(size, n_requests, workers=2, concurrency=8):
+    """Starts gunicorn on a synthetic catalog of `size` rows and drives it with `concurrency` clients."""
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog_path = Path(tmp) / "catalog.csv"
+        make_material_catalog(size).to_csv(catalog_path, index=False)
+        port = _free_port()
+        # Synthetic traffic must not land in the real data/analytics.db
+        env = dict(os.environ, BIND=f"127.0.0.1:{port}", WEB_CONCURRENCY=str(workers), CATALOG_CSV=str(catalog_path),
+                   ANALYTICS_DB=str(Path(tmp) / "analytics.db"),
+                   RESPONSE_CACHE_SIZE=os.environ.get("RESPONSE_CACHE_SIZE", "0"))
+        server = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "-c", str(BASE_DIR / "deployment" / "gunicorn_config.py")],
+            cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            _wait_ready(port, timeout=120)
+            queries = make_queries(n_requests)
+            per_client = [queries[i::concurrency] for i in range(concurrency)]
+
+            def client(payloads):
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                latencies = []
+                for payload in payloads:
+                    body = json.dumps(payload)
+                    t0 = time.perf_counter()
+                    conn.request("POST", "/api/recommend", body, {"Content-Type": "application/json"})
+                    response = conn.getresponse()
+                    response.read()
+                    latencies.append(time.perf_counter() - t0)
+                    assert response.status == 200
+                conn.close()
+                return latencies
+
+            client(queries[:concurrency])  # warm the connections / workers
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                latencies = [t for result in pool.map(client, per_client) for t in result]
+            result = summarize(latencies, time.perf_counter() - start)
+            result.update(workers=workers, concurrency=concurrency)
+            return result
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+
+BENCHMARKS = {
+    "rank_materials": bench_rank_materials,
+    "recommend_material": bench_recommend_material,
+    "flask_recommend": bench_flask_recommend,
+    "server_recommend": bench_server_recommend,
+}
+# recommend_material always runs on data/final/ml_dataset.csv
+SIZED = {"rank_materials", "flask_recommend", "server_recommend"}
+
+
+def run(scenarios, sizes, n_requests, workers, concurrency):
+    results = {}
+    for scenario in scenarios:
+        for size in (sizes if scenario in SIZED else [None]):
+            key = scenario if size is None else f"{scenario}@{size}"
+            kwargs = {"workers": workers, "concurrency": concurrency} if scenario == "server_recommend" else {}
+            results[key] = BENCHMARKS[scenario](size, n_requests, **kwargs)
+            r = results[key]
+            print(f"{key:<32} {r['throughput_rps']:>10.1f} rps  p50 {r['p50_ms']:>9.3f}  "
+                  f"p95 {r['p95_ms']:>9.3f}  p99 {r['p99_ms']:>9.3f} ms")
+    return results
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+                                capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "commit": commit,
+    }
+
+
+def compare(baseline, results, tolerance):
+    """Scenarios whose p95 rose, or throughput fell, by more than `tolerance` (a fraction) vs the baseline."""
+    regressions = []
+    for key, current in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        if current["p95_ms"] > reference["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{key}: p95 {reference['p95_ms']:.3f} -> {current['p95_ms']:.3f} ms")
+        if current["throughput_rps"] < reference["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{key}: throughput {reference['throughput_rps']:.1f} -> {current['throughput_rps']:.1f} rps")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--sizes", type=int, nargs="+", default=QUICK_SIZES, help="synthetic catalog sizes (10^2-10^6)")
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn workers for server_recommend")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent clients for server_recommend")
+    parser.add_argument("--save", help="write the results to this JSON baseline")
+    parser.add_argument("--check", help="compare against this JSON baseline, exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed relative regression (0.5 = 50%%)")
+    args = parser.parse_args()
+
+    results = run(args.scenarios, args.sizes, args.requests, args.workers, args.concurrency)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"environment": environment(), "results": results}, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline written to {args.save}")
+
+    if args.check:
+        with open(args.check) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(baseline, results, args.tolerance)
+        if regressions:
+            print("\nRegressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.tolerance:.0%} against {args.check}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Microbenchmark: columnar CatalogFilterEngine vs the previous /api/recommend handler
+(catalog_df.copy() + chained boolean masks + full sort + iterrows over the top 10).
+
+Run from the project root:
+    python benchmarks/filter_benchmark.py
+    python benchmarks/filter_benchmark.py --sizes 35 10000 1000000 --queries 50
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR))
+
+from src.models.catalog_filter import CatalogFilterEngine
+from src.models.recommender import DEFAULT_WEIGHTS, composite_scores, top_k_indices
+
+DEFAULT_SIZES = [35, 1_000, 10_000, 100_000, 1_000_000]
+
+
+def make_catalog(n, seed=42):
+    """Synthetic indexed catalog with the same columns/ranges as feature_engineered_materials.csv."""
+    rng = np.random.default_rng(seed)
+    material_types = ["Corrugated Cardboard", "Molded Pulp", "Bamboo Fiber", "PLA Plastic", "Jute Packaging"]
+    return pd.DataFrame({
+        "material_id": [f"MAT{i:07d}" for i in range(n)],
+        "material_type": rng.choice(material_types, n),
+        "strength": rng.integers(1, 11, n),
+        "weight_capacity_kg": rng.integers(1, 26, n),
+        "water_resistance": rng.random(n) < 0.4,
+        "sustainability_score": rng.uniform(50, 95, n).round(1),
+        "predicted_cost": rng.uniform(5, 60, n),
+        "predicted_co2": rng.uniform(1, 6, n),
+    })
+
+
+def make_queries(count, seed=7):
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            "weight_capacity_kg": float(rng.integers(0, 20)),
+            "strength": float(rng.integers(0, 9)),
+            "water_resistance": int(rng.random() < 0.3),
+        }
+        for _ in range(count)
+    ]
+
+
+def legacy_handler(catalog_df, data):
+    weight_req = float(data.get("weight_capacity_kg", 0))
+    strength_req = float(data.get("strength", 0))
+    water_res_req = int(data.get("water_resistance", 0))
+
+    filtered_df = catalog_df.copy()
+    if weight_req > 0:
+        filtered_df = filtered_df[filtered_df["weight_capacity_kg"] >= weight_req]
+    if strength_req > 0:
+        filtered_df = filtered_df[filtered_df["strength"] >= strength_req]
+    if water_res_req == 1:
+        filtered_df = filtered_df[filtered_df["water_resistance"] >= 1]
+    if filtered_df.empty:
+        return []
+
+    df = filtered_df.copy()
+    df["rank_score"] = composite_scores(df["sustainability_score"], df["predicted_cost"], df["predicted_co2"], DEFAULT_WEIGHTS)
+    ranked_df = df.sort_values(by="rank_score", ascending=False)
+
+    return [
+        (row["material_id"], round(row["predicted_cost"], 2), round(row["rank_score"], 4))
+        for _, row in ranked_df.head(10).iterrows()
+    ]
+
+
+def engine_handler(engine, data):
+    rows = engine.query(
+        weight_capacity_kg=float(data.get("weight_capacity_kg", 0)),
+        strength=float(data.get("strength", 0)),
+        water_resistant=int(data.get("water_resistance", 0)) == 1,
+    )
+    if rows.size == 0:
+        return []
+
+    cost = engine.take(rows, "predicted_cost")
+    rank_score = composite_scores(
+        engine.take(rows, "sustainability_score"), cost, engine.take(rows, "predicted_co2"), DEFAULT_WEIGHTS
+    )
+    order = top_k_indices(rank_score, 10)
+
+    return [
+        (material_id, round(cost_i, 2), round(score_i, 4))
+        for material_id, cost_i, score_i in zip(engine.take(rows[order], "material_id"), cost[order], rank_score[order])
+    ]
+
+
+def time_per_query(fn, queries):
+    start = time.perf_counter()
+    for data in queries:
+        fn(data)
+    return (time.perf_counter() - start) / len(queries) * 1000
+
+
+def run(sizes, n_queries):
+    queries = make_queries(n_queries)
+    print(f"{'rows':>10} {'legacy ms':>12} {'engine ms':>12} {'speedup':>9} {'build ms':>10}")
+
+    for n in sizes:
+        catalog_df = make_catalog(n)
+
+        start = time.perf_counter()
+        engine = CatalogFilterEngine(catalog_df)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        # Both handlers must select the same materials before timing means anything
+        for data in queries[:5]:
+            legacy_ids = [r[0] for r in legacy_handler(catalog_df, data)]
+            engine_ids = [r[0] for r in engine_handler(engine, data)]
+            assert sorted(legacy_ids) == sorted(engine_ids), f"result mismatch at n={n}"
+
+        # Fewer repetitions for the slow path on very large catalogs
+        legacy_queries = queries if n < 100_000 else queries[:max(3, n_queries // 10)]
+        legacy_ms = time_per_query(lambda d: legacy_handler(catalog_df, d), legacy_queries)
+        engine_ms = time_per_query(lambda d: engine_handler(engine, d), queries)
+
+        print(f"{n:>10} {legacy_ms:>12.3f} {engine_ms:>12.3f} {legacy_ms / engine_ms:>8.1f}x {build_ms:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+    run(args.sizes, args.queries)
@@ -0,0 +1,104 @@
+"""
+Benchmark: joint multi-output model (joint_model.pkl) vs the two-model setup
+(cost_model.pkl RandomForest + co2_model.pkl XGBoost).
+
+Reports 5-fold CV accuracy per target with the model_training.py
+configurations, predict_metrics latency for both backends, and the memory the
+models take in a worker.
+
+Run from the project root (after `python src/model_training.py --joint`):
+    python benchmarks/joint_model_benchmark.py
+    python benchmarks/joint_model_benchmark.py --folds 10 --repeat 500
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.model_selection import KFold
+from xgboost import XGBRegressor
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR / "src"))
+
+from evaluation.metrics import regression_metrics
+from model_training import load_data, make_joint_model
+from models.recommender import ARTIFACTS_DIR, PackagingRecommender
+
+CATALOG_PATH = BASE_DIR / "data" / "feature_engineered_materials.csv"
+
+
+def cv_accuracy(X, y_cost, y_co2, folds):
+    """Mean fold metrics per (setup, target)."""
+    rows = []
+    for train_idx, test_idx in KFold(n_splits=folds, shuffle=True, random_state=42).split(X):
+        cost_model = RandomForestRegressor(n_estimators=100, random_state=42, max_depth=10)
+        co2_model = XGBRegressor(n_estimators=100, learning_rate=0.1, random_state=42)
+        joint_model = make_joint_model(n_estimators=100, random_state=42, max_depth=10)
+
+        cost_model.fit(X[train_idx], y_cost[train_idx])
+        co2_model.fit(X[train_idx], y_co2[train_idx])
+        joint_model.fit(X[train_idx], np.column_stack([y_cost[train_idx], y_co2[train_idx]]))
+        joint = joint_model.predict(X[test_idx])
+
+        for setup, target, y, pred in [
+            ("separate", "cost", y_cost, cost_model.predict(X[test_idx])),
+            ("separate", "co2", y_co2, co2_model.predict(X[test_idx])),
+            ("joint", "cost", y_cost, joint[:, 0]),
+            ("joint", "co2", y_co2, joint[:, 1]),
+        ]:
+            rows.append({"setup": setup, "target": target, **regression_metrics(y[test_idx], pred)})
+
+    return pd.DataFrame(rows).groupby(["target", "setup"]).mean().round(4)
+
+
+def predict_latency_ms(recommender, df, repeat):
+    recommender.predict_metrics(df)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        recommender.predict_metrics(df)
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def model_memory(recommender):
+    """(pickled artifact bytes, compiled node array bytes) of the models, preprocessor excluded."""
+    names = [name for name in recommender.artifact_names if name != "preprocessor"]
+    on_disk = sum((ARTIFACTS_DIR / f"{name}.pkl").stat().st_size for name in names)
+    compiled = sum(
+        sum(getattr(forest, field).nbytes for field in ("feature", "threshold", "children", "missing_left", "value"))
+        for forest in (recommender._compiled.get(name) for name in names) if forest is not None
+    )
+    return on_disk, compiled
+
+
+def run(folds, repeat):
+    X_train, X_test, y_cost_train, y_cost_test, y_co2_train, y_co2_test = load_data()
+    X = np.vstack([X_train, X_test])
+    y_cost = np.concatenate([y_cost_train, y_cost_test])
+    y_co2 = np.concatenate([y_co2_train, y_co2_test])
+
+    print(f"\n{folds}-fold CV accuracy ({len(X)} rows)")
+    print(cv_accuracy(X, y_cost, y_co2, folds).to_string())
+
+    catalog_df = pd.read_csv(CATALOG_PATH)
+    print(f"\n{'mode':>9} {'backend':>9} {'1 row ms':>10} {f'{len(catalog_df)} rows ms':>12} {'pickle KB':>10} {'nodes KB':>9}")
+    for mode in ["separate", "joint"]:
+        for backend in ["native", "compiled"]:
+            recommender = PackagingRecommender(backend=backend, model_mode=mode)
+            recommender.warm_up()
+            single_ms = predict_latency_ms(recommender, catalog_df.iloc[:1], repeat)
+            catalog_ms = predict_latency_ms(recommender, catalog_df, repeat)
+            on_disk, compiled = model_memory(recommender)
+            print(f"{mode:>9} {backend:>9} {single_ms:>10.3f} {catalog_ms:>12.3f} "
+                  f"{on_disk / 1024:>10.0f} {compiled / 1024 if compiled else float('nan'):>9.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    run(args.folds, args.repeat)
@@ -0,0 +1,23 @@
+"""CO2 avoided per category over time, as Chart.js line chart data."""
+from datetime import datetime, timezone
+
+LABEL_FORMATS = {"hour": "%Y-%m-%d %H:00", "day": "%Y-%m-%d"}
+
+
+def bucket_labels(buckets, granularity):
+    return [datetime.fromtimestamp(b, timezone.utc).strftime(LABEL_FORMATS[granularity]) for b in buckets]
+
+
+def chart_data(series, sign=1):
+    return {
+        "labels": bucket_labels(series["buckets"], series["granularity"]),
+        "datasets": [
+            {"label": category, "data": [round(sign * value, 3) for value in values]}
+            for category, values in sorted(series["series"].items())
+        ],
+    }
+
+
+def co2_trends(store, granularity="day", since=None, until=None, category=None):
+    """Summed (mean candidate CO2 - recommended CO2) per bucket and category."""
+    return chart_data(store.series("co2_avoided", granularity, since, until, category))
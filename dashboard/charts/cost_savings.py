@@ -0,0 +1,10 @@
+"""Cost saved per category over time, as Chart.js bar chart data."""
+from .co2_trends import chart_data
+
+
+def cost_savings(store, granularity="day", since=None, until=None, category=None):
+    """
+    Summed (mean candidate cost - recommended cost) per bucket and category,
+    i.e. the rollups' cost_delta with the sign flipped so savings are positive.
+    """
+    return chart_data(store.series("cost_delta", granularity, since, until, category), sign=-1)
@@ -0,0 +1,9 @@
+"""Most recommended materials, as Chart.js bar (or doughnut) chart data."""
+
+
+def material_usage(store, granularity="day", since=None, until=None, category=None, top=10):
+    rows = store.material_usage(granularity, since, until, category, top)
+    return {
+        "labels": [row["material_id"] for row in rows],
+        "datasets": [{"label": "Recommendations", "data": [row["recommendations"] for row in rows]}],
+    }
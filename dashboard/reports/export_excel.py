@@ -0,0 +1,106 @@
+"""
+Streaming .xlsx export. The workbook is written in openpyxl's write-only mode
+(rows go straight to a temporary sheet file, memory stays flat however many
+rows there are) by a background thread, into a writer that hands the zip
+bytes to the HTTP response in chunks as they are produced.
+"""
+import io
+import queue
+import threading
+
+from openpyxl import Workbook
+
+# Excel's row limit per sheet, header included; longer exports continue on a new sheet
+MAX_SHEET_ROWS = 1_048_576
+CHUNK_SIZE = 64 * 1024
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+class QueueWriter(io.RawIOBase):
+    """Non-seekable file object that buffers writes and puts CHUNK_SIZE byte chunks on a bounded queue."""
+
+    def __init__(self, chunks, cancelled, chunk_size=CHUNK_SIZE):
+        self.chunks = chunks
+        self.cancelled = cancelled
+        self.chunk_size = chunk_size
+        self.buffer = bytearray()
+        self.aborted = False
+
+    def writable(self):
+        return True
+
+    def _put(self, chunk):
+        # Blocks while the client is slow to read (back-pressure), gives up once the download is abandoned.
+        # After that, writes (e.g. the zip's end record on cleanup) are discarded.
+        while not self.aborted:
+            if self.cancelled.is_set():
+                self.aborted = True
+                raise ExportCancelled()
+            try:
+                self.chunks.put(chunk, timeout=0.5)
+                return
+            except queue.Full:
+                pass
+
+    def write(self, data):
+        self.buffer += data
+        if len(self.buffer) >= self.chunk_size:
+            self._put(bytes(self.buffer))
+            self.buffer.clear()
+        return len(data)
+
+    def flush(self):
+        if self.buffer:
+            self._put(bytes(self.buffer))
+            self.buffer.clear()
+
+
+def write_xlsx(rows, fileobj, columns, sheet_title="Recommendations"):
+    workbook = Workbook(write_only=True)
+    sheet, sheet_rows, sheets = None, MAX_SHEET_ROWS, 0
+    for row in rows:
+        if sheet_rows == MAX_SHEET_ROWS:
+            sheets += 1
+            sheet = workbook.create_sheet(sheet_title if sheets == 1 else f"{sheet_title} ({sheets})")
+            sheet.append(list(columns))
+            sheet_rows = 1
+        sheet.append(list(row))
+        sheet_rows += 1
+    if sheet is None:
+        workbook.create_sheet(sheet_title).append(list(columns))
+    workbook.save(fileobj)
+    fileobj.flush()
+
+
+def stream_xlsx(rows, columns, sheet_title="Recommendations", max_chunks=16):
+    """
+    Generator of .xlsx bytes. `rows` is consumed on the writer thread, so it
+    must open its own DB connection (AnalyticsStore.iter_events does).
+    """
+    chunks = queue.Queue(maxsize=max_chunks)
+    cancelled = threading.Event()
+    done = object()
+
+    def produce():
+        try:
+            write_xlsx(rows, QueueWriter(chunks, cancelled), columns, sheet_title)
+            chunks.put(done)
+        except ExportCancelled:
+            pass
+        except Exception as e:
+            chunks.put(e)
+
+    threading.Thread(target=produce, name="xlsx-export", daemon=True).start()
+    try:
+        while True:
+            chunk = chunks.get()
+            if chunk is done:
+                return
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+    finally:
+        cancelled.set()
@@ -0,0 +1,103 @@
+"""
+Streaming PDF export. A minimal PDF writer (standard Courier font, one
+Flate-compressed text table per page) that yields the document page by
+page: only the current page's rows and one byte offset per object are kept,
+and the page tree and cross-reference table are written at the end.
+"""
+import zlib
+
+# Landscape A4, in points
+PAGE_WIDTH, PAGE_HEIGHT = 842, 595
+MARGIN = 36
+FONT_SIZE = 7
+LEADING = 9
+ROWS_PER_PAGE = (PAGE_HEIGHT - 2 * MARGIN) // LEADING - 3
+# Courier glyphs are 0.6 em wide
+LINE_CHARS = int((PAGE_WIDTH - 2 * MARGIN) / (FONT_SIZE * 0.6))
+
+CATALOG_ID, PAGES_ID, FONT_ID = 1, 2, 3
+
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _format_row(values, widths):
+    cells = []
+    for value, width in zip(values, widths):
+        text = f"{value:.3f}" if isinstance(value, float) else str(value)
+        cells.append(text[:width].ljust(width))
+    return " ".join(cells)[:LINE_CHARS]
+
+
+def _page_content(lines):
+    ops = [f"BT /F1 {FONT_SIZE} Tf {LEADING} TL {MARGIN} {PAGE_HEIGHT - MARGIN} Td"]
+    ops += [f"({_escape(line)}) '" for line in lines]
+    ops.append("ET")
+    return zlib.compress("\n".join(ops).encode("latin-1", errors="replace"))
+
+
+class PdfStream:
+    """Yields a PDF's bytes object by object while tracking the xref offsets."""
+
+    def __init__(self):
+        self.offsets = {}
+        self.position = 0
+
+    def emit(self, data):
+        self.position += len(data)
+        return data
+
+    def obj(self, obj_id, body, stream=None):
+        self.offsets[obj_id] = self.position
+        data = f"{obj_id} 0 obj\n{body}\n".encode("latin-1")
+        if stream is not None:
+            data += b"stream\n" + stream + b"\nendstream\n"
+        return self.emit(data + b"endobj\n")
+
+    def trailer(self):
+        size = max(self.offsets) + 1
+        xref_at = self.position
+        lines = [f"xref\n0 {size}\n", "0000000000 65535 f \n"]
+        lines += [f"{self.offsets[i]:010d} 00000 n \n" for i in range(1, size)]
+        lines.append(f"trailer\n<< /Size {size} /Root {CATALOG_ID} 0 R >>\nstartxref\n{xref_at}\n%%EOF\n")
+        return self.emit("".join(lines).encode("latin-1"))
+
+
+def stream_pdf(rows, columns, widths, title):
+    """
+    Generator of PDF bytes, one chunk per page. `widths` are the character
+    widths of the columns; every page repeats the title and header.
+    """
+    pdf = PdfStream()
+    yield pdf.emit(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    yield pdf.obj(CATALOG_ID, f"<< /Type /Catalog /Pages {PAGES_ID} 0 R >>")
+    yield pdf.obj(FONT_ID, "<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>")
+
+    header = _format_row(columns, widths)
+    page_ids, next_id = [], FONT_ID + 1
+
+    def page(lines):
+        nonlocal next_id
+        content_id, page_id = next_id, next_id + 1
+        next_id += 2
+        page_ids.append(page_id)
+        content = _page_content([f"{title} - page {len(page_ids)}", header, "-" * len(header)] + lines)
+        return (
+            pdf.obj(content_id, f"<< /Length {len(content)} /Filter /FlateDecode >>", content)
+            + pdf.obj(page_id, f"<< /Type /Page /Parent {PAGES_ID} 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+                               f"/Resources << /Font << /F1 {FONT_ID} 0 R >> >> /Contents {content_id} 0 R >>")
+        )
+
+    lines = []
+    for row in rows:
+        lines.append(_format_row(row, widths))
+        if len(lines) == ROWS_PER_PAGE:
+            yield page(lines)
+            lines = []
+    if lines or not page_ids:
+        yield page(lines)
+
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    yield pdf.obj(PAGES_ID, f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>")
+    yield pdf.trailer()
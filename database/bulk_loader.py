@@ -0,0 +1,224 @@
+"""
+Bulk CSV/Parquet loader for the EcoPackAI Postgres tables.
+
+Streams CSV or Parquet datasets in batches through COPY (or psycopg2 execute_values) instead of one
+INSERT per row, loads several files in parallel and reports rows/second.
+
+Examples (from the project root):
+    python database/bulk_loader.py                              # every dataset in data/processed
+    python database/bulk_loader.py data/feature_engineered_materials.csv
+    python database/bulk_loader.py data/processed/cleaned_*.csv --workers 4
+    python database/bulk_loader.py data/processed/cleaned_material_data.csv --on-conflict update
+    python database/bulk_loader.py feed.csv --table raw.materials_data --method values
+"""
+import argparse
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import psycopg2
+from psycopg2.extras import execute_values
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(BASE_DIR, "src"))
+
+from data_pipeline.cleaning import category_output_name
+from data_pipeline.pipeline import CATEGORY_FILES
+from data_pipeline.storage import iter_batches, list_datasets
+
+PROCESSED_DIR = os.path.join(BASE_DIR, "data", "processed")
+
+DB_CONFIG = {
+    "host": os.getenv("DB_HOST", "localhost"),
+    "port": os.getenv("DB_PORT", "5432"),
+    "database": os.getenv("DB_NAME", "echo_pack"),
+    "user": os.getenv("DB_USER", "postgres"),
+    "password": os.getenv("DB_PASSWORD", "123456")
+}
+
+MATERIAL_COLUMNS = [
+    "material_id",
+    "material_type",
+    "strength",
+    "weight_capacity_kg",
+    "biodegradability_score",
+    "co2_emission_score",
+    "recyclability_percent",
+    "cost_per_unit_inr",
+    "water_resistance",
+    "recycle_time_days",
+    "manufacturing_place"
+]
+
+# table -> (table columns, source file columns in the same order, conflict key)
+TABLES = {
+    "ml.material_features": (
+        MATERIAL_COLUMNS + ["co2_impact_index", "cost_efficiency_index", "material_suitability_score"],
+        MATERIAL_COLUMNS + ["co2_impact_index", "cost_efficiency_index", "material_suitability_score"],
+        ["material_id"]
+    ),
+    "raw.materials_data": (MATERIAL_COLUMNS, MATERIAL_COLUMNS, ["material_id"]),
+    # The category sheets' weight_capacity_upto is stored in the product_domain column.
+    # No conflict key: rows are always appended.
+    "raw.product_material_map": (
+        ["material_id", "eco_alternative", "category", "product_domain"],
+        ["material_id", "eco_alternative", "category", "weight_capacity_upto"],
+        None
+    ),
+}
+
+# dataset stem -> table; other datasets (e.g. validated_material_data) have no table of their own
+DATASET_TABLES = {
+    "cleaned_material_data": "raw.materials_data",
+    "feature_engineered_materials": "ml.material_features",
+    **{os.path.splitext(category_output_name(file))[0]: "raw.product_material_map" for file in CATEGORY_FILES},
+}
+
+
+def table_for_file(path):
+    """The table a dataset loads into by default, or None for an unknown file name."""
+    return DATASET_TABLES.get(os.path.splitext(os.path.basename(path))[0])
+
+
+def check_on_conflict(table, on_conflict):
+    if on_conflict == "update" and TABLES[table][2] is None:
+        raise ValueError(f"{table} has no conflict key to upsert on (rows are always appended)")
+
+
+def merge_sql(table, columns, key, on_conflict, touch_column=None):
+    """INSERT ... ON CONFLICT clause for moving rows from staging into `table`."""
+    column_list = ", ".join(columns)
+    if key is None or on_conflict == "error":
+        return f"INSERT INTO {table} ({column_list}) SELECT {column_list} FROM staging"
+
+    conflict = f"ON CONFLICT ({', '.join(key)})"
+    if on_conflict == "nothing":
+        action = "DO NOTHING"
+    else:
+        updates = [f"{col} = EXCLUDED.{col}" for col in columns if col not in key]
+        if touch_column:
+            updates.append(f"{touch_column} = now()")
+        action = "DO UPDATE SET " + ", ".join(updates)
+    return f"INSERT INTO {table} ({column_list}) SELECT {column_list} FROM staging {conflict} {action}"
+
+
+def _copy_batch(cur, table, columns, key, on_conflict, touch_column, batch):
+    buffer = io.StringIO()
+    batch.to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+
+    cur.execute("TRUNCATE staging")
+    cur.copy_expert(f"COPY staging ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    cur.execute(merge_sql(table, columns, key, on_conflict, touch_column))
+
+
+def _values_batch(cur, table, columns, key, on_conflict, touch_column, batch):
+    sql = merge_sql(table, columns, key, on_conflict, touch_column).replace(
+        f"SELECT {', '.join(columns)} FROM staging", "VALUES %s"
+    )
+    rows = [tuple(None if pd.isna(v) else v for v in row) for row in batch.itertuples(index=False)]
+    execute_values(cur, sql, rows, page_size=len(rows))
+
+
+def load_file(path, table=None, method="copy", batch_size=50_000, on_conflict="nothing", touch_column=None):
+    """
+    Streams one CSV/Parquet file into `table` in batches of `batch_size` rows within a single
+    transaction. Returns (path, table, rows, seconds).
+    """
+    table = table or table_for_file(path)
+    if table is None:
+        raise ValueError(f"No table for {path}; pass table=")
+    check_on_conflict(table, on_conflict)
+    columns, csv_columns, key = TABLES[table]
+    load_batch = _copy_batch if method == "copy" else _values_batch
+
+    start = time.perf_counter()
+    rows = 0
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        with conn.cursor() as cur:
+            if method == "copy":
+                cur.execute(f"CREATE TEMP TABLE staging (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP")
+            for batch in iter_batches(path, batch_size, columns=csv_columns):
+                batch = batch[csv_columns]
+                if key is not None:
+                    # ON CONFLICT cannot touch the same key twice in one statement
+                    batch = batch.drop_duplicates(subset=key, keep="last")
+                load_batch(cur, table, columns, key, on_conflict, touch_column, batch)
+                rows += len(batch)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    return path, table, rows, time.perf_counter() - start
+
+
+def load_files(paths, workers=4, **options):
+    """Loads several files in parallel (one connection per worker process) and prints rows/second."""
+    start = time.perf_counter()
+    total_rows = 0
+    with ProcessPoolExecutor(max_workers=min(workers, len(paths)) or 1) as pool:
+        futures = [pool.submit(load_file, path, **options) for path in paths]
+        for future in futures:
+            path, table, rows, seconds = future.result()
+            total_rows += rows
+            print(f"{os.path.basename(path)} -> {table}: {rows} rows in {seconds:.2f}s "
+                  f"({rows / seconds if seconds else 0:,.0f} rows/s)")
+
+    elapsed = time.perf_counter() - start
+    print(f"Loaded {total_rows} rows from {len(paths)} files in {elapsed:.2f}s "
+          f"({total_rows / elapsed if elapsed else 0:,.0f} rows/s)")
+    return total_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*", help="CSV/Parquet files (default: every dataset in data/processed)")
+    parser.add_argument("--table", choices=sorted(TABLES), help="target table (default: inferred from file name)")
+    parser.add_argument("--method", choices=["copy", "values"], default="copy")
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--on-conflict", choices=["nothing", "update", "error"], default="nothing",
+                        help="upsert behaviour on the table key (update = upsert); raw.product_material_map "
+                             "has no key, so its rows are always appended and update is rejected")
+    parser.add_argument("--touch-column", help="timestamp column set to now() on upsert, e.g. updated_at")
+    args = parser.parse_args()
+
+    if args.files:
+        files = args.files
+    else:
+        files = []
+        for path in list_datasets(PROCESSED_DIR):
+            if table_for_file(path) is None:
+                print(f"Skipping {path.name}: no table for this dataset")
+            else:
+                files.append(str(path))
+
+    for path in files:
+        table = args.table or table_for_file(path)
+        if table is None:
+            parser.error(f"no table for {path}, pass --table")
+        try:
+            check_on_conflict(table, args.on_conflict)
+        except ValueError as e:
+            parser.error(f"{path}: {e}")
+
+    load_files(
+        files,
+        workers=args.workers,
+        table=args.table,
+        method=args.method,
+        batch_size=args.batch_size,
+        on_conflict=args.on_conflict,
+        touch_column=args.touch_column
+    )
+
+
+if __name__ == "__main__":
+    main()
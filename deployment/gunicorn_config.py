@@ -0,0 +1,30 @@
+# Run from the project root:
+#   gunicorn -c deployment/gunicorn_config.py
+import multiprocessing
+import os
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+wsgi_app = "src.app:app"
+chdir = BASE_DIR
+bind = os.getenv("BIND", "0.0.0.0:5000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 60))
+# Threaded (gthread) workers: the heartbeat keeps running while a thread streams a long
+# response (report exports), where a sync worker would be killed after `timeout`, and
+# exports (capped host-wide by EXPORT_MAX_CONCURRENT) leave the other threads serving.
+# GUNICORN_THREADS=1 would fall back to sync workers.
+threads = int(os.getenv("GUNICORN_THREADS", 4))
+
+# Import the app (load + warm up the models, index the catalog) once in the master.
+# Workers are forked afterwards and share those pages copy-on-write instead of
+# each loading its own copy, so worker startup is a fork and RSS per worker drops.
+preload_app = True
+
+
+def post_fork(server, worker):
+    # Threads and pooled DB connections do not survive fork, restart them per worker
+    from src.app import CATALOG_REFRESH_SECONDS, analytics_store, catalog_provider
+
+    catalog_provider.after_fork(CATALOG_REFRESH_SECONDS)
+    analytics_store.after_fork()
@@ -24,11 +24,13 @@ document.getElementById('recommendationDetailParam').addEventListener('submit',
     const weight = document.getElementById('weight').value;
     const strength = document.getElementById('strength').value;
     const waterResistant = document.getElementById('waterResistant').checked ? 1 : 0;
+    const category = document.querySelector('input[name="category"]:checked').value;
 
     const payload = {
         weight_capacity_kg: weight,
         strength: strength,
-        water_resistance: waterResistant
+        water_resistance: waterResistant,
+        category: category
     };
 
     try {
@@ -50,12 +52,15 @@ document.getElementById('recommendationDetailParam').addEventListener('submit',
 
         // Show AI Insight (Gemini)
         const insightBox = document.getElementById('aiInsightBox');
-        if (data.aiInsight) {
-            document.getElementById('aiInsightText').textContent = data.aiInsight;
+        if (data.ai_insight) {
+            document.getElementById('aiInsightText').textContent = data.ai_insight;
             insightBox.classList.remove('d-none');
         } else {
             insightBox.classList.add('d-none');
         }
+        if (data.ai_insight_status === 'pending') {
+            pollInsight(data.ai_insight_id);
+        }
 
         // Clear previous
         resultsGrid.innerHTML = '';
@@ -133,3 +138,17 @@ document.getElementById('recommendationDetailParam').addEventListener('submit',
         spinner.classList.add('d-none');
     }
 });
+
+// AI insights are generated in the background; long-poll until the text is ready
+async function pollInsight(insightId, attempts = 5) {
+    for (let i = 0; i < attempts; i++) {
+        const response = await fetch(`/api/insights/${insightId}?wait=10`);
+        if (!response.ok) return;
+
+        const insight = await response.json();
+        if (insight.status !== 'pending') {
+            document.getElementById('aiInsightText').textContent = insight.text;
+            return;
+        }
+    }
+}
@@ -1,7 +1,11 @@
 import os
+import sys
 import pandas as pd
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(BASE_DIR, "src"))
+
+from data_pipeline.cleaning import clean_material_data
 
 RAW_DIR = os.path.join(BASE_DIR, "data", "raw")
 PROCESSED_DIR = os.path.join(BASE_DIR, "data", "processed")
@@ -9,10 +13,7 @@ PROCESSED_DIR = os.path.join(BASE_DIR, "data", "processed")
 input_file = os.path.join(RAW_DIR, "material data.xlsx")
 output_file = os.path.join(PROCESSED_DIR, "cleaned_material_data.csv")
 
-df = pd.read_excel(input_file)
-
-df.drop_duplicates(inplace=True)
-df.columns = df.columns.str.lower().str.replace(" ", "_")
+df = clean_material_data(pd.read_excel(input_file))
 
 os.makedirs(PROCESSED_DIR, exist_ok=True)
 
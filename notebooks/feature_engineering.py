@@ -1,25 +1,18 @@
 import os
+import sys
 import pandas as pd
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(BASE_DIR, "src"))
+
+from data_pipeline.feature_engineering import add_material_features
+
 PROCESSED_DIR = os.path.join(BASE_DIR, "data", "processed")
 
 input_file = os.path.join(PROCESSED_DIR, "cleaned_material_data.csv")
 output_file = os.path.join(PROCESSED_DIR, "feature_engineered_materials.csv")
 
-df = pd.read_csv(input_file)
-
-df["co2_impact_index"] = df["co2_emission_score"] * df["weight_capacity_kg"]
-
-df["cost_efficiency_index"] = (
-    df["weight_capacity_kg"] / df["cost_per_unit_inr"]
-)
-
-df["material_suitability_score"] = (
-    df["biodegradability_score"] * 0.4 +
-    df["recyclability_percent"] * 0.3 +
-    df["cost_efficiency_index"] * 0.3
-)
+df = add_material_features(pd.read_csv(input_file))
 
 df.to_csv(output_file, index=False)
 
@@ -1,7 +1,12 @@
 import os
+import sys
 import pandas as pd
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(BASE_DIR, "src"))
+
+from data_pipeline.cleaning import category_output_name, clean_category_sheet
+
 RAW_DIR = os.path.join(BASE_DIR, "data", "raw")
 
 files = [
@@ -14,22 +19,11 @@ files = [
 
 for file in files:
     file_path = os.path.join(RAW_DIR, file)
-    df = pd.read_excel(file_path)
-
-    df.drop_duplicates(inplace=True)
-    df.columns = df.columns.str.lower().str.replace(" ", "_")
-
-    df["weight_capacity_upto"] = (
-        df["weight_capacity_upto"]
-        .astype(str)
-        .str.replace(" kg", "")
-        .astype(int)
-    )
+    df = clean_category_sheet(pd.read_excel(file_path))
 
     output_dir = os.path.join(BASE_DIR, "data", "processed")
     os.makedirs(output_dir, exist_ok=True)
 
-    output_name = file.lower().replace(" ", "_").replace("&", "and").replace(".xlsx", ".csv")
-    df.to_csv(os.path.join(output_dir, f"cleaned_{output_name}"), index=False)
+    df.to_csv(os.path.join(output_dir, category_output_name(file)), index=False)
 
     print(f"{file} processed successfully")
@@ -0,0 +1,147 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from contextlib import nullcontext
+
+GEMINI_MODEL = 'gemini-1.5-flash'
+
+
+class InsightBackend:
+    """Interface for AI insight generators: turn a prompt into a short text."""
+
+    def generate(self, prompt):
+        raise NotImplementedError
+
+
+class GeminiInsightBackend(InsightBackend):
+    def __init__(self, model_name=GEMINI_MODEL):
+        import google.generativeai as genai
+        self.model = genai.GenerativeModel(model_name)
+
+    def generate(self, prompt):
+        return self.model.generate_content(prompt).text
+
+
+class StubInsightBackend(InsightBackend):
+    """Local backend for tests and offline development, no external calls."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+
+    def generate(self, prompt):
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        return f"[stub insight] {prompt[:120]}"
+
+
+def build_prompt(weight_req, strength_req, top_materials_context):
+    return (
+        f"You are an expert in sustainable packaging. "
+        f"The user needs packaging for a product weighing {weight_req}kg with strength {strength_req}. "
+        f"Our system recommended these top 3 materials based on Cost, CO2, and Sustainability: {'; '.join(top_materials_context)}. "
+        f"Provide a brief, professional summary (max 2 sentences) explaining WHY these are good sustainability choices."
+    )
+
+
+def insight_key(requirements, material_ids):
+    """Normalized cache key: the requirement values plus the top-3 material IDs."""
+    normalized = {name: float(value) for name, value in requirements.items()}
+    payload = json.dumps({"requirements": normalized, "materials": list(material_ids)[:3]}, sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()[:20]
+
+
+class InsightService:
+    """
+    Generates AI insights on a background worker pool, off the request path.
+
+    Results are cached by insight key with TTL and LRU eviction. `request()`
+    returns immediately with the cached text or a pending entry whose
+    insight_id clients poll (optionally long-polling with `wait`) via `get()`.
+    Failed generations are kept for a shorter TTL so they are retried later.
+
+    `stage_timer(name)` (e.g. Metrics.stage) times the backend calls.
+    """
+
+    def __init__(self, backend, max_workers=4, max_entries=1024, ttl_seconds=3600, failure_ttl_seconds=60,
+                 stage_timer=None):
+        self.backend = backend
+        self.stage_timer = stage_timer or (lambda name: nullcontext())
+        self.hits = 0
+        self.misses = 0
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.failure_ttl_seconds = failure_ttl_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='insight')
+        self._entries = OrderedDict()  # insight_id -> {"status", "text", "expires_at"}
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def request(self, insight_id, prompt):
+        with self._lock:
+            entry = self._lookup(insight_id)
+            if entry is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+                entry = {"status": "pending", "text": None, "expires_at": None}
+                self._store(insight_id, entry)
+                self._futures[insight_id] = self._executor.submit(self._generate, insight_id, prompt)
+            return self._public(insight_id, entry)
+
+    def get(self, insight_id, wait=0):
+        with self._lock:
+            entry = self._lookup(insight_id)
+            future = self._futures.get(insight_id)
+        if entry is None:
+            return None
+
+        if entry["status"] == "pending" and future is not None and wait > 0:
+            try:
+                future.result(timeout=wait)
+            except TimeoutError:
+                pass
+            with self._lock:
+                entry = self._entries.get(insight_id, entry)
+        return self._public(insight_id, entry)
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+    def _generate(self, insight_id, prompt):
+        try:
+            with self.stage_timer("insight_generate"):
+                text = self.backend.generate(prompt)
+            entry = {"status": "ready", "text": text,
+                     "expires_at": time.monotonic() + self.ttl_seconds}
+        except Exception as e:
+            entry = {"status": "failed", "text": f"AI Insight unavailable: {str(e)}",
+                     "expires_at": time.monotonic() + self.failure_ttl_seconds}
+        with self._lock:
+            self._store(insight_id, entry)
+            self._futures.pop(insight_id, None)
+
+    def _lookup(self, insight_id):
+        entry = self._entries.get(insight_id)
+        if entry is None:
+            return None
+        if entry["expires_at"] is not None and entry["expires_at"] < time.monotonic():
+            del self._entries[insight_id]
+            return None
+        self._entries.move_to_end(insight_id)
+        return entry
+
+    def _store(self, insight_id, entry):
+        self._entries[insight_id] = entry
+        self._entries.move_to_end(insight_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    @staticmethod
+    def _public(insight_id, entry):
+        return {"insight_id": insight_id, "status": entry["status"], "text": entry["text"]}
@@ -0,0 +1,313 @@
+"""
+Recommendation analytics: an append-only event log plus incrementally
+maintained hourly and daily rollups, stored in SQLite (WAL mode).
+
+Serving a recommendation only enqueues an event; it never waits on disk (a
+full queue drops the event and counts it). A background writer drains the
+queue in batches and, in one transaction, appends the events and upserts the
+rollup rows they fall into. Dashboard reads only touch the rollups, through
+their own read-only connections: a chart costs one indexed row per bucket
+and category however many recommendations were served, and WAL readers
+never block the writer.
+
+Per event: co2_avoided is the mean predicted CO2 of every material that met
+the requirements minus the recommended material's, cost_delta the
+recommended material's predicted cost minus the candidates' mean (negative
+is a saving).
+"""
+import queue
+import sqlite3
+import threading
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+GRANULARITIES = {"hour": 3600, "day": 86400}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    source TEXT NOT NULL,
+    category TEXT NOT NULL,
+    material_id TEXT NOT NULL,
+    candidates INTEGER NOT NULL,
+    predicted_cost REAL NOT NULL,
+    predicted_co2 REAL NOT NULL,
+    co2_avoided REAL NOT NULL,
+    cost_delta REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rollups (
+    granularity TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    recommendations INTEGER NOT NULL,
+    co2_avoided REAL NOT NULL,
+    cost_delta REAL NOT NULL,
+    PRIMARY KEY (granularity, bucket, category)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS material_usage (
+    granularity TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    material_id TEXT NOT NULL,
+    recommendations INTEGER NOT NULL,
+    PRIMARY KEY (granularity, bucket, category, material_id)
+) WITHOUT ROWID;
+"""
+
+EVENT_FIELDS = ["ts", "source", "category", "material_id", "candidates",
+                "predicted_cost", "predicted_co2", "co2_avoided", "cost_delta"]
+EXPORT_COLUMNS = ["id"] + EVENT_FIELDS
+
+UPSERT_ROLLUP = """
+INSERT INTO rollups (granularity, bucket, category, recommendations, co2_avoided, cost_delta)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (granularity, bucket, category) DO UPDATE SET
+    recommendations = recommendations + excluded.recommendations,
+    co2_avoided = co2_avoided + excluded.co2_avoided,
+    cost_delta = cost_delta + excluded.cost_delta
+"""
+
+UPSERT_USAGE = """
+INSERT INTO material_usage (granularity, bucket, category, material_id, recommendations)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (granularity, bucket, category, material_id) DO UPDATE SET
+    recommendations = recommendations + excluded.recommendations
+"""
+
+
+def recommendation_event(source, category, material_id, candidates, cost, co2, mean_cost, mean_co2, ts=None):
+    return {
+        "ts": time.time() if ts is None else ts,
+        "source": source,
+        "category": category,
+        "material_id": str(material_id),
+        "candidates": int(candidates),
+        "predicted_cost": float(cost),
+        "predicted_co2": float(co2),
+        "co2_avoided": float(mean_co2 - co2),
+        "cost_delta": float(cost - mean_cost),
+    }
+
+
+def bucket_start(ts, granularity):
+    seconds = GRANULARITIES[granularity]
+    return int(ts // seconds) * seconds
+
+
+def time_range(granularity, since=None, until=None):
+    """
+    [since, until) widened to whole `granularity` buckets: since rounds down
+    to its bucket start, until up to the next bucket boundary (exclusive), so
+    until=now still includes the current bucket. Rollup reads and exports use
+    the same range, so they cover the same events.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of {sorted(GRANULARITIES)}")
+    seconds = GRANULARITIES[granularity]
+    return (
+        None if since is None else bucket_start(since, granularity),
+        None if until is None else int(-(-until // seconds)) * seconds,
+    )
+
+
+class AnalyticsStore:
+    export_columns = EXPORT_COLUMNS
+
+    def __init__(self, path, max_queue=10_000, batch_size=500, flush_interval=0.5):
+        self.path = Path(path)
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.written = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._readers = threading.local()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with sqlite3.connect(self.path) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        conn.close()
+
+    # Writing
+
+    def record(self, event):
+        """Non-blocking: the event is queued for the writer thread, or dropped if the queue is full."""
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="analytics-writer", daemon=True)
+            self._thread.start()
+        return self
+
+    def after_fork(self):
+        """Call in a forked worker (gunicorn post_fork): the writer thread and queue lock are not inherited safely."""
+        self._queue = queue.Queue(maxsize=self.max_queue)
+        self._readers = threading.local()
+        self._thread = None
+        return self.start()
+
+    def flush(self, timeout=10):
+        """Waits until every queued event is written (tests, shutdown)."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def _run(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get(timeout=max(0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            try:
+                self.write_batch(conn, batch)
+                self.written += len(batch)
+            except sqlite3.Error as e:
+                print(f"Analytics write failed, {len(batch)} events lost: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    @staticmethod
+    def write_batch(conn, events):
+        """Appends `events` and folds them into the rollups, in one transaction."""
+        rollups = defaultdict(lambda: [0, 0.0, 0.0])
+        usage = Counter()
+        for event in events:
+            for granularity in GRANULARITIES:
+                key = (granularity, bucket_start(event["ts"], granularity), event["category"])
+                totals = rollups[key]
+                totals[0] += 1
+                totals[1] += event["co2_avoided"]
+                totals[2] += event["cost_delta"]
+                usage[key + (event["material_id"],)] += 1
+
+        with conn:
+            conn.executemany(
+                f"INSERT INTO events ({', '.join(EVENT_FIELDS)}) VALUES ({', '.join('?' * len(EVENT_FIELDS))})",
+                [[event[field] for field in EVENT_FIELDS] for event in events]
+            )
+            conn.executemany(UPSERT_ROLLUP, [key + tuple(totals) for key, totals in rollups.items()])
+            conn.executemany(UPSERT_USAGE, [key + (count,) for key, count in usage.items()])
+
+    def rebuild_rollups(self):
+        """Recomputes every rollup from the event log (after changing how events are aggregated)."""
+        with sqlite3.connect(self.path, timeout=30) as conn:
+            conn.execute("DELETE FROM rollups")
+            conn.execute("DELETE FROM material_usage")
+            for granularity, seconds in GRANULARITIES.items():
+                bucket = f"CAST(ts / {seconds} AS INTEGER) * {seconds}"
+                conn.execute(
+                    f"INSERT INTO rollups SELECT ?, {bucket}, category, COUNT(*), SUM(co2_avoided), SUM(cost_delta) "
+                    f"FROM events GROUP BY {bucket}, category", (granularity,)
+                )
+                conn.execute(
+                    f"INSERT INTO material_usage SELECT ?, {bucket}, category, material_id, COUNT(*) "
+                    f"FROM events GROUP BY {bucket}, category, material_id", (granularity,)
+                )
+        conn.close()
+
+    # Reading (rollups only)
+
+    def _reader(self):
+        conn = getattr(self._readers, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, timeout=5, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            self._readers.conn = conn
+        return conn
+
+    @staticmethod
+    def _where(granularity, since, until, category):
+        since, until = time_range(granularity, since, until)
+        clauses, params = ["granularity = ?"], [granularity]
+        if since is not None:
+            clauses.append("bucket >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("bucket < ?")
+            params.append(until)
+        if category is not None:
+            clauses.append("category = ?")
+            params.append(category)
+        return " AND ".join(clauses), params
+
+    def rollup(self, granularity="day", since=None, until=None, category=None):
+        where, params = self._where(granularity, since, until, category)
+        rows = self._reader().execute(
+            f"SELECT bucket, category, recommendations, co2_avoided, cost_delta FROM rollups "
+            f"WHERE {where} ORDER BY bucket, category", params
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def series(self, metric, granularity="day", since=None, until=None, category=None):
+        """
+        One metric of the rollups pivoted for a chart:
+        {"buckets": [epoch seconds...], "series": {category: [value per bucket]}}
+        """
+        rows = self.rollup(granularity, since, until, category)
+        buckets = sorted({row["bucket"] for row in rows})
+        position = {bucket: i for i, bucket in enumerate(buckets)}
+        series = defaultdict(lambda: [0] * len(buckets))
+        for row in rows:
+            series[row["category"]][position[row["bucket"]]] = row[metric]
+        return {"metric": metric, "granularity": granularity, "buckets": buckets, "series": dict(series)}
+
+    def material_usage(self, granularity="day", since=None, until=None, category=None, top=10):
+        where, params = self._where(granularity, since, until, category)
+        rows = self._reader().execute(
+            f"SELECT material_id, SUM(recommendations) AS recommendations FROM material_usage "
+            f"WHERE {where} GROUP BY material_id ORDER BY recommendations DESC, material_id LIMIT ?", params + [top]
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def iter_events(self, since=None, until=None, category=None, granularity="day", batch_size=5000):
+        """
+        Event log rows (tuples of EXPORT_COLUMNS) in id order, for exports, over
+        the same time_range as rollup() with that granularity. Read in
+        keyset-paginated batches on a connection of its own: memory stays at
+        one batch, and no read transaction is held open for the whole export
+        (which would stop WAL checkpoints).
+        """
+        # Not a generator itself, so a bad granularity raises before any row is streamed
+        since, until = time_range(granularity, since, until)
+        return self._iter_events(since, until, category, batch_size)
+
+    def _iter_events(self, since, until, category, batch_size):
+        clauses, params = ["id > ?"], []
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("ts < ?")
+            params.append(until)
+        if category is not None:
+            clauses.append("category = ?")
+            params.append(category)
+        sql = f"SELECT {', '.join(EXPORT_COLUMNS)} FROM events WHERE {' AND '.join(clauses)} ORDER BY id LIMIT ?"
+
+        conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, timeout=5)
+        try:
+            last_id = 0
+            while True:
+                batch = conn.execute(sql, [last_id] + params + [batch_size]).fetchall()
+                yield from batch
+                if len(batch) < batch_size:
+                    return
+                last_id = batch[-1][0]
+        finally:
+            conn.close()
+
+    def stats(self):
+        return {"queued": self._queue.qsize(), "written": self.written, "dropped": self.dropped}
@@ -1,11 +1,12 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, g, request, jsonify, send_from_directory, stream_with_context
 from flask_cors import CORS
 import pandas as pd
 import numpy as np
-import joblib
 import os
-import psycopg2
-from psycopg2.extras import RealDictCursor
+import sys
+import json
+import time
+from pathlib import Path
 
 import google.generativeai as genai
 import os
@@ -13,9 +14,55 @@ from dotenv import load_dotenv
 
 load_dotenv() # Load variables from .env file
 
+# The project root, for the src/ modules, api/ blueprints and dashboard/ charts. Everything is
+# imported through the src package (as gunicorn loads src.app): importing a module under two
+# names would give two copies of it, e.g. two shared recommenders each loading the models.
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR))
+
+from src.models.catalog_filter import CatalogFilterEngine
+from src.data_pipeline.catalog_provider import CatalogProvider, CsvCatalogSource, PostgresCatalogSource
+from src.models.recommender import DEFAULT_WEIGHTS, batch_top_k, composite_scores, get_recommender, top_k_indices
+from src.ai_insights import GeminiInsightBackend, InsightService, StubInsightBackend, build_prompt, insight_key
+from src.instrumentation import SamplingProfiler, metrics
+from src.analytics import AnalyticsStore, recommendation_event
+from src.response_cache import ResponseCache, request_key
+from src.request_control import AdmissionController, SharedSingleFlight, SingleFlight
+from api.routes.analytics import analytics_bp
+
 # Configuration
-ARTIFACTS_DIR = 'models_artifacts'
-DATA_PATH = 'data/feature_engineered_materials.csv'
+# CATALOG_CSV serves that file directly instead of trying the database first (benchmarks, local runs)
+CATALOG_CSV = os.getenv('CATALOG_CSV')
+DATA_PATH = CATALOG_CSV or 'data/feature_engineered_materials.csv'
+DB_CONFIG = {
+    "host": os.getenv('DB_HOST', 'localhost'),
+    "port": os.getenv('DB_PORT', '5432'),
+    "database": os.getenv('DB_NAME', 'echo_pack'),
+    "user": os.getenv('DB_USER', 'postgres'),
+    "password": os.getenv('DB_PASSWORD', '123456')
+}
+CATALOG_VERSION_COLUMN = os.getenv('CATALOG_VERSION_COLUMN', 'updated_at')
+CATALOG_REFRESH_SECONDS = float(os.getenv('CATALOG_REFRESH_SECONDS', 60))
+TOP_N = 10
+# /api/recommend modes: "rank" (weighted composite score, top TOP_N) or "pareto" (every non-dominated candidate)
+RECOMMEND_MODES = ("rank", "pareto")
+# Batch requests are evaluated in chunks of at most this many requirement x catalog cells
+BATCH_MAX_CELLS = 2_000_000
+BATCH_MAX_CHUNK = 1024
+# METRICS_PROFILING=1 allows ?profile=1 on any request (sampling profiler, see /api/metrics/profiles/<id>)
+PROFILING_ENABLED = os.getenv('METRICS_PROFILING') == '1'
+ANALYTICS_DB = os.getenv('ANALYTICS_DB', str(BASE_DIR / 'data' / 'analytics.db'))
+RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', 4096))
+RESPONSE_CACHE_TTL = float(os.getenv('RESPONSE_CACHE_TTL', 300))
+# SINGLE_FLIGHT_DIR (e.g. /dev/shm/ecopack) also coalesces identical requests across the gunicorn workers
+SINGLE_FLIGHT_DIR = os.getenv('SINGLE_FLIGHT_DIR')
+# Admission control for the recommendation endpoints, per process: beyond ADMISSION_MAX_IN_FLIGHT
+# concurrent requests (after waiting ADMISSION_MAX_WAIT_MS for a slot), or when the front proxy's
+# X-Request-Start shows more than ADMISSION_MAX_QUEUE_MS of queueing, requests get a 429
+ADMISSION_ENDPOINTS = {'/api/recommend', '/api/recommend/batch'}
+ADMISSION_MAX_IN_FLIGHT = int(os.getenv('ADMISSION_MAX_IN_FLIGHT', 32))
+ADMISSION_MAX_WAIT_MS = float(os.getenv('ADMISSION_MAX_WAIT_MS', 50))
+ADMISSION_MAX_QUEUE_MS = os.getenv('ADMISSION_MAX_QUEUE_MS')
 
 # Configure Gemini
 # In a real dep, use: os.getenv('GEMINI_API_KEY')
@@ -26,106 +73,178 @@ if GEMINI_KEY:
 else:
     print("Warning: GEMINI_API_KEY not found in environment variables. AI Insights will be disabled.")
 
-class PackagingRecommender:
-    def __init__(self):
-        self.preprocessor = joblib.load(os.path.join(ARTIFACTS_DIR, 'preprocessor.pkl'))
-        self.cost_model = joblib.load(os.path.join(ARTIFACTS_DIR, 'cost_model.pkl'))
-        self.co2_model = joblib.load(os.path.join(ARTIFACTS_DIR, 'co2_model.pkl'))
-        
-    def predict_metrics(self, df):
-        # Transform features
-        # We need to ensure the dataframe matches the training structure
-        X_processed = self.preprocessor.transform(df)
-        
-        predicted_cost = self.cost_model.predict(X_processed)
-        predicted_co2 = self.co2_model.predict(X_processed)
-        
-        return predicted_cost, predicted_co2
-
-    def rank_materials(self, df, preferred_category=None, weights={'sustainability': 0.4, 'cost': 0.3, 'co2': 0.3}):
-        """
-        Ranks materials based on Sustainability Score, Predicted Cost, and Predicted CO2.
-        """
-        # Filter by category if provided and it exists in the data
-        # Note: 'material_type' is a feature, but maybe 'category' implies a broader filter?
-        # The prompt asks for "product category" input, but our dataset has 'material_type'.
-        # We will assume the user might want to filter by valid material types if they specify one,
-        # OR we just rank everything suitable for the use-case.
-        # For this milestone, we'll rank the provided dataframe (which represents our catalog).
-        
-        # Get predictions
-        pred_cost, pred_co2 = self.predict_metrics(df)
-        
-        df = df.copy()
-        df['predicted_cost'] = pred_cost
-        df['predicted_co2'] = pred_co2
-        
-        # Normalize to 0-1 range for fair weighting
-        # Sustainability (Higher is better)
-        sus_min = df['sustainability_score'].min()
-        sus_max = df['sustainability_score'].max()
-        sus_denom = sus_max - sus_min if sus_max != sus_min else 1
-        
-        sus_norm = (df['sustainability_score'] - sus_min) / sus_denom
-                   
-        # Cost (Lower is better) -> Invert
-        cost_min = df['predicted_cost'].min()
-        cost_max = df['predicted_cost'].max()
-        cost_denom = cost_max - cost_min if cost_max != cost_min else 1
-        
-        cost_norm = (df['predicted_cost'] - cost_min) / cost_denom
-        cost_score = 1 - cost_norm
-        
-        # CO2 (Lower is better) -> Invert
-        co2_min = df['predicted_co2'].min()
-        co2_max = df['predicted_co2'].max()
-        co2_denom = co2_max - co2_min if co2_max != co2_min else 1
-        
-        co2_norm = (df['predicted_co2'] - co2_min) / co2_denom
-        co2_score = 1 - co2_norm
-        
-        # Calculate Composite Score
-        df['rank_score'] = (
-            weights['sustainability'] * sus_norm + 
-            weights['cost'] * cost_score + 
-            weights['co2'] * co2_score
-        )
-        
-        # Sort
-        ranked_df = df.sort_values(by='rank_score', ascending=False)
-        return ranked_df
+# AI insights are generated on a background pool and cached, never inside the request.
+# INSIGHT_BACKEND=stub switches to the local stub backend for testing.
+if os.getenv('INSIGHT_BACKEND') == 'stub':
+    insight_service = InsightService(StubInsightBackend(), stage_timer=metrics.stage)
+elif GEMINI_KEY:
+    insight_service = InsightService(GeminiInsightBackend(), stage_timer=metrics.stage)
+else:
+    insight_service = None
+if insight_service:
+    metrics.register_cache('insights', insight_service.stats)
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for frontend integration
 
-# Initialize Recommender
-recommender = PackagingRecommender()
+# Served recommendations are queued to a background writer that keeps the hourly/daily
+# rollups the dashboard charts read (/api/analytics/...), off the request path.
+analytics_store = AnalyticsStore(ANALYTICS_DB).start()
+app.extensions['analytics_store'] = analytics_store
+app.register_blueprint(analytics_bp, url_prefix='/api')
+
+# Initialize Recommender (shared core, models loaded and warmed up once per process;
+# with gunicorn preload_app that is once in the master, shared copy-on-write by the workers)
+recommender = get_recommender()
+recommender.warm_up()
+recommender.stage_timer = metrics.stage
 
 # Load Data (Catalog)
-# In a real scenario, we might fetch this from DB.
-# We will implement a function to try DB, else CSV.
-def get_catalog_data():
-    # Try Database Connection
+# Pooled DB source (ml.material_features) if reachable, else the CSV file.
+def create_catalog_source():
+    if CATALOG_CSV:
+        print(f"Loading data from {CATALOG_CSV}.")
+        return CsvCatalogSource(CATALOG_CSV)
     try:
-        conn = psycopg2.connect(
-            host="localhost",
-            port="5432",
-            database="echo_pack",
-            user="postgres",
-            password="123456"
-        )
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute("SELECT * FROM ml.material_features") 
-        data = cur.fetchall()
-        df = pd.DataFrame(data)
-        conn.close()
-        print("Loaded data from Database (ml.material_features).")
-        return df
+        source = PostgresCatalogSource(DB_CONFIG, version_column=CATALOG_VERSION_COLUMN)
+        print("Loading data from Database (ml.material_features).")
+        return source
     except Exception as e:
         print(f"Database connection failed: {e}. Falling back to CSV.")
-        return pd.read_csv(DATA_PATH)
+        return CsvCatalogSource(DATA_PATH)
+
+# Predictions are static per material, so they are computed when a snapshot is built, never per request.
+# The background refresher swaps in new snapshots as the catalog changes.
+catalog_provider = CatalogProvider(create_catalog_source(), recommender.index_catalog, CatalogFilterEngine)
+catalog_provider.refresh()
+# Build the skyline index (mode=pareto) up front; later snapshots then update it incrementally
+catalog_provider.snapshot.filter_engine.skyline
+catalog_provider.start(CATALOG_REFRESH_SECONDS)
+
+# Serialized /api/recommend responses per canonical request, dropped whenever the
+# catalog snapshot or the loaded models change
+response_cache = ResponseCache(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL)
+metrics.register_cache('responses', response_cache.stats)
+single_flight = SharedSingleFlight(SINGLE_FLIGHT_DIR) if SINGLE_FLIGHT_DIR else SingleFlight()
+metrics.register_cache('single_flight', single_flight.stats)
+admission = AdmissionController(
+    ADMISSION_MAX_IN_FLIGHT,
+    ADMISSION_MAX_WAIT_MS / 1000,
+    float(ADMISSION_MAX_QUEUE_MS) / 1000 if ADMISSION_MAX_QUEUE_MS else None
+)
+
+def analytics_inputs(filter_engine, top, mean_cost, mean_co2, candidates):
+    """
+    The analytics inputs for the recommended (best) row `top`, as plain values:
+    row positions only mean something in this process's snapshot, while these
+    are shared with other workers (single flight) and reused from the cache.
+    """
+    return (
+        str(filter_engine.columns['material_id'][top]),
+        float(filter_engine.columns['predicted_cost'][top]),
+        float(filter_engine.columns['predicted_co2'][top]),
+        float(mean_cost),
+        float(mean_co2),
+        int(candidates)
+    )
+
+def record_recommendation(source, data, material_id, cost, co2, mean_cost, mean_co2, candidates):
+    """Queues an analytics event for the recommended material; never blocks the request."""
+    app.extensions['analytics_store'].record(recommendation_event(
+        source,
+        str(data.get('category', 'General')),
+        material_id,
+        candidates,
+        cost,
+        co2,
+        mean_cost,
+        mean_co2
+    ))
+
+def conditional_response(entry):
+    """A cached /api/recommend body, or 304 when the client already holds it (If-None-Match)."""
+    if request.if_none_match.contains(entry.etag):
+        response = Response(status=304)
+    else:
+        response = Response(entry.body, mimetype='application/json')
+    response.set_etag(entry.etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def parse_requirements(data):
+    weight_req = float(data.get('weight_capacity_kg', 0))
+    strength_req = float(data.get('strength', 0))
+    water_res_req = int(data.get('water_resistance', 0)) # 0 or 1
+    return weight_req, strength_req, water_res_req
+
+def format_recommendations(filter_engine, top, rank_score):
+    """Response items for catalog rows `top` (best first), built from array slices. rank_score may be None (pareto)."""
+    if rank_score is None:
+        rank_score = [None] * len(top)
+    results = []
+    for material_id, name, strength, capacity, cost, co2, sus, score in zip(
+        filter_engine.take(top, 'material_id'),
+        filter_engine.take(top, 'material_type'),
+        filter_engine.take(top, 'strength'),
+        filter_engine.take(top, 'weight_capacity_kg'),
+        filter_engine.take(top, 'predicted_cost'),
+        filter_engine.take(top, 'predicted_co2'),
+        filter_engine.take(top, 'sustainability_score'),
+        rank_score
+    ):
+        results.append({
+            "material_id": material_id,
+            "material_name": name,
+            "predicted_cost": round(float(cost), 2),
+            "predicted_co2": round(float(co2), 2),
+            "sustainability_score": float(sus),
+            "rank_score": round(float(score), 4) if score is not None else None,
+            "description": f"Strength: {strength}, Max Load: {capacity}kg"
+        })
+    return results
+
+@app.before_request
+def start_request_metrics():
+    g.request_start = time.perf_counter()
+    g.metrics_endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    metrics.request_started(g.metrics_endpoint)
+    if PROFILING_ENABLED and request.args.get('profile') == '1':
+        g.profiler = SamplingProfiler().start()
+
+@app.before_request
+def admit_request():
+    if g.metrics_endpoint not in ADMISSION_ENDPOINTS:
+        return None
+    if not admission.try_acquire(request.headers.get('X-Request-Start')):
+        response = jsonify({"error": "Server is overloaded, retry shortly"})
+        response.status_code = 429
+        response.headers['Retry-After'] = '1'
+        return response
+    g.admitted = True
+
+@app.after_request
+def release_admission(response):
+    if g.pop('admitted', False):
+        if response.is_streamed:
+            response.call_on_close(admission.release)
+        else:
+            admission.release()
+    return response
 
-catalog_df = get_catalog_data()
+@app.after_request
+def finish_request_metrics(response):
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        response.headers['X-Profile-Id'] = metrics.add_profile(profiler.stop().collapsed())
+
+    start, endpoint, method, status = g.request_start, g.metrics_endpoint, request.method, response.status_code
+    finish = lambda: metrics.request_finished(endpoint, method, status, time.perf_counter() - start)
+    if response.is_streamed:
+        # Streamed bodies (batch NDJSON) are recorded once fully sent, when the server closes the response
+        response.call_on_close(finish)
+    else:
+        finish()
+    return response
 
 @app.route('/')
 def home():
@@ -139,6 +258,96 @@ def static_files(path):
 def health_check():
     return jsonify({"status": "healthy", "service": "EcoPackAI Backend"})
 
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus text format: stage/request latency histograms, counters, in-flight requests, cache ratios."""
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/api/metrics/profiles/<profile_id>', methods=['GET'])
+def get_profile(profile_id):
+    """Collapsed stacks of a ?profile=1 request (flamegraph.pl / speedscope input)."""
+    stacks = metrics.profiles.get(profile_id)
+    if stacks is None:
+        return jsonify({"error": "Unknown profile_id"}), 404
+    return Response(stacks, mimetype='text/plain')
+
+def compute_recommendation(filter_engine, weight_req, strength_req, water_res_req, mode="rank"):
+    """
+    Filters, ranks (or takes the Pareto front), formats and serializes one /api/recommend response.
+    Returns (body, event, final): `event` holds the analytics_inputs of the
+    top row (None without candidates), `final` is False while the AI insight
+    may still change.
+    """
+    # Filter Logic: binary search on the sorted constraint indexes, no DataFrame copy
+    with metrics.stage('filter'):
+        rows = filter_engine.query(
+            weight_capacity_kg=weight_req,
+            strength=strength_req,
+            water_resistant=water_res_req == 1
+        )
+
+    if rows.size == 0:
+        body = jsonify({"message": "No materials found matching requirements", "recommendations": []}).get_data()
+        return body, None, True
+
+    cost = filter_engine.take(rows, 'predicted_cost')
+    co2 = filter_engine.take(rows, 'predicted_co2')
+    if mode == "pareto":
+        # Non-dominated candidates (sustainability up, cost and CO2 down) from the snapshot's skyline index,
+        # by sustainability, then cost, then CO2
+        with metrics.stage('pareto'):
+            top = filter_engine.skyline.query(weight_req, strength_req, water_res_req == 1)
+        top_score = None
+    else:
+        # Rank candidates
+        with metrics.stage('rank'):
+            rank_score = composite_scores(
+                filter_engine.take(rows, 'sustainability_score'),
+                cost,
+                co2,
+                DEFAULT_WEIGHTS
+            )
+            order = top_k_indices(rank_score, TOP_N)
+            top, top_score = rows[order], rank_score[order]
+    event = analytics_inputs(filter_engine, top[0], cost.mean(), co2.mean(), rows.size)
+
+    # Format response
+    with metrics.stage('format'):
+        results = format_recommendations(filter_engine, top, top_score)
+    top_materials_context = [
+        f"{r['material_name']} (Cost: {r['predicted_cost']}, CO2: {r['predicted_co2']}, Score: {r['sustainability_score']})"
+        for r in results[:3]
+    ]
+
+    # AI Insight: cached text, or an insight_id to poll at /api/insights/<insight_id>
+    ai_insight = "Gemini API Key missing. Enable to see AI insights."
+    insight = {"insight_id": None, "status": "disabled"}
+    if insight_service and top_materials_context:
+        with metrics.stage('insight_lookup'):
+            insight = insight_service.request(
+                insight_key(
+                    {"weight_capacity_kg": weight_req, "strength": strength_req, "water_resistance": water_res_req},
+                    [r['material_id'] for r in results]
+                ),
+                build_prompt(weight_req, strength_req, top_materials_context)
+            )
+        ai_insight = insight["text"] if insight["status"] != "pending" else "AI insight is being generated."
+
+    payload = {
+        "count": len(results),
+        "ai_insight": ai_insight,
+        "ai_insight_id": insight["insight_id"],
+        "ai_insight_status": insight["status"],
+        "recommendations": results
+    }
+    if mode == "pareto":
+        payload["mode"] = mode
+    with metrics.stage('serialize'):
+        response = jsonify(payload)
+
+    # Pending (or failed, retried later) insights change on a later request, so only final responses are cached
+    return response.get_data(), event, insight["status"] in ("disabled", "ready")
+
 @app.route('/api/recommend', methods=['POST'])
 def recommend():
     try:
@@ -166,74 +375,136 @@ def recommend():
         
         # Let's Implement: Filter Catalog -> Rank.
         
-        weight_req = float(data.get('weight_capacity_kg', 0))
-        strength_req = float(data.get('strength', 0))
-        water_res_req = int(data.get('water_resistance', 0)) # 0 or 1
+        weight_req, strength_req, water_res_req = parse_requirements(data)
+        mode = request.args.get('mode') or data.get('mode', 'rank')
+        if mode not in RECOMMEND_MODES:
+            return jsonify({"error": f"mode must be one of {list(RECOMMEND_MODES)}"}), 400
         
-        # Filter Logic
-        filtered_df = catalog_df.copy()
-        
-        # Filter by capacity (Allowing some buffer or strict?) -> Strict for validated safety
-        if weight_req > 0:
-            filtered_df = filtered_df[filtered_df['weight_capacity_kg'] >= weight_req]
-            
-        if strength_req > 0:
-            filtered_df = filtered_df[filtered_df['strength'] >= strength_req]
-            
-        if water_res_req == 1:
-            # Assuming water_resistance is 0/1 or similar.
-            # Check data type
-            filtered_df = filtered_df[filtered_df['water_resistance'] >= 1]
-
-        if filtered_df.empty:
-            return jsonify({"message": "No materials found matching requirements", "recommendations": []})
+        snapshot = catalog_provider.snapshot
+        filter_engine = snapshot.filter_engine
 
-        # Rank candidates
-        ranked_df = recommender.rank_materials(filtered_df)
-        
-        # Format response
-        results = []
-        top_materials_context = []
-        
-        for index, row in ranked_df.head(10).iterrows():
-            item_desc = f"{row.get('material_type', 'Unknown')} (Cost: {round(row['predicted_cost'], 2)}, CO2: {round(row['predicted_co2'], 2)}, Score: {row.get('sustainability_score', 0)})"
-            if len(top_materials_context) < 3:
-                top_materials_context.append(item_desc)
-                
-            results.append({
-                "material_id": row.get('material_id', 'N/A'),
-                "material_name": row.get('material_type', 'Unknown'),
-                "predicted_cost": round(row['predicted_cost'], 2),
-                "predicted_co2": round(row['predicted_co2'], 2),
-                "sustainability_score": row.get('sustainability_score', 0),
-                "rank_score": round(row['rank_score'], 4),
-                "description": f"Strength: {row.get('strength')}, Max Load: {row.get('weight_capacity_kg')}kg"
-            })
-            
-        # Generate AI Insight
-        ai_insight = "Gemini API Key missing. Enable to see AI insights."
-        if GEMINI_KEY and top_materials_context:
-            try:
-                model = genai.GenerativeModel('gemini-1.5-flash')
-                prompt = (
-                    f"You are an expert in sustainable packaging. "
-                    f"The user needs packaging for a product weighing {weight_req}kg with strength {strength_req}. "
-                    f"Our system recommended these top 3 materials based on Cost, CO2, and Sustainability: {'; '.join(top_materials_context)}. "
-                    f"Provide a brief, professional summary (max 2 sentences) explaining WHY these are good sustainability choices."
-                )
-                response = model.generate_content(prompt)
-                ai_insight = response.text
-            except Exception as e:
-                ai_insight = f"AI Insight unavailable: {str(e)}"
-
-        return jsonify({
-            "count": len(results),
-            "ai_insight": ai_insight,
-            "recommendations": results
-        })
+        # Identical requirements against the same catalog snapshot and models give the same response
+        cache_key = request_key(weight_req, strength_req, water_res_req, mode)
+        cache_version = (snapshot.version, recommender.model_version)
+        with metrics.stage('cache_lookup'):
+            cached = response_cache.get(cache_key, cache_version)
+        if cached is not None:
+            if cached.event is not None:
+                record_recommendation('recommend', data, *cached.event)
+            return conditional_response(cached)
+
+        # Concurrent identical requests (traffic spikes) wait for one computation and share it
+        (body, event, final), _ = single_flight.do(
+            (cache_key, cache_version),
+            lambda: compute_recommendation(filter_engine, weight_req, strength_req, water_res_req, mode)
+        )
+        if event is not None:
+            record_recommendation('recommend', data, *event)
+        if final:
+            return conditional_response(response_cache.put(cache_key, cache_version, body, event))
+        return Response(body, mimetype='application/json')
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/insights/<insight_id>', methods=['GET'])
+def get_insight(insight_id):
+    """Poll a pending AI insight; ?wait=<seconds> long-polls for up to 30s."""
+    if insight_service is None:
+        return jsonify({"error": "AI insights are disabled"}), 404
+
+    wait = min(float(request.args.get('wait', 0)), 30)
+    insight = insight_service.get(insight_id, wait=wait)
+    if insight is None:
+        return jsonify({"error": "Unknown or expired insight_id"}), 404
+    return jsonify(insight)
+
+def evaluate_batch(filter_engine, items, start_index):
+    """
+    Evaluates one chunk of requirement sets with a single vectorized filter and
+    rank pass over the shared catalog matrix, yielding one NDJSON line per item.
+    """
+    positions, requirements, parsed, errors = [], [], [], {}
+    for i, item in enumerate(items):
+        try:
+            if isinstance(item, (str, bytes)):
+                item = json.loads(item)
+            requirements.append(parse_requirements(item))
+            parsed.append(item)
+            positions.append(i)
+        except Exception as e:
+            errors[i] = str(e)
+
+    ranked = {}
+    if requirements:
+        weight_req, strength_req, water_res_req = zip(*requirements)
+        with metrics.stage('batch_filter'):
+            mask = filter_engine.query_batch(weight_req, strength_req, [w == 1 for w in water_res_req])
+        with metrics.stage('batch_rank'):
+            top_k = batch_top_k(
+                mask,
+                filter_engine.columns['sustainability_score'],
+                filter_engine.columns['predicted_cost'],
+                filter_engine.columns['predicted_co2'],
+                DEFAULT_WEIGHTS,
+                TOP_N
+            )
+        with metrics.stage('batch_format'):
+            for i, (top, scores) in zip(positions, top_k):
+                ranked[i] = format_recommendations(filter_engine, top, scores)
+
+        # Candidate means for the analytics events, one matrix product for the whole chunk
+        counts = mask.sum(axis=1)
+        mean_cost = mask @ filter_engine.columns['predicted_cost'] / np.maximum(counts, 1)
+        mean_co2 = mask @ filter_engine.columns['predicted_co2'] / np.maximum(counts, 1)
+        for j, (item, (top, _)) in enumerate(zip(parsed, top_k)):
+            if counts[j]:
+                record_recommendation('batch', item, *analytics_inputs(
+                    filter_engine, top[0], mean_cost[j], mean_co2[j], counts[j]
+                ))
+
+    for i in range(len(items)):
+        if i in errors:
+            line = {"index": start_index + i, "error": errors[i]}
+        elif not ranked[i]:
+            line = {"index": start_index + i, "message": "No materials found matching requirements", "recommendations": []}
+        else:
+            line = {"index": start_index + i, "count": len(ranked[i]), "recommendations": ranked[i]}
+        yield json.dumps(line) + "\n"
+
+@app.route('/api/recommend/batch', methods=['POST'])
+def recommend_batch():
+    """
+    Bulk recommendations for SKU onboarding. Accepts a JSON array of requirement
+    objects (or {"items": [...]}) or an NDJSON stream (application/x-ndjson),
+    and streams back one NDJSON result line per item, in input order.
+    """
+    if request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+        items = (line for line in request.stream if line.strip())
+    else:
+        data = request.get_json(silent=True)
+        if isinstance(data, dict):
+            data = data.get('items')
+        if not isinstance(data, list):
+            return jsonify({"error": "Expected a JSON array of requirement objects or an NDJSON body"}), 400
+        items = iter(data)
+
+    # The whole batch is evaluated against one snapshot, even if a refresh lands mid-stream
+    filter_engine = catalog_provider.snapshot.filter_engine
+    chunk_size = max(1, min(BATCH_MAX_CHUNK, BATCH_MAX_CELLS // max(filter_engine.size, 1)))
+
+    def generate():
+        chunk, start_index = [], 0
+        for item in items:
+            chunk.append(item)
+            if len(chunk) == chunk_size:
+                yield from evaluate_batch(filter_engine, chunk, start_index)
+                start_index += len(chunk)
+                chunk = []
+        if chunk:
+            yield from evaluate_batch(filter_engine, chunk, start_index)
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
@@ -8,10 +8,7 @@ PRODUCT_DATA = BASE_DIR / "data" / "final" / "ml_dataset.csv"
 MATERIAL_DATA = BASE_DIR / "data" /"processed" / "cleaned_material_data.csv"
 OUTPUT_PATH = BASE_DIR / "data" / "final" / "ml_dataset_with_sustainability_score.csv"
 
-def build_ml_dataset():
-    products = pd.read_csv(PRODUCT_DATA)
-    materials = pd.read_csv(MATERIAL_DATA)
-
+def compute_ml_dataset(products, materials):
     df = products.merge(materials, on="material_id", how="left")
 
     # 🔧 Handle missing values
@@ -32,8 +29,13 @@ def build_ml_dataset():
 
     # Cleanup
     df = df.drop(columns=["material_id", "recyclability_norm"])
+    return df
+
+def build_ml_dataset():
+    products = pd.read_csv(PRODUCT_DATA)
+    materials = pd.read_csv(MATERIAL_DATA)
 
-    df.to_csv(OUTPUT_PATH, index=False)
+    compute_ml_dataset(products, materials).to_csv(OUTPUT_PATH, index=False)
     print("Sustainability score computed successfully")
 
 if __name__ == "__main__":
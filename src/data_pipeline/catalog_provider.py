@@ -0,0 +1,196 @@
+import sqlite3
+import threading
+from collections import namedtuple
+from pathlib import Path
+
+import pandas as pd
+
+CatalogSnapshot = namedtuple("CatalogSnapshot", ["version", "catalog_df", "filter_engine"])
+
+
+class SqlCatalogSource:
+    """
+    Reads the material catalog from a SQL table. With a version column
+    (e.g. updated_at) refreshes are incremental: only rows whose version is
+    at least the current snapshot's are fetched. Rows at exactly that version
+    are fetched again, since a transaction can commit one with the same
+    updated_at after the snapshot was taken; the provider's merge replaces
+    them by material_id.
+    """
+
+    placeholder = "%s"
+    incremental = True
+
+    def __init__(self, table, version_column="updated_at"):
+        self.table = table
+        self.version_column = version_column
+
+    def _query(self, sql, params=()):
+        raise NotImplementedError
+
+    def current_version(self):
+        rows = self._query(f"SELECT MAX({self.version_column}) AS version FROM {self.table}")
+        return rows[0]["version"]
+
+    def fetch(self, since=None):
+        if since is None:
+            return pd.DataFrame(self._query(f"SELECT * FROM {self.table}"))
+        return pd.DataFrame(self._query(
+            f"SELECT * FROM {self.table} WHERE {self.version_column} >= {self.placeholder}", (since,)
+        ))
+
+
+class PostgresCatalogSource(SqlCatalogSource):
+    """
+    PostgreSQL source backed by a psycopg2 connection pool. If the table has no
+    version column, the version is a content fingerprint and refreshes reload
+    the whole table when it changes.
+    """
+
+    def __init__(self, db_config, table="ml.material_features", version_column="updated_at", minconn=1, maxconn=4):
+        from psycopg2 import Error
+        from psycopg2.pool import ThreadedConnectionPool
+
+        super().__init__(table, version_column)
+        self._pool_args = (minconn, maxconn, db_config)
+        self.pool = ThreadedConnectionPool(minconn, maxconn, **db_config)
+        try:
+            self.current_version()
+        except Error:
+            print(f"{table} has no {version_column} column, refreshes will reload the full table on change.")
+            self.version_column = None
+            self.incremental = False
+
+    def _query(self, sql, params=()):
+        from psycopg2.extras import RealDictCursor
+
+        conn = self.pool.getconn()
+        try:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute(sql, params)
+                rows = cur.fetchall()
+            conn.rollback()  # end the read-only transaction before returning the connection
+            return rows
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.pool.putconn(conn)
+
+    def current_version(self):
+        if self.version_column is None:
+            rows = self._query(f"SELECT md5(string_agg(t::text, '' ORDER BY t::text)) AS version FROM {self.table} t")
+            return rows[0]["version"]
+        return super().current_version()
+
+    def close(self):
+        self.pool.closeall()
+
+    def after_fork(self):
+        # Pooled sockets inherited from the parent must not be shared; open a fresh pool
+        from psycopg2.pool import ThreadedConnectionPool
+
+        minconn, maxconn, db_config = self._pool_args
+        self.pool = ThreadedConnectionPool(minconn, maxconn, **db_config)
+
+
+class SQLiteCatalogSource(SqlCatalogSource):
+    """SQLite stand-in with the same contract, for tests and local development."""
+
+    placeholder = "?"
+
+    def __init__(self, path, table="material_features", version_column="updated_at"):
+        super().__init__(table, version_column)
+        self.path = str(path)
+
+    def _query(self, sql, params=()):
+        conn = sqlite3.connect(self.path)
+        conn.row_factory = sqlite3.Row
+        try:
+            return [dict(row) for row in conn.execute(sql, params).fetchall()]
+        finally:
+            conn.close()
+
+
+class CsvCatalogSource:
+    """File-based source: the version is the file mtime, every change is a full reload."""
+
+    incremental = False
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def current_version(self):
+        return self.path.stat().st_mtime_ns
+
+    def fetch(self, since=None):
+        return pd.read_csv(self.path)
+
+
+class CatalogProvider:
+    """
+    Serves immutable catalog snapshots (indexed catalog + filter engine).
+
+    `refresh()` checks the source version and, when it moved, builds a new
+    snapshot off to the side (only changed rows go through `index_fn`, i.e.
+    model inference) and swaps it in with a single reference assignment.
+    Requests just read `snapshot` and never wait on the database; a background
+    thread started with `start()` keeps it current without a restart.
+    """
+
+    def __init__(self, source, index_fn, engine_cls):
+        self.source = source
+        self.index_fn = index_fn
+        self.engine_cls = engine_cls
+        self.snapshot = None
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def refresh(self):
+        """Returns True if a new snapshot was swapped in."""
+        with self._refresh_lock:
+            current = self.snapshot
+            version = self.source.current_version()
+            if current is not None and version == current.version:
+                return False
+
+            if current is None or not self.source.incremental:
+                catalog_df = self.index_fn(self.source.fetch())
+            else:
+                changed = self.source.fetch(since=current.version).drop_duplicates(subset="material_id", keep="last")
+                if changed.empty:
+                    catalog_df = current.catalog_df
+                else:
+                    indexed = self.index_fn(changed)
+                    kept = current.catalog_df[~current.catalog_df["material_id"].isin(indexed["material_id"])]
+                    catalog_df = pd.concat([kept, indexed], ignore_index=True)
+
+            previous = current.filter_engine if current is not None else None
+            self.snapshot = CatalogSnapshot(version, catalog_df, self.engine_cls(catalog_df, previous=previous))
+            return True
+
+    def start(self, interval_seconds=60):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, args=(interval_seconds,), name="catalog-refresh", daemon=True)
+        self._thread.start()
+
+    def after_fork(self, interval_seconds=60):
+        """Call in a forked worker (gunicorn post_fork): threads and DB sockets are not inherited safely."""
+        self._refresh_lock = threading.Lock()
+        if hasattr(self.source, "after_fork"):
+            self.source.after_fork()
+        self.start(interval_seconds)
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self, interval_seconds):
+        while not self._stop.wait(interval_seconds):
+            try:
+                if self.refresh():
+                    print(f"Catalog refreshed to version {self.snapshot.version} ({len(self.snapshot.catalog_df)} materials).")
+            except Exception as e:
+                # Keep serving the last good snapshot
+                print(f"Catalog refresh failed: {e}")
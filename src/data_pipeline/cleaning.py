@@ -0,0 +1,50 @@
+import pandas as pd
+
+
+def clean_sheet(df):
+    """Drops duplicate rows and normalizes headers ("Weight Capacity" -> "weight_capacity")."""
+    df = df.drop_duplicates()
+    df.columns = df.columns.str.lower().str.replace(" ", "_")
+    return df
+
+
+def clean_material_data(df):
+    return clean_sheet(df)
+
+
+# Weight units accepted in the supplier sheets, in kg. A bare number is taken as kg.
+UNIT_TO_KG = {"": 1.0, "kg": 1.0, "kgs": 1.0, "g": 0.001, "gm": 0.001, "lb": 0.45359237, "lbs": 0.45359237}
+
+_CAPACITY_PATTERN = r"^\s*(?P<value>\d+(?:\.\d+)?)\s*(?P<unit>[a-z]*)\.?\s*$"
+
+
+def parse_capacity_kg(values):
+    """
+    Vectorized "5 kg" / "500 g" / "2.2 lb" / 5 -> capacity in kg (float).
+    Values that do not parse, or carry an unknown unit, become NaN.
+    """
+    parts = pd.Series(values).astype("str").str.lower().str.extract(_CAPACITY_PATTERN)
+    factor = parts["unit"].map(UNIT_TO_KG)
+    return pd.to_numeric(parts["value"], errors="coerce") * factor
+
+
+def clean_category_sheet(df):
+    df = clean_sheet(df)
+    capacity = parse_capacity_kg(df["weight_capacity_upto"])
+
+    invalid = capacity.isna()
+    if invalid.any():
+        examples = df.loc[invalid, "weight_capacity_upto"].head(5).tolist()
+        raise ValueError(f"{invalid.sum()} malformed weight_capacity_upto values, e.g. {examples}")
+
+    # Whole kilograms stay integers, as in the existing processed CSVs
+    if (capacity == capacity.round()).all():
+        capacity = capacity.astype(int)
+    df["weight_capacity_upto"] = capacity.to_numpy()
+    return df
+
+
+def category_output_name(file_name):
+    """"Food Delivery & Takeaway.xlsx" -> "cleaned_food_delivery_and_takeaway.csv"."""
+    output_name = file_name.lower().replace(" ", "_").replace("&", "and").replace(".xlsx", ".csv")
+    return f"cleaned_{output_name}"
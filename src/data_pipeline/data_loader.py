@@ -0,0 +1,58 @@
+import threading
+from collections import namedtuple
+from pathlib import Path
+
+import pandas as pd
+
+CachedDataset = namedtuple("CachedDataset", ["data", "prepared", "version"])
+
+
+class DatasetCache:
+    """
+    Keeps a dataset in memory and reloads it only when its source changes.
+
+    The cache key is the file mtime plus an optional `version_fn()` token (e.g.
+    a DB table version), so edits on disk or in the DB invalidate it without a
+    restart. `prepare` runs once per load to keep a pre-processed copy next to
+    the raw frame (encoded/scaled features), so requests do not redo that work.
+    """
+
+    def __init__(self, path, prepare=None, version_fn=None, loader=pd.read_csv):
+        self.path = Path(path)
+        self.prepare = prepare
+        self.version_fn = version_fn
+        self.loader = loader
+        self.hits = 0
+        self.misses = 0
+        self._entry = None
+        self._lock = threading.Lock()
+
+    def current_version(self):
+        db_version = self.version_fn() if self.version_fn else None
+        return self.path.stat().st_mtime_ns, db_version
+
+    def get(self):
+        version = self.current_version()
+        with self._lock:
+            if self._entry is not None and self._entry.version == version:
+                self.hits += 1
+                return self._entry
+
+            self.misses += 1
+            data = self.loader(self.path)
+            prepared = self.prepare(data.copy()) if self.prepare else None
+            self._entry = CachedDataset(data, prepared, version)
+            return self._entry
+
+    def invalidate(self):
+        with self._lock:
+            self._entry = None
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "version": self._entry.version if self._entry else None,
+        }
@@ -1,20 +1,31 @@
 import pandas as pd
 
-df = pd.read_csv("data/processed/cleaned_material_data.csv")
 
-df["co2_impact_index"] = df["co2_emission_score"] * df["weight_capacity_kg"]
+def add_material_features(df):
+    """Row-local material indices: every output row depends only on its own input row."""
+    df = df.copy()
 
-df["cost_efficiency_index"] = df["weight_capacity_kg"] / df["cost_per_unit_inr"]
+    df["co2_impact_index"] = df["co2_emission_score"] * df["weight_capacity_kg"]
 
-df["material_suitability_score"] = (
-    df["biodegradability_score"] * 0.4 +
-    df["recyclability_percent"] * 0.3 +
-    df["cost_efficiency_index"] * 0.3
-)
+    df["cost_efficiency_index"] = df["weight_capacity_kg"] / df["cost_per_unit_inr"]
 
-df.to_csv(
-    "data/processed/feature_engineered_materials.csv",
-    index=False
-)
+    df["material_suitability_score"] = (
+        df["biodegradability_score"] * 0.4 +
+        df["recyclability_percent"] * 0.3 +
+        df["cost_efficiency_index"] * 0.3
+    )
 
-print("Feature engineering completed")
+    # Catalog ranking score (recommender.index_catalog derives the same when it is missing)
+    df["sustainability_score"] = (df["biodegradability_score"] + df["recyclability_percent"]) / 2
+    return df
+
+
+if __name__ == "__main__":
+    df = pd.read_csv("data/processed/cleaned_material_data.csv")
+
+    add_material_features(df).to_csv(
+        "data/processed/feature_engineered_materials.csv",
+        index=False
+    )
+
+    print("Feature engineering completed")
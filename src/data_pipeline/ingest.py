@@ -0,0 +1,171 @@
+"""
+Parallel, streaming ingestion of the category workbooks in data/raw.
+
+Each workbook is read by its own worker process with openpyxl in read-only
+mode, chunk by chunk, so large supplier workbooks are never fully loaded.
+Capacities go through the vectorized unit parser (g/kg/lb -> kg). Rows with a
+malformed capacity are written to a quarantine file instead of failing the
+whole sheet. Clean rows are appended, one Parquet row group per chunk, to a
+dataset partitioned by category:
+
+    data/processed/categories/category=<Category>/<workbook>.parquet
+    data/processed/quarantine/<workbook>.csv
+
+The partitioned dataset reads back with pd.read_parquet("data/processed/categories").
+
+Run from the project root:
+    python src/data_pipeline/ingest.py
+    python src/data_pipeline/ingest.py "data/raw/E-commerce.xlsx" --workers 2 --chunk-size 20000
+"""
+import argparse
+import functools
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from data_pipeline.cleaning import parse_capacity_kg
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+RAW_DIR = BASE_DIR / "data" / "raw"
+OUTPUT_DIR = BASE_DIR / "data" / "processed" / "categories"
+QUARANTINE_DIR = BASE_DIR / "data" / "processed" / "quarantine"
+
+# The material master sheet is not a category sheet
+EXCLUDED_WORKBOOKS = {"material data.xlsx"}
+# Normalized headers every category sheet needs
+REQUIRED_COLUMNS = ["category", "weight_capacity_upto"]
+
+
+def iter_sheet_chunks(path, chunk_size=10_000):
+    """Streams the first sheet of a workbook as DataFrames of chunk_size rows (normalized headers)."""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(name).strip().lower().replace(" ", "_") if name is not None else None for name in header]
+        keep = [i for i, name in enumerate(columns) if name]
+
+        chunk = []
+        for row in rows:
+            if all(value is None for value in row):
+                continue
+            chunk.append([row[i] if i < len(row) else None for i in keep])
+            if len(chunk) == chunk_size:
+                yield pd.DataFrame(chunk, columns=[columns[i] for i in keep])
+                chunk = []
+        if chunk:
+            yield pd.DataFrame(chunk, columns=[columns[i] for i in keep])
+    finally:
+        workbook.close()
+
+
+def partition_name(category):
+    return re.sub(r"[^\w\-]+", "_", str(category)).strip("_") or "unknown"
+
+
+def ingest_workbook(path, output_dir=OUTPUT_DIR, quarantine_dir=QUARANTINE_DIR, chunk_size=10_000):
+    """
+    Ingests one workbook. Returns (path, rows written, rows quarantined, categories, seconds).
+    A workbook without the required columns is quarantined whole, with the reason.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    start = time.perf_counter()
+    path, output_dir, quarantine_dir = Path(path), Path(output_dir), Path(quarantine_dir)
+    writers, seen, rejected = {}, set(), []
+    written = 0
+
+    try:
+        for chunk in iter_sheet_chunks(path, chunk_size):
+            missing = [column for column in REQUIRED_COLUMNS if column not in chunk.columns]
+            if missing:
+                bad = chunk.copy()
+                bad["reason"] = f"missing column(s): {', '.join(missing)}"
+                rejected.append(bad)
+                continue
+
+            # Same de-duplication as clean_sheet, across chunks
+            hashes = pd.util.hash_pandas_object(chunk.astype("str"), index=False)
+            fresh = ~hashes.isin(seen) & ~hashes.duplicated()
+            seen.update(hashes[fresh])
+            chunk = chunk[fresh.to_numpy()]
+
+            capacity = parse_capacity_kg(chunk["weight_capacity_upto"]).to_numpy()
+            invalid = pd.isna(capacity) | chunk["category"].isna().to_numpy()
+            if invalid.any():
+                bad = chunk[invalid].copy()
+                bad["reason"] = "malformed weight_capacity_upto or missing category"
+                rejected.append(bad)
+
+            # Fixed column types, so every chunk (and every workbook) has the same Parquet schema;
+            # the nullable string dtype keeps missing cells null instead of "nan"/"None"
+            valid = chunk[~invalid].astype("string")
+            valid["weight_capacity_upto"] = capacity[~invalid]
+            for category, rows in valid.groupby("category", sort=False):
+                # The category lives in the partition path (hive style), not in the file
+                rows = rows.drop(columns="category").reset_index(drop=True)
+                table = pa.Table.from_pandas(rows, preserve_index=False)
+                if category not in writers:
+                    partition = output_dir / f"category={partition_name(category)}"
+                    partition.mkdir(parents=True, exist_ok=True)
+                    writers[category] = pq.ParquetWriter(partition / f"{partition_name(path.stem)}.parquet",
+                                                         table.schema, compression="zstd")
+                writers[category].write_table(table)
+            written += len(valid)
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    quarantined = sum(len(bad) for bad in rejected)
+    if rejected:
+        quarantine_dir.mkdir(parents=True, exist_ok=True)
+        pd.concat(rejected).to_csv(quarantine_dir / f"{path.stem}.csv", index=False)
+
+    return str(path), written, quarantined, sorted(writers), time.perf_counter() - start
+
+
+def ingest(paths, workers=None, **options):
+    """Ingests several workbooks in parallel, one worker process per workbook. Returns the per-file results."""
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count(), len(paths)) or 1) as pool:
+        results = list(pool.map(functools.partial(ingest_workbook, **options), paths))
+
+    total = 0
+    for path, written, quarantined, categories, seconds in results:
+        total += written
+        print(f"{os.path.basename(path)}: {written} rows -> {len(categories)} categories, "
+              f"{quarantined} quarantined ({seconds:.2f}s)")
+    elapsed = time.perf_counter() - start
+    print(f"Ingested {total} rows from {len(paths)} workbooks in {elapsed:.2f}s "
+          f"({total / elapsed if elapsed else 0:,.0f} rows/s)")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*", help="workbooks (default: every category .xlsx in data/raw)")
+    parser.add_argument("--output-dir", default=str(OUTPUT_DIR))
+    parser.add_argument("--quarantine-dir", default=str(QUARANTINE_DIR))
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    files = args.files or sorted(str(p) for p in RAW_DIR.glob("*.xlsx") if p.name not in EXCLUDED_WORKBOOKS)
+    ingest(files, workers=args.workers, output_dir=args.output_dir, quarantine_dir=args.quarantine_dir,
+           chunk_size=args.chunk_size)
+
+
+if __name__ == "__main__":
+    main()
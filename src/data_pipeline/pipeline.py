@@ -0,0 +1,347 @@
+"""
+DAG runner for the data pipeline (raw Excel -> cleaned CSVs -> validated
+materials -> engineered features -> preprocessor + train/test arrays, and
+cleaned category sheets -> product/material map (data/final/ml_dataset) ->
+ML dataset with sustainability scores). Materials failing validation.py's
+schema are set aside in data/processed/quarantine/ instead of reaching the
+feature stages.
+
+The serving catalog (data/feature_engineered_materials.csv, or
+ml.material_features loaded from it) is not a pipeline output: publishing a
+rebuilt data/processed/feature_engineered_materials.* there stays a manual step.
+
+Each stage declares its input and output files (intermediates in the
+storage.py format, Parquet by default). A stage re-runs only when
+the content hash of an input, the hash of its own module source, or one of
+its outputs changed since the last run recorded in data/.pipeline_state.json.
+Row-local stages (material feature engineering) also keep a hash per
+material_id row and recompute only new or changed rows, so a supplier delta
+does not trigger a full rebuild.
+
+Run from the project root:
+    python src/data_pipeline/pipeline.py
+    python src/data_pipeline/pipeline.py --dry-run
+    python src/data_pipeline/pipeline.py --force --stage feature_engineering
+"""
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import sys
+from functools import partial
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from data_pipeline.build_ml_dataset import compute_ml_dataset
+from data_pipeline.cleaning import category_output_name, clean_category_sheet, clean_material_data
+from data_pipeline.feature_engineering import add_material_features
+from data_pipeline.storage import DATA_FORMAT, read_table, with_format, write_table
+from data_pipeline.validation import validate_file
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+STATE_FILE = ".pipeline_state.json"
+
+CATEGORY_FILES = [
+    "E-commerce.xlsx",
+    "Shopping.xlsx",
+    "Food Delivery & Takeaway.xlsx",
+    "Cosmetics, FMCG & Personal Care.xlsx",
+    "Electronics & Fragile Products.xlsx"
+]
+
+
+def file_hash(path, chunk_size=1 << 20):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def code_version(fn):
+    # Hash the whole defining module, so edits to helpers the stage calls also invalidate it
+    target = getattr(fn, "func", fn)
+    try:
+        source = inspect.getsource(inspect.getmodule(target))
+    except (OSError, TypeError):
+        source = target.__qualname__
+    # Bound partial() arguments are part of the stage (functions by name: their repr has an address)
+    bound = list(getattr(fn, "args", ())) + sorted(getattr(fn, "keywords", {}).items())
+    extra = repr([getattr(arg, "__qualname__", arg) for arg in bound])
+    return hashlib.sha1((source + extra).encode()).hexdigest()
+
+
+class Stage:
+    """A pipeline step: `run(inputs, outputs)` reads its input paths and writes its output paths."""
+
+    def __init__(self, name, inputs, outputs, run):
+        self.name = name
+        self.inputs = [Path(p) for p in inputs]
+        self.outputs = [Path(p) for p in outputs]
+        self.run = run
+
+    def version(self):
+        return code_version(self.run)
+
+    def execute(self, previous):
+        """`previous` is this stage's state from the last run with the same code (or None)."""
+        self.run(self.inputs, self.outputs)
+        return {}
+
+
+class RowLocalStage(Stage):
+    """
+    CSV -> CSV stage whose `transform(df)` is row-local. Rows whose content
+    hash (by `key`) is unchanged since the last run are copied from the
+    previous output; only new or changed rows are transformed.
+    """
+
+    def __init__(self, name, input, output, transform, key="material_id"):
+        super().__init__(name, [input], [output], transform)
+        self.key = key
+
+    def execute(self, previous):
+        source, target = self.inputs[0], self.outputs[0]
+        df = read_table(source)
+        keys = df[self.key].astype(str)
+        hashes = pd.util.hash_pandas_object(df, index=False).map("{:016x}".format).tolist()
+        row_hashes = dict(zip(keys, hashes))
+
+        old_hashes = (previous or {}).get("rows", {})
+        if keys.is_unique:
+            changed = [old_hashes.get(k) != h for k, h in zip(keys, hashes)]
+        else:
+            changed = [True] * len(df)
+
+        if target.exists() and not all(changed):
+            # Typed (or round-trip CSV) read: reused rows are written back exactly as a full rebuild would
+            previous_output = read_table(target)
+            previous_output.index = previous_output[self.key].astype(str)
+            fresh = self.run(df[changed])
+            fresh.index = fresh[self.key].astype(str)
+            unchanged_keys = keys[[not c for c in changed]]
+            # Keep the input row order; deleted material_ids simply drop out
+            result = pd.concat([previous_output.loc[unchanged_keys], fresh]).loc[keys]
+        else:
+            result = self.run(df)
+
+        write_table(result, target)
+        print(f"  {sum(changed)}/{len(df)} rows recomputed")
+        return {"rows": row_hashes, "recomputed": int(sum(changed))}
+
+
+class Pipeline:
+    def __init__(self, stages, base_dir=BASE_DIR, state_path=None):
+        self.base_dir = Path(base_dir)
+        self.stages = self._ordered(stages)
+        self.state_path = Path(state_path) if state_path else self.base_dir / "data" / STATE_FILE
+
+    @staticmethod
+    def _ordered(stages):
+        """Topological order: a stage runs after every stage producing one of its inputs."""
+        producers = {output: stage.name for stage in stages for output in stage.outputs}
+        by_name = {stage.name: stage for stage in stages}
+        ordered, visiting, done = [], set(), set()
+
+        def visit(stage):
+            if stage.name in done:
+                return
+            if stage.name in visiting:
+                raise ValueError(f"Pipeline has a cycle through stage {stage.name}")
+            visiting.add(stage.name)
+            for path in stage.inputs:
+                if path in producers:
+                    visit(by_name[producers[path]])
+            visiting.discard(stage.name)
+            done.add(stage.name)
+            ordered.append(stage)
+
+        for stage in stages:
+            visit(stage)
+        return ordered
+
+    def _key(self, path):
+        try:
+            return str(path.relative_to(self.base_dir))
+        except ValueError:
+            return str(path)
+
+    def load_state(self):
+        if self.state_path.exists():
+            return json.loads(self.state_path.read_text())
+        return {}
+
+    def _save_state(self, state):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(state, indent=2, sort_keys=True))
+        os.replace(tmp_path, self.state_path)
+
+    def _signature(self, stage):
+        return {
+            "code": stage.version(),
+            "inputs": {self._key(p): file_hash(p) for p in stage.inputs},
+        }
+
+    def _is_current(self, stage, signature, previous):
+        if previous is None or previous["signature"] != signature:
+            return False
+        return all(
+            p.exists() and previous["outputs"].get(self._key(p)) == file_hash(p)
+            for p in stage.outputs
+        )
+
+    def run(self, force=(), dry_run=False):
+        """
+        Runs every stale stage in dependency order and returns their names.
+        `force` is a collection of stage names (or True for all) to re-run regardless.
+        """
+        state = self.load_state()
+        ran = []
+        for stage in self.stages:
+            previous = state.get(stage.name)
+            forced = force is True or stage.name in force
+            # Stages downstream of a re-run stage see their new input hashes here
+            signature = self._signature(stage)
+            if not forced and self._is_current(stage, signature, previous):
+                print(f"[skip] {stage.name}")
+                continue
+
+            print(f"[run]  {stage.name}")
+            ran.append(stage.name)
+            if dry_run:
+                continue
+
+            for path in stage.outputs:
+                path.parent.mkdir(parents=True, exist_ok=True)
+            # Previous rows are only reusable if the code is the same and the outputs are untouched
+            reusable = (
+                previous is not None and not forced
+                and previous["signature"]["code"] == signature["code"]
+                and all(p.exists() and previous["outputs"].get(self._key(p)) == file_hash(p) for p in stage.outputs)
+            )
+            extra = stage.execute(previous if reusable else None)
+            state[stage.name] = {
+                "signature": signature,
+                "outputs": {self._key(p): file_hash(p) for p in stage.outputs},
+                **extra
+            }
+            # Saved after every stage, so an interrupted run resumes at the failed stage
+            self._save_state(state)
+        return ran
+
+
+def _excel_to_table(clean, inputs, outputs):
+    write_table(clean(pd.read_excel(inputs[0])), outputs[0])
+
+
+def _validate(inputs, outputs):
+    report = validate_file(inputs[0], outputs[0], outputs[1])
+    print(f"  {report['valid']}/{report['rows']} rows valid, {report['rejected']} quarantined")
+    for reason, count in report["reasons"].items():
+        print(f"    {count:>6}  {reason}")
+
+
+def _concat_tables(inputs, outputs):
+    write_table(pd.concat([read_table(p) for p in inputs], ignore_index=True), outputs[0])
+
+
+def _ml_dataset(inputs, outputs):
+    products, materials = (read_table(p) for p in inputs)
+    write_table(compute_ml_dataset(products, materials), outputs[0])
+
+
+def _prepare_data(inputs, outputs):
+    from data_preparation import prepare_data
+
+    artifacts_dir, processed_data_dir = outputs[0].parent, outputs[1].parent
+    fmt = outputs[-1].suffix.lstrip(".")
+    prepare_data(read_table(inputs[0]), artifacts_dir=artifacts_dir, processed_data_dir=processed_data_dir, fmt=fmt)
+
+
+def build_pipeline(base_dir=BASE_DIR, fmt=DATA_FORMAT):
+    """
+    The project's stages (same steps as the standalone scripts). Intermediates
+    are written in `fmt`; the committed source CSVs are read as they are.
+    """
+    base_dir = Path(base_dir)
+    raw, processed, final = base_dir / "data" / "raw", base_dir / "data" / "processed", base_dir / "data" / "final"
+    cleaned_materials = with_format(processed / "cleaned_material_data.csv", fmt)
+    validated_materials = with_format(processed / "validated_material_data.csv", fmt)
+    material_features = with_format(processed / "feature_engineered_materials.csv", fmt)
+    product_material_map = with_format(final / "ml_dataset.csv", fmt)
+
+    stages = [
+        Stage(
+            "clean_material_data",
+            [raw / "material data.xlsx"],
+            [cleaned_materials],
+            partial(_excel_to_table, clean_material_data)
+        ),
+    ]
+    for file in CATEGORY_FILES:
+        stages.append(Stage(
+            f"clean_{Path(category_output_name(file)).stem[len('cleaned_'):]}",
+            [raw / file],
+            [with_format(processed / category_output_name(file), fmt)],
+            partial(_excel_to_table, clean_category_sheet)
+        ))
+    stages += [
+        Stage(
+            "build_product_material_map",
+            # Sorted like the committed ml_dataset.csv: one block of rows per category sheet
+            sorted(with_format(processed / category_output_name(file), fmt) for file in CATEGORY_FILES),
+            [product_material_map],
+            _concat_tables
+        ),
+        Stage(
+            "validate_materials",
+            [cleaned_materials],
+            [validated_materials, processed / "quarantine" / "cleaned_material_data_rejected.csv"],
+            _validate
+        ),
+        RowLocalStage(
+            "feature_engineering",
+            validated_materials,
+            material_features,
+            add_material_features
+        ),
+        Stage(
+            "build_ml_dataset",
+            [product_material_map, validated_materials],
+            [with_format(final / "ml_dataset_with_sustainability_score.csv", fmt)],
+            _ml_dataset
+        ),
+        Stage(
+            "prepare_data",
+            [material_features],
+            [base_dir / "models_artifacts" / "preprocessor.pkl", final / "X_train.npy", final / "X_test.npy"] + [
+                with_format(final / name, fmt) for name in [
+                    "y_cost_train.csv", "y_cost_test.csv", "y_co2_train.csv", "y_co2_test.csv",
+                    "test_data_original.csv"
+                ]
+            ],
+            _prepare_data
+        ),
+    ]
+    return Pipeline(stages, base_dir=base_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stage", nargs="+", default=[], help="stages to force (with --force)")
+    parser.add_argument("--force", action="store_true", help="re-run the --stage stages, or every stage")
+    parser.add_argument("--dry-run", action="store_true", help="only list the stages that would run")
+    args = parser.parse_args()
+
+    force = (args.stage or True) if args.force else ()
+    ran = build_pipeline().run(force=force, dry_run=args.dry_run)
+    print(f"{len(ran)} stage(s) {'to run' if args.dry_run else 'ran'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""
+Typed storage for the intermediate datasets in data/processed and data/final.
+
+New intermediates are written as zstd-compressed Parquet (DATA_FORMAT=arrow
+for uncompressed Arrow IPC, which memory-maps without a decode step, or csv).
+Readers go through `read_table`, which picks the most recently written of the
+Parquet/Arrow/CSV files sharing a path's stem, reads only the requested columns, memory-maps the
+file and applies the same column types whatever the format. Train/test
+matrices stay .npy and are memory-mapped with `load_array`.
+"""
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Format for newly written intermediates: parquet | arrow | csv
+DATA_FORMAT = os.getenv("DATA_FORMAT", "parquet")
+SUFFIXES = {"parquet": ".parquet", "arrow": ".arrow", "csv": ".csv"}
+
+# Columns whose type CSV cannot carry (or that pandas infers inconsistently)
+COLUMN_TYPES = {
+    "material_id": "str",
+    "material_type": "str",
+    "eco_alternative": "str",
+    "category": "str",
+    "manufacturing_place": "str",
+    "water_resistance": "bool",
+}
+
+_BOOL_VALUES = {"true": True, "false": False, "1": True, "0": False, "1.0": True, "0.0": False}
+
+
+def with_format(path, fmt=DATA_FORMAT):
+    return Path(path).with_suffix(SUFFIXES[fmt])
+
+
+def resolve(path):
+    """
+    The newest of the Parquet, Arrow and CSV versions of `path` (same stem),
+    in that order of preference when written at the same time. A CSV
+    regenerated by a standalone script after the Parquet copy is the one read.
+    """
+    path = Path(path)
+    existing = [path.with_suffix(suffix) for suffix in (".parquet", ".arrow", ".csv")]
+    existing = [candidate for candidate in existing if candidate.exists()]
+    if not existing:
+        return path
+    return max(existing, key=lambda candidate: candidate.stat().st_mtime_ns)
+
+
+def _to_bool(series):
+    if pd.api.types.is_bool_dtype(series):
+        return series
+    values = series.map(lambda v: v if pd.isna(v) else _BOOL_VALUES.get(str(v).strip().lower()))
+    if values.isna().any():
+        return values.astype("boolean")
+    return values.astype(bool)
+
+
+def coerce_types(df):
+    """Applies COLUMN_TYPES, e.g. water_resistance "True"/"False"/1/0 -> bool."""
+    for column, dtype in COLUMN_TYPES.items():
+        if column not in df.columns:
+            continue
+        if dtype == "bool":
+            df[column] = _to_bool(df[column])
+        elif not pd.api.types.is_string_dtype(df[column]):
+            df[column] = df[column].astype(dtype)
+    return df
+
+
+def read_table(path, columns=None):
+    path = resolve(path)
+    if path.suffix == ".parquet":
+        df = pd.read_parquet(path, columns=columns, memory_map=True)
+    elif path.suffix == ".arrow":
+        from pyarrow import feather
+
+        df = feather.read_table(path, columns=columns, memory_map=True).to_pandas()
+    else:
+        # round_trip: floats read back exactly as written
+        df = pd.read_csv(path, usecols=columns, float_precision="round_trip")
+        if columns is not None:
+            df = df[columns]  # usecols keeps file order
+    return coerce_types(df)
+
+
+def write_table(df, path):
+    """Writes `df` in the format given by the path suffix (atomically, via a temp file)."""
+    path = Path(path)
+    df = coerce_types(df.copy())
+    tmp_path = path.with_name(path.name + ".tmp")
+    if path.suffix == ".parquet":
+        df.to_parquet(tmp_path, index=False, compression="zstd")
+    elif path.suffix == ".arrow":
+        df.reset_index(drop=True).to_feather(tmp_path, compression="uncompressed")
+    else:
+        df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return path
+
+
+def _stable_type(pa, arrow_type):
+    """
+    The Arrow type a column keeps across chunks whose pandas dtypes are
+    inferred one chunk at a time: integers widen to float64 (a later chunk
+    may hold 12.5 or a NaN), all-missing (null) and large strings to string.
+    """
+    if pa.types.is_integer(arrow_type):
+        return pa.float64()
+    if pa.types.is_null(arrow_type) or pa.types.is_large_string(arrow_type):
+        return pa.string()
+    return arrow_type
+
+
+class TableWriter:
+    """
+    Appends DataFrame chunks to one table file (format from the suffix). The
+    file appears atomically on close(). The schema is fixed before the first
+    write: `types` ({column: pyarrow type}) where given, else the first
+    chunk's types widened by _stable_type. If no chunk is written, close()
+    writes an empty table with `columns`.
+    """
+
+    def __init__(self, path, columns=(), types=None):
+        self.path = Path(path)
+        self.columns = list(columns)
+        self.types = dict(types or {})
+        self.tmp_path = self.path.with_name(self.path.name + ".tmp")
+        self._writer = None
+        self._schema = None
+        self.rows = 0
+
+    def write(self, df):
+        import pyarrow as pa
+
+        if df.empty:
+            return
+        df = coerce_types(df.copy()).reset_index(drop=True)
+        if self.path.suffix == ".csv":
+            df.to_csv(self.tmp_path, index=False, mode="a" if self.rows else "w", header=not self.rows)
+        else:
+            if self._schema is None:
+                inferred = pa.Schema.from_pandas(df, preserve_index=False)
+                self._schema = pa.schema([
+                    pa.field(field.name, self.types.get(field.name) or _stable_type(pa, field.type))
+                    for field in inferred
+                ])
+                self._writer = self._open(self._schema)
+            self._writer.write_table(pa.Table.from_pandas(df, schema=self._schema, preserve_index=False))
+        self.rows += len(df)
+
+    def _open(self, schema):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self.path.suffix == ".parquet":
+            return pq.ParquetWriter(self.tmp_path, schema, compression="zstd")
+        # Arrow IPC file format, i.e. Feather v2
+        return pa.ipc.new_file(self.tmp_path, schema)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self.tmp_path.exists():
+            os.replace(self.tmp_path, self.path)
+        else:
+            write_table(pd.DataFrame(columns=self.columns), self.path)
+        return self.path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            if self._writer is not None:
+                self._writer.close()
+            self.tmp_path.unlink(missing_ok=True)
+
+
+def iter_batches(path, batch_size, columns=None):
+    """Streams a dataset in DataFrames of at most batch_size rows."""
+    path = resolve(path)
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path, memory_map=True).iter_batches(batch_size=batch_size, columns=columns):
+            yield coerce_types(batch.to_pandas())
+    elif path.suffix == ".arrow":
+        df = read_table(path, columns)
+        for start in range(0, len(df), batch_size):
+            yield df.iloc[start:start + batch_size]
+    else:
+        for batch in pd.read_csv(path, usecols=columns, chunksize=batch_size, float_precision="round_trip"):
+            yield coerce_types(batch)
+
+
+def list_datasets(directory):
+    """One path per dataset stem in `directory`, preferring Parquet/Arrow over CSV."""
+    stems = sorted({p.stem for p in Path(directory).iterdir() if p.suffix in SUFFIXES.values()})
+    return [resolve(Path(directory) / f"{stem}.csv") for stem in stems]
+
+
+def load_array(path):
+    """Memory-mapped .npy (read-only): pages are loaded on access and shared between processes."""
+    return np.load(path, mmap_mode="r")
+
+
+def convert(directory, fmt=DATA_FORMAT):
+    """Writes a `fmt` copy of every CSV in `directory`. Returns the new paths."""
+    written = []
+    for path in sorted(Path(directory).glob("*.csv")):
+        # The CSV itself, not an existing (possibly stale) converted copy
+        df = coerce_types(pd.read_csv(path, float_precision="round_trip"))
+        written.append(write_table(df, with_format(path, fmt)))
+    return written
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert the CSV intermediates to Parquet/Arrow.")
+    parser.add_argument("directories", nargs="*", default=["data/processed", "data/final"])
+    parser.add_argument("--format", choices=["parquet", "arrow"], default="parquet")
+    args = parser.parse_args()
+
+    for directory in args.directories:
+        for path in convert(directory, args.format):
+            print(f"{path} written")
@@ -0,0 +1,151 @@
+"""
+Schema-driven validation of the material data.
+
+Every check in the schema is a vectorized NumPy mask over a chunk, so a file
+is validated in a single streaming pass however large it is. Valid rows go to
+the output table; failing rows go to a quarantine CSV with a `reason` column
+listing every rule they broke, e.g. "cost_per_unit_inr: zero; strength: > 10".
+
+Supported rules per column:
+    required  - no missing values
+    unique    - no repeats (across the whole file, not just one chunk)
+    min / max - inclusive numeric range
+    nonzero   - the column is used as a denominator downstream
+    allowed   - enum of accepted values
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .storage import COLUMN_TYPES, TableWriter, iter_batches
+
+# Rules for cleaned_material_data and the catalog built from it.
+# nonzero: feature_engineering divides by cost_per_unit_inr, build_ml_dataset by co2_emission_score.
+MATERIAL_SCHEMA = {
+    "material_id": {"required": True, "unique": True},
+    "material_type": {"required": True},
+    "strength": {"required": True, "min": 0, "max": 10},
+    "weight_capacity_kg": {"required": True, "min": 0},
+    "biodegradability_score": {"required": True, "min": 0, "max": 100},
+    "co2_emission_score": {"required": True, "min": 0, "nonzero": True},
+    "recyclability_percent": {"required": True, "min": 0, "max": 100},
+    "cost_per_unit_inr": {"required": True, "min": 0, "nonzero": True},
+    "water_resistance": {"required": True, "allowed": [True, False]},
+    "recycle_time_days": {"min": 0},
+}
+
+REASON_COLUMN = "reason"
+
+
+def _numeric(series):
+    return pd.to_numeric(series, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+
+
+def _is_numeric_rule(rules):
+    return "min" in rules or "max" in rules or rules.get("nonzero", False)
+
+
+def arrow_types(schema=MATERIAL_SCHEMA):
+    """
+    {column: pyarrow type} for the valid-row output: float64 for the numeric
+    columns of `schema` (whatever a chunk inferred), string/bool per COLUMN_TYPES.
+    """
+    import pyarrow as pa
+
+    types = {column: pa.float64() for column, rules in schema.items() if _is_numeric_rule(rules)}
+    for column, dtype in COLUMN_TYPES.items():
+        types.setdefault(column, pa.bool_() if dtype == "bool" else pa.string())
+    return types
+
+
+def check_masks(df, schema=MATERIAL_SCHEMA, seen=None):
+    """
+    {"<column>: <problem>": boolean mask of the rows failing it}. `seen` maps
+    a unique column to the set of values from earlier chunks; it is updated.
+    """
+    missing_columns = [column for column in schema if column not in df.columns]
+    if missing_columns:
+        raise ValueError(f"Missing columns: {missing_columns}")
+
+    seen = {} if seen is None else seen
+    masks = {}
+    for column, rules in schema.items():
+        series = df[column]
+        missing = series.isna().to_numpy()
+        if rules.get("required"):
+            masks[f"{column}: missing"] = missing
+
+        if _is_numeric_rule(rules):
+            values = _numeric(series)
+            masks[f"{column}: not numeric"] = np.isnan(values) & ~missing
+            masks[f"{column}: not finite"] = np.isinf(values)
+            if "min" in rules:
+                masks[f"{column}: < {rules['min']}"] = values < rules["min"]
+            if "max" in rules:
+                masks[f"{column}: > {rules['max']}"] = values > rules["max"]
+            if rules.get("nonzero"):
+                masks[f"{column}: zero"] = values == 0
+
+        if "allowed" in rules:
+            masks[f"{column}: not one of {rules['allowed']}"] = ~series.isin(rules["allowed"]).to_numpy() & ~missing
+
+        if rules.get("unique"):
+            earlier = seen.setdefault(column, set())
+            masks[f"{column}: duplicate"] = (series.duplicated() | series.isin(earlier)).to_numpy() & ~missing
+            earlier.update(series[~missing].to_numpy(dtype=object).tolist())
+    return masks
+
+
+def validate(df, schema=MATERIAL_SCHEMA, seen=None):
+    """Splits `df` into (valid rows, rejected rows with a `reason` column)."""
+    masks = check_masks(df, schema, seen)
+    bad = np.zeros(len(df), dtype=bool)
+    for mask in masks.values():
+        bad |= mask
+
+    # Reasons are only assembled for the (few) failing rows
+    labels = np.array(list(masks))
+    failed = np.column_stack([mask[bad] for mask in masks.values()]) if masks else np.zeros((0, 0), dtype=bool)
+    rejected = df[bad].copy()
+    rejected[REASON_COLUMN] = ["; ".join(labels[row]) for row in failed]
+    return df[~bad], rejected
+
+
+def validate_file(path, output_path, quarantine_path, schema=MATERIAL_SCHEMA, chunk_size=100_000):
+    """
+    Streams `path` in chunks of chunk_size rows: valid rows are written to
+    output_path (format from its suffix), rejected rows to the quarantine CSV.
+    Both files are always written. Returns the row counts and reason counts.
+    """
+    seen = {}
+    reasons = pd.Series(dtype=int)
+    columns = None
+    total = 0
+    for target in (output_path, quarantine_path):
+        Path(target).parent.mkdir(parents=True, exist_ok=True)
+
+    numeric = [column for column, rules in schema.items() if _is_numeric_rule(rules)]
+    with TableWriter(output_path, types=arrow_types(schema)) as valid_out, \
+            TableWriter(quarantine_path) as rejected_out:
+        for chunk in iter_batches(path, chunk_size):
+            columns = list(chunk.columns)
+            valid, rejected = validate(chunk, schema, seen)
+            # A bad value elsewhere in the chunk can leave a numeric column as strings
+            valid = valid.assign(**{column: pd.to_numeric(valid[column]) for column in numeric})
+            valid_out.write(valid)
+            rejected_out.write(rejected)
+            total += len(chunk)
+            if len(rejected):
+                counts = rejected[REASON_COLUMN].str.split("; ").explode().value_counts()
+                reasons = reasons.add(counts, fill_value=0)
+        # Header-only files when every row passed (or failed)
+        valid_out.columns = columns or []
+        rejected_out.columns = (columns or []) + [REASON_COLUMN]
+
+    return {
+        "rows": total,
+        "valid": valid_out.rows,
+        "rejected": rejected_out.rows,
+        "reasons": {reason: int(n) for reason, n in reasons.sort_values(ascending=False).items()},
+    }
@@ -8,6 +8,8 @@ from sklearn.impute import SimpleImputer
 import joblib
 import os
 
+from data_pipeline.storage import DATA_FORMAT, with_format, write_table
+
 # Configuration
 DATA_PATH = 'data/feature_engineered_materials.csv'
 ARTIFACTS_DIR = 'models_artifacts'
@@ -22,7 +24,7 @@ def load_data(path):
     df = pd.read_csv(path)
     return df
 
-def prepare_data(df):
+def prepare_data(df, artifacts_dir=ARTIFACTS_DIR, processed_data_dir=PROCESSED_DATA_DIR, fmt=DATA_FORMAT):
     print("Preprocessing data...")
     
     # Define features and targets
@@ -71,7 +73,7 @@ def prepare_data(df):
     X_processed = preprocessor.fit_transform(X)
     
     # Save the preprocessor
-    joblib.dump(preprocessor, os.path.join(ARTIFACTS_DIR, 'preprocessor.pkl'))
+    joblib.dump(preprocessor, os.path.join(artifacts_dir, 'preprocessor.pkl'))
     print("Preprocessor saved.")
     
     # Split data
@@ -91,18 +93,22 @@ def prepare_data(df):
     
     # Save processed datasets
     print("Saving processed datasets...")
-    np.save(os.path.join(PROCESSED_DATA_DIR, 'X_train.npy'), X_train)
-    np.save(os.path.join(PROCESSED_DATA_DIR, 'X_test.npy'), X_test)
+    np.save(os.path.join(processed_data_dir, 'X_train.npy'), X_train)
+    np.save(os.path.join(processed_data_dir, 'X_test.npy'), X_test)
+    
+    # Targets and the test partition are typed tables (Parquet by default, see data_pipeline/storage.py)
+    def table_path(name):
+        return with_format(os.path.join(processed_data_dir, name), fmt)
     
-    y_cost_train.to_csv(os.path.join(PROCESSED_DATA_DIR, 'y_cost_train.csv'), index=False)
-    y_cost_test.to_csv(os.path.join(PROCESSED_DATA_DIR, 'y_cost_test.csv'), index=False)
+    write_table(y_cost_train.to_frame(), table_path('y_cost_train.csv'))
+    write_table(y_cost_test.to_frame(), table_path('y_cost_test.csv'))
     
-    y_co2_train.to_csv(os.path.join(PROCESSED_DATA_DIR, 'y_co2_train.csv'), index=False)
-    y_co2_test.to_csv(os.path.join(PROCESSED_DATA_DIR, 'y_co2_test.csv'), index=False)
+    write_table(y_co2_train.to_frame(), table_path('y_co2_train.csv'))
+    write_table(y_co2_test.to_frame(), table_path('y_co2_test.csv'))
     
     # Also save the original test partition for validation/viewing purposes
     df_test = df.iloc[idx_test]
-    df_test.to_csv(os.path.join(PROCESSED_DATA_DIR, 'test_data_original.csv'), index=False)
+    write_table(df_test, table_path('test_data_original.csv'))
     
     print("Data preparation complete.")
     
@@ -0,0 +1,210 @@
+"""
+Lightweight request instrumentation: per-stage timers, latency histograms with
+p50/p95/p99, in-flight gauges, request counters and cache hit ratios,
+rendered in the Prometheus text format for /api/metrics.
+
+Every observation is two perf_counter() calls and a short critical section, so
+it stays on in production. Quantiles are computed at scrape time from a
+bounded window of recent samples; the buckets are cumulative since start.
+
+Under gunicorn each worker process keeps (and reports) its own metrics.
+"""
+import bisect
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict, defaultdict, deque
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+PREFIX = "ecopack"
+# Seconds; the last bucket is +Inf
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUANTILES = (0.5, 0.95, 0.99)
+# Recent samples kept per series for the quantiles
+WINDOW = 2048
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS, window=WINDOW):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.recent.append(value)
+
+    def quantiles(self, quantiles=QUANTILES):
+        if not self.recent:
+            return {q: float("nan") for q in quantiles}
+        values = np.percentile(np.fromiter(self.recent, dtype=float), [q * 100 for q in quantiles])
+        return dict(zip(quantiles, values))
+
+
+def _labels(names, values, **extra):
+    pairs = list(zip(names, values)) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{str(value).replace(chr(34), chr(39))}"' for name, value in pairs) + "}"
+
+
+class Metrics:
+    """
+    Registry of the app's metrics. Series are keyed by their label values:
+
+        with metrics.stage("filter"): ...
+        metrics.observe_request("/api/recommend", "POST", 200, seconds)
+        metrics.register_cache("insights", insight_service.stats)
+    """
+
+    def __init__(self, prefix=PREFIX):
+        self.prefix = prefix
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._stages = defaultdict(Histogram)      # stage -> Histogram
+        self._requests = defaultdict(Histogram)    # (endpoint, method) -> Histogram
+        self._responses = Counter()                # (endpoint, method, status) -> count
+        self._in_flight = Counter()                # endpoint -> gauge
+        self._caches = {}                          # cache name -> stats() callable
+        self.profiles = OrderedDict()              # profile id -> collapsed stacks
+        self.max_profiles = 20
+
+    def observe_stage(self, name, seconds):
+        with self._lock:
+            self._stages[name].observe(seconds)
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_stage(name, time.perf_counter() - start)
+
+    def request_started(self, endpoint):
+        with self._lock:
+            self._in_flight[endpoint] += 1
+
+    def request_finished(self, endpoint, method, status, seconds):
+        with self._lock:
+            self._in_flight[endpoint] -= 1
+            self._requests[(endpoint, method)].observe(seconds)
+            self._responses[(endpoint, method, status)] += 1
+
+    def register_cache(self, name, stats_fn):
+        """`stats_fn()` returns a dict with "hits" and "misses" (e.g. DatasetCache.stats)."""
+        self._caches[name] = stats_fn
+
+    def add_profile(self, stacks):
+        profile_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            self.profiles[profile_id] = stacks
+            while len(self.profiles) > self.max_profiles:
+                self.profiles.popitem(last=False)
+        return profile_id
+
+    def snapshot(self):
+        """Stage and request quantiles as a dict (for logs and benchmarks)."""
+        with self._lock:
+            return {
+                "stages": {name: {"count": h.count, **{f"p{int(q * 100)}": v for q, v in h.quantiles().items()}}
+                           for name, h in self._stages.items()},
+                "in_flight": dict(self._in_flight),
+            }
+
+    def _histogram_lines(self, name, label_names, series):
+        lines = [f"# TYPE {name} histogram"]
+        quantile_lines = [f"# TYPE {name}_quantile gauge"]
+        for label_values, histogram in sorted(series.items()):
+            cumulative = np.cumsum(histogram.counts)
+            for bound, count in zip(list(histogram.buckets) + ["+Inf"], cumulative):
+                lines.append(f"{name}_bucket{_labels(label_names, label_values, le=bound)} {count}")
+            lines.append(f"{name}_sum{_labels(label_names, label_values)} {histogram.sum:.6f}")
+            lines.append(f"{name}_count{_labels(label_names, label_values)} {histogram.count}")
+            for q, value in histogram.quantiles().items():
+                quantile_lines.append(f"{name}_quantile{_labels(label_names, label_values, quantile=q)} {value:.6f}")
+        return lines + quantile_lines
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format (0.0.4)."""
+        p = self.prefix
+        with self._lock:
+            stages = {(name,): h for name, h in self._stages.items()}
+            requests = dict(self._requests)
+            lines = self._histogram_lines(f"{p}_stage_seconds", ["stage"], stages)
+            lines += self._histogram_lines(f"{p}_request_seconds", ["endpoint", "method"], requests)
+
+            lines.append(f"# TYPE {p}_requests_total counter")
+            for key, count in sorted(self._responses.items()):
+                lines.append(f"{p}_requests_total{_labels(['endpoint', 'method', 'status'], key)} {count}")
+            lines.append(f"# TYPE {p}_requests_in_flight gauge")
+            for endpoint, count in sorted(self._in_flight.items()):
+                lines.append(f"{p}_requests_in_flight{_labels(['endpoint'], [endpoint])} {count}")
+
+        caches = []
+        for name, stats_fn in sorted(self._caches.items()):
+            stats = stats_fn()
+            total = stats["hits"] + stats["misses"]
+            caches.append((name, stats["hits"], stats["misses"], stats["hits"] / total if total else 0.0))
+        for metric, column in (("hits_total", 1), ("misses_total", 2), ("hit_ratio", 3)):
+            lines.append(f"# TYPE {p}_cache_{metric} {'gauge' if metric == 'hit_ratio' else 'counter'}")
+            lines += [f"{p}_cache_{metric}{_labels(['cache'], [c[0]])} {c[column]}" for c in caches]
+
+        lines.append(f"# TYPE {p}_uptime_seconds gauge")
+        lines.append(f"{p}_uptime_seconds {time.time() - self.started:.1f}")
+        return "\n".join(lines) + "\n"
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler for one thread: a background thread samples the
+    target's Python stack every `interval` seconds. `collapsed()` returns
+    the stacks in the folded format flamegraph tools read ("a;b;c count").
+    """
+
+    def __init__(self, thread_id=None, interval=0.001, max_depth=64):
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _stack(self, frame):
+        stack = []
+        while frame is not None and len(stack) < self.max_depth:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return ";".join(reversed(stack))
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.samples[self._stack(frame)] += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self
+
+    def collapsed(self):
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common()) + "\n"
+
+
+metrics = Metrics()
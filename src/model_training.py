@@ -1,30 +1,38 @@
+import argparse
 import numpy as np
 import pandas as pd
 import joblib
 import os
+from sklearn.compose import TransformedTargetRegressor
 from sklearn.ensemble import RandomForestRegressor
+from sklearn.preprocessing import StandardScaler
 from xgboost import XGBRegressor
 from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
 
+from data_pipeline.storage import load_array, read_table
+
 # Configuration
 PROCESSED_DATA_DIR = 'data/final'
 ARTIFACTS_DIR = 'models_artifacts'
 
 def load_data():
     print("Loading prepared data...")
-    X_train = np.load(os.path.join(PROCESSED_DATA_DIR, 'X_train.npy'))
-    X_test = np.load(os.path.join(PROCESSED_DATA_DIR, 'X_test.npy'))
+    # Memory-mapped feature matrices; targets from the Parquet (or CSV) tables
+    X_train = load_array(os.path.join(PROCESSED_DATA_DIR, 'X_train.npy'))
+    X_test = load_array(os.path.join(PROCESSED_DATA_DIR, 'X_test.npy'))
     
-    y_cost_train = pd.read_csv(os.path.join(PROCESSED_DATA_DIR, 'y_cost_train.csv')).values.ravel()
-    y_cost_test = pd.read_csv(os.path.join(PROCESSED_DATA_DIR, 'y_cost_test.csv')).values.ravel()
+    y_cost_train = read_table(os.path.join(PROCESSED_DATA_DIR, 'y_cost_train.csv')).values.ravel()
+    y_cost_test = read_table(os.path.join(PROCESSED_DATA_DIR, 'y_cost_test.csv')).values.ravel()
     
-    y_co2_train = pd.read_csv(os.path.join(PROCESSED_DATA_DIR, 'y_co2_train.csv')).values.ravel()
-    y_co2_test = pd.read_csv(os.path.join(PROCESSED_DATA_DIR, 'y_co2_test.csv')).values.ravel()
+    y_co2_train = read_table(os.path.join(PROCESSED_DATA_DIR, 'y_co2_train.csv')).values.ravel()
+    y_co2_test = read_table(os.path.join(PROCESSED_DATA_DIR, 'y_co2_test.csv')).values.ravel()
     
     return X_train, X_test, y_cost_train, y_cost_test, y_co2_train, y_co2_test
 
 def evaluate_model(model, X_test, y_test, name="Model"):
-    predictions = model.predict(X_test)
+    return evaluate_predictions(model.predict(X_test), y_test, name)
+
+def evaluate_predictions(predictions, y_test, name="Model"):
     rmse = np.sqrt(mean_squared_error(y_test, predictions))
     mae = mean_absolute_error(y_test, predictions)
     r2 = r2_score(y_test, predictions)
@@ -59,5 +67,32 @@ def train_models():
     joblib.dump(co2_model, os.path.join(ARTIFACTS_DIR, 'co2_model.pkl'))
     print("CO2 model saved.")
 
+def make_joint_model(**params):
+    # Cost varies ~10x more than CO2; on raw targets the shared splits would minimise cost error almost alone.
+    # Both targets are standardized for fitting, predict() scales back to the original units.
+    return TransformedTargetRegressor(regressor=RandomForestRegressor(**params), transformer=StandardScaler())
+
+def train_joint_model():
+    X_train, X_test, y_cost_train, y_cost_test, y_co2_train, y_co2_test = load_data()
+    
+    # One multi-output Random Forest: every tree predicts [cost, co2] from the same splits
+    print("\nTraining joint Cost + CO2 Prediction Model (multi-output Random Forest)...")
+    joint_model = make_joint_model(n_estimators=100, random_state=42, max_depth=10)
+    joint_model.fit(X_train, np.column_stack([y_cost_train, y_co2_train]))
+    
+    predictions = joint_model.predict(X_test)
+    evaluate_predictions(predictions[:, 0], y_cost_test, "Joint Model (Cost)")
+    evaluate_predictions(predictions[:, 1], y_co2_test, "Joint Model (CO2)")
+    
+    joblib.dump(joint_model, os.path.join(ARTIFACTS_DIR, 'joint_model.pkl'))
+    print("Joint model saved.")
+
 if __name__ == "__main__":
-    train_models()
+    parser = argparse.ArgumentParser(description="Train the cost and CO2 prediction models.")
+    parser.add_argument("--joint", action="store_true", help="train one multi-output model (joint_model.pkl) instead of two")
+    args = parser.parse_args()
+    
+    if args.joint:
+        train_joint_model()
+    else:
+        train_models()
@@ -0,0 +1,125 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .skyline import SkylineIndex, constraint_matrix, objective_matrix
+
+NUMERIC_CONSTRAINTS = ["weight_capacity_kg", "strength"]
+
+
+def _as_bool(values):
+    # water_resistance arrives as bool from the CSV/DB, but can also be 0/1 or "True"/"False"
+    if values.dtype == object or values.dtype.kind in "SUT":
+        return np.array([str(v).strip().lower() in ("true", "1", "1.0") for v in values], dtype=bool)
+    return values.astype(float) >= 1
+
+
+class CatalogFilterEngine:
+    """
+    Columnar view of the material catalog for hard-constraint filtering.
+
+    Every catalog column is held as a contiguous NumPy array and the numeric
+    constraint columns keep a sorted index, so "capacity >= x AND strength >= y
+    AND water_resistant" is answered by binary search plus bitmap intersection
+    without copying the catalog.
+
+    `skyline` is the SkylineIndex for Pareto-front queries, built on first
+    use. Given the `previous` snapshot's engine whose skyline was built, it is
+    derived from that one instead, re-examining only changed materials.
+    """
+
+    def __init__(self, df, previous=None):
+        self.size = len(df)
+        self.columns = {col: np.ascontiguousarray(df[col].to_numpy()) for col in df.columns}
+
+        # Sorted index per numeric constraint: (sorted values, row positions)
+        self.numeric = {}
+        self.sorted_index = {}
+        for col in NUMERIC_CONSTRAINTS:
+            values = self.numeric[col] = self.columns[col].astype(float)
+            order = np.argsort(values, kind="stable")
+            self.sorted_index[col] = (values[order], order)
+
+        self.water_resistant = _as_bool(self.columns["water_resistance"])
+
+        self._skyline = None
+        self._skyline_lock = threading.Lock()
+        if previous is not None and previous._skyline is not None:
+            ids = pd.Index(self.columns["material_id"])
+            if ids.is_unique:
+                objectives, constraints = self._skyline_matrices()
+                unchanged = self._unchanged_positions(ids, previous._skyline, previous.columns["material_id"],
+                                                      objectives, constraints)
+                self._skyline = SkylineIndex.updated(previous._skyline, objectives, constraints, unchanged)
+
+    def _skyline_matrices(self):
+        objectives = objective_matrix(
+            self.columns["sustainability_score"], self.columns["predicted_cost"], self.columns["predicted_co2"]
+        )
+        constraints = constraint_matrix(self.numeric["weight_capacity_kg"], self.numeric["strength"], self.water_resistant)
+        return objectives, constraints
+
+    @staticmethod
+    def _unchanged_positions(ids, previous, previous_ids, objectives, constraints):
+        """For each row of the previous skyline: its position here if the material is unchanged, else -1."""
+        positions = ids.get_indexer(previous_ids)
+        found = np.flatnonzero(positions >= 0)
+        same = np.zeros(len(positions), dtype=bool)
+        same[found] = (
+            (previous.objectives[found] == objectives[positions[found]]).all(axis=1)
+            & (previous.constraints[found] == constraints[positions[found]]).all(axis=1)
+        )
+        return np.where(same, positions, -1)
+
+    @property
+    def skyline(self):
+        if self._skyline is None:
+            with self._skyline_lock:
+                if self._skyline is None:
+                    self._skyline = SkylineIndex(*self._skyline_matrices())
+        return self._skyline
+
+    def at_least(self, col, value):
+        """Bitmap of rows where `col >= value`, found by binary search on the sorted index."""
+        sorted_values, order = self.sorted_index[col]
+        start = np.searchsorted(sorted_values, value, side="left")
+        mask = np.zeros(self.size, dtype=bool)
+        mask[order[start:]] = True
+        return mask
+
+    def query(self, weight_capacity_kg=0, strength=0, water_resistant=False):
+        """
+        Returns the row positions (ascending) of materials satisfying every
+        constraint. Constraints <= 0 / False are treated as not set.
+        """
+        mask = None
+        if weight_capacity_kg > 0:
+            mask = self.at_least("weight_capacity_kg", weight_capacity_kg)
+        if strength > 0:
+            strength_mask = self.at_least("strength", strength)
+            mask = strength_mask if mask is None else mask & strength_mask
+        if water_resistant:
+            mask = self.water_resistant if mask is None else mask & self.water_resistant
+
+        if mask is None:
+            return np.arange(self.size)
+        return np.flatnonzero(mask)
+
+    def query_batch(self, weight_capacity_kg, strength, water_resistant):
+        """
+        Vectorized query for many requirement sets against the shared catalog
+        matrix. Takes one array per constraint (same length m) and returns an
+        (m, size) boolean matrix, one candidate bitmap per requirement set.
+        """
+        weight = np.asarray(weight_capacity_kg, dtype=float)[:, None]
+        strength = np.asarray(strength, dtype=float)[:, None]
+        water = np.asarray(water_resistant, dtype=bool)[:, None]
+
+        mask = (weight <= 0) | (self.numeric["weight_capacity_kg"] >= weight)
+        mask &= (strength <= 0) | (self.numeric["strength"] >= strength)
+        mask &= ~water | self.water_resistant
+        return mask
+
+    def take(self, rows, col):
+        return self.columns[col][rows]
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+
+class CategoryIndex:
+    """
+    Category-partitioned index over the product/material map
+    (data/final/ml_dataset.csv layout).
+
+    category strings are interned to integer codes. Each category partition
+    keeps its rows sorted by weight_capacity_upto, so a lookup is one dict
+    hit plus a binary search, however many product domains the map grows to.
+    """
+
+    def __init__(self, df):
+        category_codes, self.categories = pd.factorize(df["category"])
+        self.category_codes = category_codes.astype(np.int32)
+        self.category_lookup = {category: code for code, category in enumerate(self.categories)}
+
+        capacities = df["weight_capacity_upto"].to_numpy(dtype=float)
+        order = np.lexsort((capacities, self.category_codes))
+        bounds = np.searchsorted(self.category_codes[order], np.arange(len(self.categories) + 1))
+
+        # code -> (sorted capacities, row positions in the same order)
+        self.partitions = {}
+        for code in range(len(self.categories)):
+            rows = order[bounds[code]:bounds[code + 1]]
+            self.partitions[code] = (capacities[rows], rows)
+
+    def lookup(self, category, min_capacity):
+        """Row positions (ascending) of `category` rows with weight_capacity_upto >= min_capacity."""
+        code = self.category_lookup.get(category)
+        if code is None:
+            return np.empty(0, dtype=np.intp)
+
+        capacities, rows = self.partitions[code]
+        start = np.searchsorted(capacities, min_capacity, side="left")
+        return np.sort(rows[start:])
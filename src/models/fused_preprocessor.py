@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+
+
+class FusedPreprocessor:
+    """
+    The fitted preprocessing ColumnTransformer from data_preparation.py,
+    exported as plain lookup tables.
+
+    Numeric columns: median imputation then (x - mean) / scale.
+    Categorical columns: most-frequent imputation then a category -> output
+    column dict (unknown categories stay all zeros, as with
+    handle_unknown='ignore'). The arithmetic is the same as sklearn's, so the
+    output is byte-for-byte identical, without the per-call DataFrame
+    validation of ColumnTransformer.transform.
+    """
+
+    def __init__(self, numeric_columns, medians, means, scales, categorical_columns, fill_values, lookups):
+        self.numeric_columns = list(numeric_columns)
+        self.medians = np.asarray(medians, dtype=np.float64)
+        self.means = np.asarray(means, dtype=np.float64)
+        self.scales = np.asarray(scales, dtype=np.float64)
+        self.categorical_columns = list(categorical_columns)
+        self.fill_values = list(fill_values)
+        self.lookups = lookups
+        self.n_features = len(self.numeric_columns) + sum(len(lookup) for lookup in lookups)
+
+    @classmethod
+    def from_column_transformer(cls, preprocessor):
+        """Exports the fitted num (imputer + scaler) / cat (imputer + onehot) ColumnTransformer."""
+        if preprocessor.remainder != "drop":
+            raise NotImplementedError("Only remainder='drop' is supported")
+        transformers = {name: (transformer, columns) for name, transformer, columns in preprocessor.transformers_}
+        if list(transformers) != ["num", "cat"]:
+            raise NotImplementedError(f"Unexpected transformers: {list(transformers)}")
+
+        numeric, numeric_columns = transformers["num"]
+        imputer, scaler = numeric.named_steps["imputer"], numeric.named_steps["scaler"]
+        if imputer.strategy not in ("median", "mean") or not (scaler.with_mean and scaler.with_std):
+            raise NotImplementedError("Unsupported numeric pipeline")
+
+        categorical, categorical_columns = transformers["cat"]
+        cat_imputer, onehot = categorical.named_steps["imputer"], categorical.named_steps["onehot"]
+        if onehot.drop is not None or onehot.handle_unknown != "ignore":
+            raise NotImplementedError("Unsupported OneHotEncoder settings")
+        lookups = [{category: i for i, category in enumerate(categories)} for categories in onehot.categories_]
+
+        return cls(
+            numeric_columns, imputer.statistics_, scaler.mean_, scaler.scale_,
+            categorical_columns, cat_imputer.statistics_, lookups
+        )
+
+    def _column(self, data, column):
+        if isinstance(data, pd.DataFrame):
+            return data[column].to_numpy()
+        return [row[column] for row in data]
+
+    def transform(self, data):
+        """
+        Accepts a DataFrame, a list of dicts or a single dict (one row) and
+        returns the dense (rows, n_features) float64 matrix.
+        """
+        if isinstance(data, dict):
+            data = [data]
+        n_rows = len(data)
+        out = np.zeros((n_rows, self.n_features))
+
+        numeric = np.empty((n_rows, len(self.numeric_columns)))
+        for j, column in enumerate(self.numeric_columns):
+            numeric[:, j] = self._column(data, column)
+        numeric = np.where(np.isnan(numeric), self.medians, numeric)
+        numeric -= self.means
+        numeric /= self.scales
+        out[:, :numeric.shape[1]] = numeric
+
+        offset = numeric.shape[1]
+        for column, fill_value, lookup in zip(self.categorical_columns, self.fill_values, self.lookups):
+            for i, value in enumerate(self._column(data, column)):
+                # Same missing test as SimpleImputer on object columns: only NaN, not None
+                if value != value:
+                    value = fill_value
+                position = lookup.get(value)
+                if position is not None:
+                    out[i, offset + position] = 1.0
+            offset += len(lookup)
+
+        return out
@@ -1,11 +1,310 @@
-def rank_materials(df, top_n=5):
+import os
+import threading
+from contextlib import nullcontext
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from .fused_preprocessor import FusedPreprocessor
+from .tree_inference import compile_model
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+ARTIFACTS_DIR = BASE_DIR / "models_artifacts"
+
+# "compiled" runs the fused preprocessor and evaluates small batches on the flattened tree
+# ensembles, "native" always uses the sklearn/XGBoost artifacts
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "compiled")
+# Above this many rows the native predictors' own batched traversal is faster
+COMPILED_MAX_ROWS = 256
+# "separate" uses cost_model + co2_model, "joint" the multi-output joint_model (model_training.py --joint)
+MODEL_MODE = os.getenv("MODEL_MODE", "separate")
+
+# Weights of the min-max composite score used by the Flask app / PackagingRecommender
+DEFAULT_WEIGHTS = {"sustainability": 0.4, "cost": 0.3, "co2": 0.3}
+# Weights of the inverse-value score used by the category service path
+SERVICE_WEIGHTS = {"sustainability": 0.5, "cost": 0.2, "co2": 0.3}
+
+
+def top_k_indices(scores, k=None):
+    """
+    Positions of the k highest scores, best first.
+
+    Uses argpartition to select the k candidates in O(n) and only sorts those,
+    instead of sorting the whole candidate set. k=None ranks everything.
+    """
+    scores = np.asarray(scores, dtype=float)
+    if k is None or k >= len(scores):
+        return np.argsort(-scores, kind="stable")
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+def rank_materials(df, top_n=5, weights=None):
+    weights = SERVICE_WEIGHTS if weights is None else weights
+
     df["final_rank_score"] = (
-        0.5 * df["sustainability_score"] +
-        0.3 * (1 / df["predicted_co2"]) +
-        0.2 * (1 / df["predicted_cost"])
+        weights["sustainability"] * df["sustainability_score"] +
+        weights["co2"] * (1 / df["predicted_co2"]) +
+        weights["cost"] * (1 / df["predicted_cost"])
+    )
+
+    return df.iloc[top_k_indices(df["final_rank_score"].to_numpy(), top_n)]
+
+
+def _min_max(values):
+    lo = values.min()
+    hi = values.max()
+    denom = hi - lo if hi != lo else 1
+    return (values - lo) / denom
+
+
+def composite_scores(sustainability, cost, co2, weights):
+    """
+    Weighted rank score over a candidate set: sustainability is min-max
+    normalised (higher is better), cost and CO2 are normalised and inverted
+    (lower is better). Works on NumPy arrays and pandas Series alike.
+    """
+    return (
+        weights["sustainability"] * _min_max(sustainability) +
+        weights["cost"] * (1 - _min_max(cost)) +
+        weights["co2"] * (1 - _min_max(co2))
     )
 
-    return df.sort_values(
-        by="final_rank_score",
-        ascending=False
-    ).head(top_n)
+
+def _masked_min_max(values, mask):
+    lo = np.where(mask, values, np.inf).min(axis=1, keepdims=True)
+    hi = np.where(mask, values, -np.inf).max(axis=1, keepdims=True)
+    denom = np.where(hi != lo, hi - lo, 1)
+    return (values - lo) / denom
+
+
+def batch_top_k(mask, sustainability, cost, co2, weights, k):
+    """
+    Ranks many candidate sets over one shared catalog in a single pass.
+
+    mask is an (m, n) candidate bitmap; the score columns are length-n arrays.
+    Each row is scored exactly like composite_scores over its own candidates.
+    Returns one (row positions, scores) pair per mask row, best first.
+    """
+    m, n = mask.shape
+    k = min(k, n)
+    if m == 0 or k == 0:
+        return [(np.empty(0, dtype=np.intp), np.empty(0)) for _ in range(m)]
+
+    # Rows without candidates produce inf - inf here; they are masked out below
+    with np.errstate(invalid="ignore"):
+        scores = (
+            weights["sustainability"] * _masked_min_max(sustainability, mask) +
+            weights["cost"] * (1 - _masked_min_max(cost, mask)) +
+            weights["co2"] * (1 - _masked_min_max(co2, mask))
+        )
+    scores[~mask] = -np.inf
+
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind="stable")
+    top = np.take_along_axis(top, order, axis=1)
+    top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+    counts = np.minimum(mask.sum(axis=1), k)
+    return [(top[i, :counts[i]], top_scores[i, :counts[i]]) for i in range(m)]
+
+
+class PackagingRecommender:
+    """
+    Shared inference core for the Flask app, the recommendation engine script
+    and the category service.
+
+    Artifacts are loaded lazily on first use with joblib memory-mapping, and
+    `warm_up()` loads everything and runs one prediction up front. Under
+    gunicorn with preload_app the master calls `warm_up()` once and the forked
+    workers share the loaded models copy-on-write.
+
+    With the "compiled" backend the preprocessor is exported to a
+    FusedPreprocessor and the cost and CO2 ensembles are flattened into
+    CompiledForest node arrays, which skip the per-call overhead of
+    sklearn/XGBoost on small batches (single requests, catalog refreshes).
+    Artifacts that cannot be exported fall back to their own transform/predict.
+
+    In "joint" model mode a single multi-output model predicts cost and CO2
+    in one pass, so only one ensemble is held and traversed.
+
+    `stage_timer(name)` is a context manager factory (e.g. Metrics.stage)
+    timing the preprocess / predict steps; a no-op by default.
+    """
+
+    ARTIFACTS = ("preprocessor", "cost_model", "co2_model")
+    JOINT_ARTIFACTS = ("preprocessor", "joint_model")
+
+    def __init__(self, artifacts_dir=ARTIFACTS_DIR, mmap_mode="r", backend=INFERENCE_BACKEND,
+                 compiled_max_rows=COMPILED_MAX_ROWS, model_mode=MODEL_MODE):
+        if backend not in ("compiled", "native"):
+            raise ValueError(f"Unknown inference backend: {backend}")
+        if model_mode not in ("separate", "joint"):
+            raise ValueError(f"Unknown model mode: {model_mode}")
+        self.artifacts_dir = Path(artifacts_dir)
+        self.mmap_mode = mmap_mode
+        self.backend = backend
+        self.model_mode = model_mode
+        self.artifact_names = self.JOINT_ARTIFACTS if model_mode == "joint" else self.ARTIFACTS
+        self.compiled_max_rows = compiled_max_rows
+        self._artifacts = {}
+        self._artifact_stats = {}
+        self._compiled = {}
+        self._load_lock = threading.Lock()
+        self.stage_timer = lambda name: nullcontext()
+
+    def _artifact(self, name):
+        artifact = self._artifacts.get(name)
+        if artifact is None:
+            with self._load_lock:
+                artifact = self._artifacts.get(name)
+                if artifact is None:
+                    path = self.artifacts_dir / f"{name}.pkl"
+                    stat = path.stat()
+                    artifact = joblib.load(path, mmap_mode=self.mmap_mode)
+                    self._artifact_stats[name] = (stat.st_size, stat.st_mtime_ns)
+                    self._artifacts[name] = artifact
+        return artifact
+
+    @property
+    def model_version(self):
+        """Fingerprint (size, mtime) of the artifact files as loaded, for caches of derived results."""
+        return tuple(sorted(self._artifact_stats.items()))
+
+    @property
+    def preprocessor(self):
+        return self._artifact("preprocessor")
+
+    @property
+    def cost_model(self):
+        return self._artifact("cost_model")
+
+    @property
+    def co2_model(self):
+        return self._artifact("co2_model")
+
+    @property
+    def joint_model(self):
+        return self._artifact("joint_model")
+
+    def _export(self, name, export_fn):
+        artifact = self._artifact(name)
+        if name not in self._compiled:
+            with self._load_lock:
+                if name not in self._compiled:
+                    try:
+                        self._compiled[name] = export_fn(artifact)
+                    except NotImplementedError as e:
+                        print(f"{name}: {e}, using the native artifact.")
+                        self._compiled[name] = None
+        return self._compiled[name] or artifact
+
+    def _transformer(self):
+        if self.backend != "compiled":
+            return self.preprocessor
+        return self._export("preprocessor", FusedPreprocessor.from_column_transformer)
+
+    def _predictor(self, name, n_rows):
+        if self.backend != "compiled" or n_rows > self.compiled_max_rows:
+            return self._artifact(name)
+        return self._export(name, compile_model)
+
+    def warm_up(self, sample_df=None):
+        """Loads (and compiles) every artifact and runs one prediction so the first request pays no load cost."""
+        for name in self.artifact_names:
+            self._artifact(name)
+        if sample_df is None:
+            sample_df = self._sample_input()
+        self.predict_metrics(sample_df)
+
+    def _sample_input(self):
+        # One row of valid model input, built from what the fitted preprocessor expects
+        row = {}
+        for name, transformer, columns in self.preprocessor.transformers_:
+            if name == "num":
+                row.update({col: 0.0 for col in columns})
+            elif name == "cat":
+                categories = transformer.named_steps["onehot"].categories_
+                row.update({col: categories[i][0] for i, col in enumerate(columns)})
+        return pd.DataFrame([row])
+
+    def predict_metrics(self, df):
+        # Transform features
+        # We need to ensure the dataframe matches the training structure
+        with self.stage_timer("preprocess"):
+            X_processed = self._transformer().transform(df)
+
+        n_rows = X_processed.shape[0]
+        if self.model_mode == "joint":
+            with self.stage_timer("predict_joint"):
+                predictions = self._predictor("joint_model", n_rows).predict(X_processed)
+            return predictions[:, 0], predictions[:, 1]
+
+        with self.stage_timer("predict_cost"):
+            predicted_cost = self._predictor("cost_model", n_rows).predict(X_processed)
+        with self.stage_timer("predict_co2"):
+            predicted_co2 = self._predictor("co2_model", n_rows).predict(X_processed)
+
+        return predicted_cost, predicted_co2
+
+    def index_catalog(self, df):
+        """
+        Builds the catalog prediction index: predicted cost/CO2 and the
+        sustainability column are computed once per material_id at load time,
+        so requests only have to filter and rescore.
+        """
+        df = df.drop_duplicates(subset="material_id").reset_index(drop=True)
+
+        # ml.material_features has no sustainability_score column, derive it the
+        # same way as the feature engineered CSV (mean of biodegradability and recyclability)
+        if "sustainability_score" not in df.columns:
+            df["sustainability_score"] = (df["biodegradability_score"] + df["recyclability_percent"]) / 2
+        df["sustainability_score"] = pd.to_numeric(df["sustainability_score"], errors="coerce").fillna(0).astype(float)
+
+        pred_cost, pred_co2 = self.predict_metrics(df)
+        df["predicted_cost"] = pred_cost
+        df["predicted_co2"] = pred_co2
+        return df
+
+    def rank_materials(self, df, weights=None, top_k=None):
+        """
+        Ranks materials based on Sustainability Score, Predicted Cost, and Predicted CO2.
+        Higher Rank Score is better. With top_k set, only the best top_k rows are
+        selected (argpartition) and returned instead of sorting the full set.
+        """
+        weights = DEFAULT_WEIGHTS if weights is None else weights
+        df = df.copy()
+
+        # Catalog rows coming from index_catalog already carry their predictions
+        if "predicted_cost" not in df.columns or "predicted_co2" not in df.columns:
+            pred_cost, pred_co2 = self.predict_metrics(df)
+            df["predicted_cost"] = pred_cost
+            df["predicted_co2"] = pred_co2
+
+        # Normalize to 0-1 range for fair weighting and calculate Composite Score
+        df["rank_score"] = composite_scores(
+            df["sustainability_score"], df["predicted_cost"], df["predicted_co2"], weights
+        )
+
+        # Partial sort: only the top_k candidates are ordered
+        return df.iloc[top_k_indices(df["rank_score"].to_numpy(), top_k)]
+
+
+_shared_recommender = None
+_shared_lock = threading.Lock()
+
+
+def get_recommender():
+    """Process-wide PackagingRecommender, so every caller shares one set of loaded models."""
+    global _shared_recommender
+    if _shared_recommender is None:
+        with _shared_lock:
+            if _shared_recommender is None:
+                _shared_recommender = PackagingRecommender()
+    return _shared_recommender
@@ -0,0 +1,148 @@
+import numpy as np
+
+# Candidates inserted one by one between vectorized elimination passes
+BLOCK_SIZE = 256
+
+
+def objective_matrix(sustainability, cost, co2):
+    """(n, 3) objectives oriented so that larger is better everywhere."""
+    return np.column_stack([
+        np.asarray(sustainability, dtype=float),
+        -np.asarray(cost, dtype=float),
+        -np.asarray(co2, dtype=float),
+    ])
+
+
+def constraint_matrix(weight_capacity_kg, strength, water_resistant):
+    """(n, 3) constraint columns; a larger value satisfies every threshold a smaller one does."""
+    return np.column_stack([
+        np.asarray(weight_capacity_kg, dtype=float),
+        np.asarray(strength, dtype=float),
+        np.asarray(water_resistant, dtype=float),
+    ])
+
+
+def _dominates(a_obj, b_obj, a_con=None, b_con=None):
+    """
+    Broadcasting dominance test: a is at least as good on every objective and
+    strictly better on one (and, with constraint columns, at least as good on
+    every constraint). Shapes (..., d) broadcast against each other.
+    """
+    dominated = (a_obj >= b_obj).all(axis=-1) & (a_obj > b_obj).any(axis=-1)
+    if a_con is not None:
+        dominated &= (a_con >= b_con).all(axis=-1)
+    return dominated
+
+
+def pareto_front(objectives):
+    """
+    Positions of the non-dominated rows of an (m, d) larger-is-better
+    objective matrix. Rows are visited in descending objective sum (an order
+    in which no row is dominated by a later one), and each skyline row found
+    eliminates everything it dominates in one vectorized step, so the cost is
+    O(m * skyline size) instead of an O(m^2) pairwise scan.
+    """
+    remaining = np.argsort(-objectives.sum(axis=1), kind="stable")
+    front = []
+    while remaining.size:
+        best = remaining[0]
+        front.append(best)
+        rest = remaining[1:]
+        remaining = rest[~_dominates(objectives[best], objectives[rest])]
+    return np.array(front, dtype=np.intp)
+
+
+class SkylineIndex:
+    """
+    Precomputed Pareto structure for "non-dominated materials among those
+    satisfying the hard constraints" queries.
+
+    `rows` holds every material that no other material dominates on the
+    objectives (sustainability up, cost down, CO2 down) while also being at
+    least as good on every constraint column (capacity, strength, water
+    resistance). A row outside this set is dominated by a material that
+    satisfies every constraint it satisfies, so it can never be on a
+    constrained front: queries filter and scan `rows` only, never the
+    catalog.
+
+    `updated()` derives the index of a new catalog snapshot from the previous
+    one, re-examining only changed rows and the rows a removed member used to
+    dominate.
+    """
+
+    def __init__(self, objectives, constraints, rows=None):
+        self.objectives = objectives
+        self.constraints = constraints
+        if rows is None:
+            rows = self._insert(np.empty(0, dtype=np.intp), np.arange(len(objectives)))
+        self.rows = rows
+
+    def _insert(self, members, candidates):
+        """Adds `candidates` to the skyline `members`, dropping members a new row dominates."""
+        obj, con = self.objectives, self.constraints
+        # Likely dominators first: the first members found eliminate most of the remaining candidates
+        candidates = candidates[np.argsort(-(obj[candidates].sum(axis=1) + con[candidates].sum(axis=1)), kind="stable")]
+        filters = members
+        while candidates.size:
+            # Each member filters the remaining candidates once, in one vectorized step
+            for row in filters:
+                candidates = candidates[~_dominates(obj[row], obj[candidates], con[row], con[candidates])]
+            block, candidates = candidates[:BLOCK_SIZE], candidates[BLOCK_SIZE:]
+
+            added = []
+            for row in block:
+                if members.size and _dominates(obj[members], obj[row], con[members], con[row]).any():
+                    continue
+                members = members[~_dominates(obj[row], obj[members], con[row], con[members])]
+                members = np.append(members, row)
+                added.append(row)
+            filters = added
+        return np.sort(members)
+
+    @classmethod
+    def updated(cls, previous, objectives, constraints, old_to_new):
+        """
+        Index for a new snapshot. `old_to_new[i]` is the new position of the
+        previous snapshot's row i, or -1 if that row was changed or removed;
+        new rows no old row maps to are treated as inserted.
+        """
+        mapped = old_to_new[previous.rows]
+        members = mapped[mapped >= 0]
+        removed = previous.rows[mapped < 0]
+
+        # Unchanged non-members that only a removed member dominated may now be on the skyline
+        kept = np.flatnonzero(old_to_new >= 0)
+        kept = kept[~np.isin(kept, previous.rows, assume_unique=True)]
+        uncovered = np.zeros(len(kept), dtype=bool)
+        for row in removed:
+            uncovered |= _dominates(previous.objectives[row], previous.objectives[kept],
+                                    previous.constraints[row], previous.constraints[kept])
+
+        inserted = np.ones(len(objectives), dtype=bool)
+        inserted[old_to_new[old_to_new >= 0]] = False
+        candidates = np.concatenate([old_to_new[kept[uncovered]], np.flatnonzero(inserted)])
+
+        index = cls(objectives, constraints, rows=members)
+        index.rows = index._insert(members, candidates)
+        return index
+
+    def query(self, weight_capacity_kg=0, strength=0, water_resistant=False):
+        """
+        Catalog rows of the Pareto front among materials satisfying the
+        constraints (same semantics as CatalogFilterEngine.query), ordered by
+        sustainability, then cost, then CO2.
+        """
+        con = self.constraints[self.rows]
+        satisfied = np.ones(len(self.rows), dtype=bool)
+        if weight_capacity_kg > 0:
+            satisfied &= con[:, 0] >= weight_capacity_kg
+        if strength > 0:
+            satisfied &= con[:, 1] >= strength
+        if water_resistant:
+            satisfied &= con[:, 2] >= 1
+        members = self.rows[satisfied]
+
+        obj = self.objectives[members]
+        front = members[pareto_front(obj)]
+        obj = self.objectives[front]
+        return front[np.lexsort((-obj[:, 2], -obj[:, 1], -obj[:, 0]))]
@@ -0,0 +1,178 @@
+import json
+
+import numpy as np
+
+# Rows evaluated per traversal step; bounds the (trees x rows) index matrices
+BATCH_ROWS = 4096
+
+
+class CompiledForest:
+    """
+    Tree ensemble flattened into one array-of-nodes and evaluated with NumPy.
+
+    Every tree of a sklearn forest or an XGBoost booster is packed into shared
+    node arrays (feature, threshold, left/right child, missing direction, leaf
+    value) with absolute child indices; leaves point to themselves. A batch is
+    predicted by advancing all (tree, row) cursors one level per step, so the
+    cost is max_depth vectorized steps instead of per-call estimator overhead.
+    """
+
+    def __init__(self, feature, threshold, left, right, missing_left, value, roots, depth,
+                 base_score=0.0, average=False, strict_less=False, dtype=np.float64,
+                 output_scale=None, output_offset=None):
+        self.feature = feature
+        self.threshold = threshold
+        # children[2 * node + go_left]: one gather per step instead of two plus a select
+        self.children = np.stack([right, left], axis=1).ravel()
+        self.missing_left = missing_left
+        self.value = value
+        self.roots = roots
+        self.depth = depth
+        self.base_score = base_score
+        self.average = average
+        self.strict_less = strict_less
+        self.dtype = dtype
+        # Inverse of a StandardScaler the targets were fitted on (TransformedTargetRegressor)
+        self.output_scale = output_scale
+        self.output_offset = output_offset
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """RandomForestRegressor / ExtraTreesRegressor (or a single DecisionTreeRegressor)."""
+        estimators = getattr(model, "estimators_", [model])
+        parts, roots, offset, depth = [], [], 0, 0
+
+        for estimator in estimators:
+            tree = estimator.tree_
+            is_leaf = tree.children_left == -1
+            nodes = np.arange(tree.node_count) + offset
+            missing = getattr(tree, "missing_go_to_left", np.ones(tree.node_count, dtype=np.uint8))
+            parts.append((
+                np.where(is_leaf, 0, tree.feature),
+                tree.threshold,
+                np.where(is_leaf, nodes, tree.children_left + offset),
+                np.where(is_leaf, nodes, tree.children_right + offset),
+                missing.astype(bool),
+                tree.value[:, :, 0],
+            ))
+            roots.append(offset)
+            offset += tree.node_count
+            depth = max(depth, tree.max_depth)
+
+        columns = [np.concatenate(column) for column in zip(*parts)]
+        # sklearn compares float32 inputs against float64 thresholds
+        return cls(*columns, roots=np.array(roots), depth=depth,
+                   average=True, strict_less=False, dtype=np.float32)
+
+    @classmethod
+    def from_xgboost(cls, model):
+        """XGBRegressor / Booster with an identity link (reg:squarederror)."""
+        booster = model.get_booster() if hasattr(model, "get_booster") else model
+        learner = json.loads(booster.save_raw("json"))["learner"]
+
+        objective = learner["objective"]["name"]
+        if objective not in ("reg:squarederror", "reg:linear"):
+            raise NotImplementedError(f"Unsupported XGBoost objective: {objective}")
+        params = learner["learner_model_param"]
+        if int(params.get("num_target", 1)) != 1:
+            raise NotImplementedError("Multi-target XGBoost models are not supported")
+        base_score = float(params["base_score"].strip("[]"))
+
+        parts, roots, offset, depth = [], [], 0, 0
+        for tree in learner["gradient_booster"]["model"]["trees"]:
+            left = np.array(tree["left_children"])
+            right = np.array(tree["right_children"])
+            split_conditions = np.array(tree["split_conditions"], dtype=np.float32)
+            is_leaf = left == -1
+            nodes = np.arange(len(left)) + offset
+            parts.append((
+                np.where(is_leaf, 0, tree["split_indices"]),
+                split_conditions,
+                np.where(is_leaf, nodes, left + offset),
+                np.where(is_leaf, nodes, right + offset),
+                np.array(tree["default_left"], dtype=bool),
+                # Leaf values are stored in split_conditions
+                np.where(is_leaf, split_conditions, 0).astype(np.float32)[:, None],
+            ))
+            roots.append(offset)
+            offset += len(left)
+            depth = max(depth, _tree_depth(left, right))
+
+        columns = [np.concatenate(column) for column in zip(*parts)]
+        return cls(*columns, roots=np.array(roots), depth=depth,
+                   base_score=np.float32(base_score), average=False, strict_less=True, dtype=np.float32)
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    def _leaves(self, X):
+        # (trees, rows) cursor matrix, advanced one level per step
+        n_rows, n_features = X.shape
+        flat = X.ravel()
+        row_offsets = (np.arange(n_rows) * n_features)[None, :]
+        node = np.repeat(self.roots[:, None], n_rows, axis=1)
+        has_missing = np.isnan(flat).any()
+        for _ in range(self.depth):
+            x = flat[row_offsets + self.feature[node]]
+            threshold = self.threshold[node]
+            go_left = x < threshold if self.strict_less else x <= threshold
+            if has_missing:
+                go_left = np.where(np.isnan(x), self.missing_left[node], go_left)
+            node = self.children[2 * node + go_left]
+        return node
+
+    def predict(self, X):
+        X = np.ascontiguousarray(X, dtype=self.dtype)
+        if X.ndim == 1:
+            X = X[None, :]
+
+        outputs = []
+        for start in range(0, X.shape[0], BATCH_ROWS):
+            leaf_values = self.value[self._leaves(X[start:start + BATCH_ROWS])]
+            # Accumulate tree by tree, in the same order (and precision) as the original model,
+            # so predictions match bit for bit: XGBoost starts from base_score, sklearn averages
+            total = np.zeros(leaf_values.shape[1:], dtype=leaf_values.dtype)
+            if not self.average:
+                total += self.base_score
+            for tree_values in leaf_values:
+                total += tree_values
+            if self.average:
+                total /= self.n_trees
+            if self.output_scale is not None:
+                total *= self.output_scale
+            if self.output_offset is not None:
+                total += self.output_offset
+            outputs.append(total)
+
+        prediction = np.concatenate(outputs)
+        return prediction[:, 0] if prediction.shape[1] == 1 else prediction
+
+
+def _tree_depth(left, right):
+    depth = np.zeros(len(left), dtype=int)
+    for node in range(len(left)):
+        if left[node] != -1:
+            depth[left[node]] = depth[right[node]] = depth[node] + 1
+    return int(depth.max())
+
+
+def compile_model(model):
+    """
+    Flattens a fitted sklearn forest or XGBoost regressor into a CompiledForest.
+    A TransformedTargetRegressor over a StandardScaler compiles its regressor,
+    with the inverse scaling applied to the output.
+    """
+    if hasattr(model, "regressor_"):
+        transformer = model.transformer_
+        if type(transformer).__name__ != "StandardScaler":
+            raise NotImplementedError(f"No compiled backend for a {type(transformer).__name__} target transformer")
+        compiled = compile_model(model.regressor_)
+        compiled.output_scale = transformer.scale_ if transformer.with_std else None
+        compiled.output_offset = transformer.mean_ if transformer.with_mean else None
+        return compiled
+    if hasattr(model, "get_booster"):
+        return CompiledForest.from_xgboost(model)
+    if hasattr(model, "estimators_") or hasattr(model, "tree_"):
+        return CompiledForest.from_sklearn(model)
+    raise NotImplementedError(f"No compiled backend for {type(model).__name__}")
@@ -0,0 +1,220 @@
+"""
+Load control for the recommendation endpoints.
+
+SingleFlight coalesces concurrent identical computations: the first caller
+for a key runs it, callers arriving while it is in progress wait for and
+share its result (or exception). SharedSingleFlight extends this across
+gunicorn workers on one host through lock and result files in a local
+directory (ideally tmpfs, e.g. /dev/shm).
+
+AdmissionController sheds load before latency collapses: a request is
+rejected (the app answers 429) when the process already runs max_in_flight
+requests and no slot frees up within max_wait, or when a front proxy's
+X-Request-Start header shows it already queued longer than max_queue_delay.
+
+SharedSlots caps a long-running kind of request (report exports) across
+every worker process on the host, with one flock per slot.
+"""
+import fcntl
+import hashlib
+import os
+import pickle
+import threading
+import time
+from pathlib import Path
+
+# Lock and result files older than this many result_ttl are deleted every PRUNE_EVERY computations
+PRUNE_AGE = 10
+PRUNE_EVERY = 1000
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self.hits = 0     # callers that shared another caller's result
+        self.misses = 0   # computations actually run
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """Returns (result, shared): fn()'s result, computed once for all concurrent callers of `key`."""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.hits += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+        try:
+            flight.result, shared = self._execute(key, fn)
+            return flight.result, shared
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def _execute(self, key, fn):
+        with self._lock:
+            self.misses += 1
+        return fn(), False
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "in_progress": len(self._flights)}
+
+
+class SharedSingleFlight(SingleFlight):
+    """
+    Cross-process single flight. Within a process it behaves like SingleFlight;
+    the one leader per process then takes an exclusive lock on the key's own
+    lock file, so only identical requests ever wait on each other. The worker
+    that gets it first computes and writes the (pickled) result file; workers
+    blocked on the lock read that result instead of computing, as long as it
+    is younger than `result_ttl` seconds.
+    """
+
+    def __init__(self, directory, result_ttl=1.0):
+        super().__init__()
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.result_ttl = result_ttl
+
+    def _execute(self, key, fn):
+        name = hashlib.sha1(str(key).encode()).hexdigest()
+        result_path = self.directory / f"{name}.result"
+        lock_path = self.directory / f"{name}.lock"
+        with open(lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                os.utime(lock_path)  # recently used locks are not pruned
+                try:
+                    if time.time() - result_path.stat().st_mtime < self.result_ttl:
+                        with open(result_path, "rb") as f:
+                            result = pickle.load(f)
+                        with self._lock:
+                            self.hits += 1
+                        return result, True
+                except (OSError, EOFError, pickle.UnpicklingError):
+                    pass
+
+                result, _ = super()._execute(key, fn)
+                tmp_path = result_path.with_suffix(f".{os.getpid()}.tmp")
+                with open(tmp_path, "wb") as f:
+                    pickle.dump(result, f)
+                os.replace(tmp_path, result_path)
+                if self.misses % PRUNE_EVERY == 0:
+                    self._prune()
+                return result, False
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _prune(self):
+        cutoff = time.time() - PRUNE_AGE * self.result_ttl
+        for path in self.directory.glob("*.result"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                pass
+        for path in self.directory.glob("*.lock"):
+            try:
+                if path.stat().st_mtime >= cutoff:
+                    continue
+                # Only idle locks; a worker that opened the file but has not locked it yet
+                # at worst computes its key once more on a fresh lock file
+                with open(path, "a") as lock_file:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    path.unlink()
+            except OSError:
+                pass
+
+
+class SharedSlots:
+    """
+    At most `size` concurrent holders across all processes (and threads)
+    using `directory`: slot i is an exclusive, non-blocking flock on
+    <name>-<i>.lock. A lock belongs to its open file, so two threads of one
+    worker compete like two workers do, and a crashed worker frees its slot.
+    """
+
+    def __init__(self, directory, size, name="slot"):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.size = size
+        self.name = name
+
+    def try_acquire(self):
+        """A held slot (pass it to release()), or None when all `size` are taken."""
+        for i in range(self.size):
+            slot = open(self.directory / f"{self.name}-{i}.lock", "a")
+            try:
+                fcntl.flock(slot, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return slot
+            except BlockingIOError:
+                slot.close()
+        return None
+
+    def release(self, slot):
+        fcntl.flock(slot, fcntl.LOCK_UN)
+        slot.close()
+
+
+class AdmissionController:
+    def __init__(self, max_in_flight=32, max_wait=0.05, max_queue_delay=None):
+        self.max_in_flight = max_in_flight
+        self.max_wait = max_wait
+        self.max_queue_delay = max_queue_delay
+        self.admitted = 0
+        self.rejected = 0
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def queue_delay(request_start, now=None):
+        """
+        Seconds since a front proxy received the request, from X-Request-Start
+        ("t=<epoch seconds|ms|us>", as set by nginx/Heroku), or None.
+        """
+        if not request_start:
+            return None
+        try:
+            started = float(request_start.strip().removeprefix("t="))
+        except ValueError:
+            return None
+        while started > 1e11:  # milli- or microseconds
+            started /= 1000
+        return (time.time() if now is None else now) - started
+
+    def try_acquire(self, request_start=None):
+        """True if the request may run (call release() when it finishes), False to shed it."""
+        delay = self.queue_delay(request_start) if self.max_queue_delay is not None else None
+        admitted = (delay is None or delay <= self.max_queue_delay) and self._slots.acquire(timeout=self.max_wait)
+        with self._lock:
+            if admitted:
+                self.admitted += 1
+            else:
+                self.rejected += 1
+        return admitted
+
+    def release(self):
+        self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            return {"admitted": self.admitted, "rejected": self.rejected}
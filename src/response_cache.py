@@ -0,0 +1,75 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+CachedResponse = namedtuple("CachedResponse", ["body", "etag", "event", "expires_at"])
+
+
+def request_key(weight_req, strength_req, water_res_req, mode="rank"):
+    """Canonical key of a /api/recommend request: the parsed requirement values (and mode), not the raw JSON."""
+    return json.dumps([float(weight_req), float(strength_req), int(water_res_req), mode])
+
+
+def body_etag(body):
+    return hashlib.sha1(body).hexdigest()[:32]
+
+
+class ResponseCache:
+    """
+    Serialized /api/recommend responses keyed by the canonical request, with
+    TTL and LRU eviction.
+
+    Entries are only valid for the catalog snapshot and models they were
+    computed from: `get()`/`put()` take that version, and the first call with
+    a new version drops every entry. ETags are a hash of the body, so they
+    stay correct across processes and restarts. `event` holds what the
+    analytics store needs to record a served hit without recomputing it.
+    """
+
+    def __init__(self, max_entries=4096, ttl_seconds=300):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._version = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _check_version(self, version):
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+
+    def get(self, key, version):
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at < time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, version, body, event=None):
+        entry = CachedResponse(body, body_etag(body), event, time.monotonic() + self.ttl_seconds)
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
@@ -0,0 +1,237 @@
+"""
+Parallel cross-validated training runner for the cost and CO2 models.
+
+Every (target, hyperparameter candidate, fold) fit is an independent task in
+one process pool, so both models train concurrently on all cores. Each
+finished fold is written to the search cache, so an interrupted search
+resumes where it stopped. Results are aggregated into a leaderboard, and the
+best candidate per target can be refit on the training split and saved as the
+serving artifact. The test split is never used, so held-out evaluations
+(model_training.py, notebooks/05_model_evaluation) stay unbiased.
+
+Examples (from the project root):
+    python src/training_runner.py                        # grid search, 5 folds, all cores
+    python src/training_runner.py --n-iter 10 --folds 10 # random search
+    python src/training_runner.py --targets cost --n-jobs 4 --save
+    python src/training_runner.py --targets joint        # multi-output cost + CO2 model
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.model_selection import KFold, ParameterGrid, ParameterSampler
+from xgboost import XGBRegressor
+
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from evaluation.metrics import regression_metrics
+from model_training import load_data, make_joint_model
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+ARTIFACTS_DIR = BASE_DIR / "models_artifacts"
+CACHE_DIR = ARTIFACTS_DIR / "search_cache"
+
+# target -> (estimator, fixed params, search space, artifact file)
+SEARCH_SPACES = {
+    "cost": (
+        RandomForestRegressor,
+        {"random_state": 42},
+        {"n_estimators": [100, 200], "max_depth": [6, 10, None], "min_samples_leaf": [1, 2]},
+        "cost_model.pkl"
+    ),
+    "co2": (
+        XGBRegressor,
+        {"random_state": 42},
+        {"n_estimators": [100, 200], "learning_rate": [0.05, 0.1], "max_depth": [3, 6]},
+        "co2_model.pkl"
+    ),
+    # Multi-output [cost, co2] model on standardized targets; its fold metrics are averaged over the two outputs
+    "joint": (
+        make_joint_model,
+        {"random_state": 42},
+        {"n_estimators": [100, 200], "max_depth": [6, 10, None], "min_samples_leaf": [1, 2]},
+        "joint_model.pkl"
+    ),
+}
+
+# Set once per worker process by the pool initializer, so the arrays are not re-sent with every task
+_worker_data = {}
+
+
+def _init_worker(X, targets):
+    _worker_data["X"] = X
+    _worker_data["targets"] = targets
+
+
+def make_model(target, params, model_jobs=1):
+    estimator, fixed, _, _ = SEARCH_SPACES[target]
+    return estimator(**fixed, **params, n_jobs=model_jobs)
+
+
+def candidates(target, n_iter=None, seed=42):
+    """Every grid point, or n_iter random draws from the grid (random search)."""
+    space = SEARCH_SPACES[target][2]
+    if n_iter is None:
+        return list(ParameterGrid(space))
+    return list(ParameterSampler(space, n_iter=n_iter, random_state=seed))
+
+
+def data_fingerprint(X, targets):
+    digest = hashlib.sha1(np.ascontiguousarray(X).tobytes())
+    for name in sorted(targets):
+        digest.update(name.encode())
+        digest.update(np.ascontiguousarray(targets[name], dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def fold_key(target, params, fold, folds, seed, fingerprint):
+    # The estimator name is part of the key, so folds cached before a target's model changed are not reused
+    payload = json.dumps(
+        {"target": target, "estimator": SEARCH_SPACES[target][0].__name__, "params": params,
+         "fold": fold, "folds": folds, "seed": seed, "data": fingerprint},
+        sort_keys=True, default=str
+    )
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def _fit_fold(target, params, train_idx, test_idx, model_jobs, cache_path):
+    X, y = _worker_data["X"], _worker_data["targets"][target]
+    start = time.perf_counter()
+    model = make_model(target, params, model_jobs)
+    model.fit(X[train_idx], y[train_idx])
+    result = {
+        "target": target,
+        "params": params,
+        "metrics": regression_metrics(y[test_idx], model.predict(X[test_idx])),
+        "fit_seconds": time.perf_counter() - start,
+    }
+    # Write-then-rename, so an interrupted run never leaves a half-written fold behind
+    tmp_path = cache_path.with_suffix(".tmp")
+    joblib.dump(result, tmp_path)
+    os.replace(tmp_path, cache_path)
+    return result
+
+
+def run_search(X, targets, folds=5, n_iter=None, n_jobs=None, model_jobs=1, cache_dir=CACHE_DIR, seed=42):
+    """
+    Cross-validates every candidate of every target in `targets`
+    ({"cost": y_cost, "co2": y_co2}) in one process pool of n_jobs workers
+    (default: all cores). Folds already in `cache_dir` are not refit.
+
+    Returns (leaderboard DataFrame, {"fitted": n, "cached": n}).
+    """
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    fingerprint = data_fingerprint(X, targets)
+    splits = list(KFold(n_splits=folds, shuffle=True, random_state=seed).split(X))
+
+    # Results stay in task order (not completion order), so the leaderboard is reproducible to the last bit
+    results, pending = [], {}
+    for target in targets:
+        for params in candidates(target, n_iter, seed):
+            for fold, (train_idx, test_idx) in enumerate(splits):
+                cache_path = cache_dir / f"{fold_key(target, params, fold, folds, seed, fingerprint)}.joblib"
+                if cache_path.exists():
+                    results.append(joblib.load(cache_path))
+                else:
+                    pending[len(results)] = (target, params, train_idx, test_idx, model_jobs, cache_path)
+                    results.append(None)
+
+    print(f"{len(results) - len(pending)} folds cached, {len(pending)} to fit")
+    if pending:
+        with ProcessPoolExecutor(max_workers=n_jobs or os.cpu_count(), initializer=_init_worker,
+                                 initargs=(X, targets)) as pool:
+            futures = {pool.submit(_fit_fold, *task): position for position, task in pending.items()}
+            for done, future in enumerate(as_completed(futures), 1):
+                results[futures[future]] = future.result()
+                if done % 50 == 0 or done == len(futures):
+                    print(f"  {done}/{len(futures)} folds fitted")
+
+    return leaderboard(results), {"fitted": len(pending), "cached": len(results) - len(pending)}
+
+
+def leaderboard(results):
+    """Mean/std of the fold metrics per (target, params), best RMSE first within each target."""
+    rows = pd.DataFrame([
+        {"target": r["target"], "params": json.dumps(r["params"], sort_keys=True, default=str),
+         **r["metrics"], "fit_seconds": r["fit_seconds"]}
+        for r in results
+    ])
+    board = rows.groupby(["target", "params"]).agg(
+        RMSE=("RMSE", "mean"),
+        RMSE_std=("RMSE", "std"),
+        MAE=("MAE", "mean"),
+        R2=("R2", "mean"),
+        folds=("RMSE", "size"),
+        fit_seconds=("fit_seconds", "sum")
+    ).reset_index()
+    board = board.sort_values(["target", "RMSE"], kind="stable").reset_index(drop=True)
+    board.insert(1, "rank", board.groupby("target").cumcount() + 1)
+    return board
+
+
+def _refit(target, params, model_jobs):
+    model = make_model(target, params, model_jobs)
+    model.fit(_worker_data["X"], _worker_data["targets"][target])
+    return target, model
+
+
+def refit_best(board, X, targets, n_jobs=None, model_jobs=1):
+    """Refits the rank 1 candidate of each target on all rows of X, in parallel. Returns {target: model}."""
+    best = board[board["rank"] == 1]
+    with ProcessPoolExecutor(max_workers=min(n_jobs or os.cpu_count(), len(best)) or 1,
+                             initializer=_init_worker, initargs=(X, targets)) as pool:
+        futures = [pool.submit(_refit, row.target, json.loads(row.params), model_jobs) for row in best.itertuples()]
+        return dict(future.result() for future in futures)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--targets", nargs="+", choices=sorted(SEARCH_SPACES), default=["cost", "co2"])
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--n-iter", type=int, help="random search with this many candidates per target (default: full grid)")
+    parser.add_argument("--n-jobs", type=int, help="worker processes (default: all cores)")
+    parser.add_argument("--model-jobs", type=int, default=1, help="n_jobs of each fitted model")
+    parser.add_argument("--cache-dir", default=str(CACHE_DIR))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save", action="store_true", help="refit the best candidates on the training split and overwrite the artifacts")
+    args = parser.parse_args()
+
+    # Search and refit on the training split only: the saved artifacts are scored on the test split
+    X, _, y_cost_train, _, y_co2_train, _ = load_data()
+    all_targets = {"cost": np.asarray(y_cost_train), "co2": np.asarray(y_co2_train)}
+    all_targets["joint"] = np.column_stack([all_targets["cost"], all_targets["co2"]])
+    targets = {name: all_targets[name] for name in args.targets}
+
+    start = time.perf_counter()
+    board, counts = run_search(
+        X, targets,
+        folds=args.folds,
+        n_iter=args.n_iter,
+        n_jobs=args.n_jobs,
+        model_jobs=args.model_jobs,
+        cache_dir=args.cache_dir,
+        seed=args.seed
+    )
+    print(f"\nSearch finished in {time.perf_counter() - start:.1f}s "
+          f"({counts['fitted']} folds fitted, {counts['cached']} from cache)\n")
+    print(board.to_string(index=False))
+    board.to_csv(Path(args.cache_dir) / "leaderboard.csv", index=False)
+
+    if args.save:
+        for target, model in refit_best(board, X, targets, args.n_jobs, args.model_jobs).items():
+            joblib.dump(model, ARTIFACTS_DIR / SEARCH_SPACES[target][3])
+            print(f"{target} model saved.")
+
+
+if __name__ == "__main__":
+    main()
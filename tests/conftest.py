@@ -0,0 +1,7 @@
+import os
+import tempfile
+
+# Set before src.app is imported: the requests tests send must not be recorded in data/analytics.db,
+# and exports must not compete for a running server's slots
+os.environ.setdefault("ANALYTICS_DB", os.path.join(tempfile.mkdtemp(), "analytics.db"))
+os.environ.setdefault("EXPORT_SLOT_DIR", tempfile.mkdtemp())
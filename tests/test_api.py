@@ -0,0 +1,254 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import src.app as app_module
+from src.ai_insights import InsightService, StubInsightBackend
+from src.app import app
+from src.response_cache import ResponseCache
+
+REQUIREMENTS = [
+    {},
+    {"weight_capacity_kg": 5, "strength": 5, "water_resistance": 1},
+    {"weight_capacity_kg": 15},
+    {"weight_capacity_kg": 100},
+]
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+def test_batch_matches_single_recommendations(client):
+    response = client.post("/api/recommend/batch", json=REQUIREMENTS)
+    lines = [json.loads(line) for line in response.data.decode().splitlines()]
+
+    assert response.mimetype == "application/x-ndjson"
+    assert [line["index"] for line in lines] == list(range(len(REQUIREMENTS)))
+    for requirement, line in zip(REQUIREMENTS, lines):
+        single = client.post("/api/recommend", json=requirement).get_json()
+        assert line["recommendations"] == single["recommendations"]
+
+
+def test_batch_accepts_ndjson_and_reports_bad_lines(client):
+    body = json.dumps(REQUIREMENTS[1]) + "\nnot json\n"
+    response = client.post("/api/recommend/batch", data=body, content_type="application/x-ndjson")
+    lines = [json.loads(line) for line in response.data.decode().splitlines()]
+
+    assert lines[0]["count"] > 0
+    assert lines[1]["index"] == 1 and "error" in lines[1]
+
+
+def test_recommend_returns_before_insight_and_caches_it(client, monkeypatch):
+    backend = StubInsightBackend(delay=0.2)
+    monkeypatch.setattr(app_module, "insight_service", InsightService(backend))
+    monkeypatch.setattr(app_module, "response_cache", ResponseCache())
+
+    first = client.post("/api/recommend", json=REQUIREMENTS[1]).get_json()
+    assert first["ai_insight_status"] == "pending"
+
+    polled = client.get(f"/api/insights/{first['ai_insight_id']}?wait=5").get_json()
+    assert polled["status"] == "ready"
+
+    second = client.post("/api/recommend", json=REQUIREMENTS[1]).get_json()
+    assert second["ai_insight_id"] == first["ai_insight_id"]
+    assert second["ai_insight"] == polled["text"]
+    assert backend.calls == 1
+
+
+def test_app_shares_the_process_wide_recommender():
+    import sys
+
+    from src.models.recommender import get_recommender
+
+    assert app_module.recommender is get_recommender()
+    assert "models.recommender" not in sys.modules
+
+
+def test_metrics_endpoint_reports_stages_and_requests(client):
+    client.post("/api/recommend", json=REQUIREMENTS[1])
+    response = client.get("/api/metrics")
+    text = response.data.decode()
+
+    assert response.content_type.startswith("text/plain; version=0.0.4")
+    for stage in ("filter", "rank", "serialize"):
+        assert f'ecopack_stage_seconds_count{{stage="{stage}"}}' in text
+    assert 'ecopack_stage_seconds_quantile{stage="filter",quantile="0.99"}' in text
+    assert 'ecopack_requests_total{endpoint="/api/recommend",method="POST",status="200"}' in text
+    assert 'ecopack_request_seconds_bucket{endpoint="/api/recommend",method="POST",le="+Inf"}' in text
+
+
+def test_profile_is_opt_in(client, monkeypatch):
+    assert "X-Profile-Id" not in client.post("/api/recommend?profile=1", json=REQUIREMENTS[1]).headers
+
+    monkeypatch.setattr(app_module, "PROFILING_ENABLED", True)
+    response = client.post("/api/recommend?profile=1", json=REQUIREMENTS[1])
+    profile = client.get(f"/api/metrics/profiles/{response.headers['X-Profile-Id']}")
+    assert profile.status_code == 200
+
+
+def test_recommendations_feed_the_analytics_charts(client, monkeypatch, tmp_path):
+    from src.analytics import AnalyticsStore
+
+    store = AnalyticsStore(tmp_path / "analytics.db").start()
+    monkeypatch.setitem(app.extensions, "analytics_store", store)
+
+    client.post("/api/recommend", json={**REQUIREMENTS[1], "category": "Food"})
+    client.post("/api/recommend/batch", json=REQUIREMENTS)
+    store.flush()
+
+    rollups = client.get("/api/analytics/rollups?granularity=hour").get_json()["rollups"]
+    assert sum(row["recommendations"] for row in rollups) == 4
+    assert {row["category"] for row in rollups} == {"Food", "General"}
+
+    co2 = client.get("/api/analytics/charts/co2?category=Food").get_json()
+    assert [dataset["label"] for dataset in co2["datasets"]] == ["Food"]
+    assert len(co2["labels"]) == 1 and co2["datasets"][0]["data"][0] >= 0
+    materials = client.get("/api/analytics/charts/materials?top=3").get_json()
+    assert sum(materials["datasets"][0]["data"]) <= 4 and len(materials["labels"]) <= 3
+    assert client.get("/api/analytics/charts/co2?granularity=week").status_code == 400
+
+
+def test_exports_stream_the_event_log(client, monkeypatch, tmp_path):
+    import io
+
+    from openpyxl import load_workbook
+    from src.analytics import AnalyticsStore, recommendation_event
+
+    store = AnalyticsStore(tmp_path / "analytics.db").start()
+    monkeypatch.setitem(app.extensions, "analytics_store", store)
+    for i in range(120):
+        store.record(recommendation_event("recommend", "Food" if i % 2 else "General", "MAT001", 3, 10.0, 2.0, 12.0, 3.0))
+    store.flush()
+
+    # More sequential exports than EXPORT_MAX_CONCURRENT: each slot is released when its download closes
+    for _ in range(3):
+        response = client.get("/api/analytics/export.xlsx?category=Food")
+        assert response.status_code == 200
+        rows = list(load_workbook(io.BytesIO(response.data)).active.values)
+        response.close()
+        assert len(rows) == 61 and rows[0][:3] == ("id", "ts", "source")
+
+    with client.get("/api/analytics/export.pdf") as response:
+        pdf = response.data
+    assert pdf.startswith(b"%PDF-1.4") and pdf.endswith(b"%%EOF\n")
+    assert pdf.count(b"/Type /Page ") == 3
+
+
+def test_identical_requests_are_served_from_the_cache_with_etags(client, monkeypatch):
+    cache = ResponseCache()
+    monkeypatch.setattr(app_module, "response_cache", cache)
+
+    first = client.post("/api/recommend", json={"strength": "5", "weight_capacity_kg": 5.0, "water_resistance": 1})
+    second = client.post("/api/recommend", json=REQUIREMENTS[1])
+    assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1}
+    assert second.data == first.data and second.headers["ETag"] == first.headers["ETag"]
+
+    not_modified = client.post("/api/recommend", json=REQUIREMENTS[1], headers={"If-None-Match": first.headers["ETag"]})
+    assert not_modified.status_code == 304 and not_modified.data == b""
+
+    # Hits record the served material itself, not a row position of the snapshot that computed it
+    events = []
+    monkeypatch.setitem(app.extensions, "analytics_store", SimpleNamespace(record=events.append))
+    client.post("/api/recommend", json=REQUIREMENTS[1])
+    top = first.get_json()["recommendations"][0]
+    assert events[0]["material_id"] == top["material_id"]
+    assert events[0]["predicted_cost"] == pytest.approx(top["predicted_cost"], abs=0.01)
+
+    # A new catalog snapshot (or model) version drops the cached responses
+    monkeypatch.setattr(app_module.catalog_provider, "snapshot", app_module.catalog_provider.snapshot._replace(version="next"))
+    client.post("/api/recommend", json=REQUIREMENTS[1])
+    assert cache.stats()["misses"] == 2
+
+
+def test_concurrent_identical_computations_are_coalesced(tmp_path):
+    import os
+    import threading
+    import time
+
+    from src.request_control import SharedSingleFlight, SingleFlight
+
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return len(calls)
+
+    # Two SharedSingleFlight instances on one directory stand in for two gunicorn workers
+    flights = [SingleFlight(), SharedSingleFlight(tmp_path), SharedSingleFlight(tmp_path)]
+    for group in (flights[:1], flights[1:]):
+        calls.clear()
+        results = []
+        threads = [threading.Thread(target=lambda f=f: results.append(f.do("key", compute))) for f in group * 4]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(calls) == 1
+        assert sorted(results) == [(1, False)] + [(1, True)] * (len(threads) - 1)
+
+    # Each key has its own lock file: a slow key does not hold up another one in a different worker
+    started = threading.Event()
+    slow = threading.Thread(target=flights[1].do, args=("slow", lambda: started.set() or time.sleep(0.5)))
+    slow.start()
+    started.wait()
+    t0 = time.perf_counter()
+    assert flights[2].do("fast-52", lambda: "done") == ("done", False)
+    assert time.perf_counter() - t0 < 0.25
+    slow.join()
+
+    # Idle lock files age out with their results
+    for path in tmp_path.iterdir():
+        os.utime(path, (0, 0))
+    flights[1]._prune()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_export_slots_are_shared_between_workers(tmp_path):
+    from src.request_control import SharedSlots
+
+    # Two instances on one directory stand in for two gunicorn workers
+    workers = [SharedSlots(tmp_path, 2), SharedSlots(tmp_path, 2)]
+    held = [workers[0].try_acquire(), workers[1].try_acquire()]
+    assert None not in held
+    assert workers[0].try_acquire() is None and workers[1].try_acquire() is None
+
+    workers[0].release(held[0])
+    assert workers[1].try_acquire() is not None
+
+
+def test_admission_control_sheds_load_with_429(client, monkeypatch):
+    import time
+
+    from src.request_control import AdmissionController
+
+    admission = AdmissionController(max_in_flight=1, max_wait=0, max_queue_delay=0.5)
+    monkeypatch.setattr(app_module, "admission", admission)
+
+    assert client.post("/api/recommend", json=REQUIREMENTS[1]).status_code == 200
+    queued = {"X-Request-Start": f"t={int((time.time() - 2) * 1000)}"}
+    assert client.post("/api/recommend", json=REQUIREMENTS[1], headers=queued).status_code == 429
+
+    assert admission.try_acquire()  # the only slot is busy
+    shed = client.post("/api/recommend", json=REQUIREMENTS[1])
+    assert shed.status_code == 429 and shed.headers["Retry-After"] == "1"
+    assert client.get("/api/health").status_code == 200
+    admission.release()
+    assert admission.stats() == {"admitted": 2, "rejected": 2}
+
+
+def test_pareto_mode_returns_the_non_dominated_candidates(client):
+    response = client.post("/api/recommend?mode=pareto", json={"weight_capacity_kg": 5}).get_json()
+    front = [(r["sustainability_score"], -r["predicted_cost"], -r["predicted_co2"]) for r in response["recommendations"]]
+
+    assert response["mode"] == "pareto" and response["count"] == len(front) > 0
+    assert all(r["rank_score"] is None for r in response["recommendations"])
+    for a in front:
+        assert not any(all(x >= y for x, y in zip(b, a)) and b != a for b in front)
+
+    ranked = client.post("/api/recommend", json={"weight_capacity_kg": 5, "mode": "rank"}).get_json()
+    assert "mode" not in ranked and ranked["recommendations"][0]["rank_score"] is not None
+    assert client.post("/api/recommend", json={"mode": "best"}).status_code == 400
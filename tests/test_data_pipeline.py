@@ -0,0 +1,187 @@
+import os
+
+import pandas as pd
+import pytest
+
+from src.data_pipeline.cleaning import clean_category_sheet, parse_capacity_kg
+from src.data_pipeline.data_loader import DatasetCache
+from src.data_pipeline.feature_engineering import add_material_features
+from src.data_pipeline.ingest import ingest, ingest_workbook
+from src.data_pipeline.pipeline import Pipeline, RowLocalStage, Stage, build_pipeline
+from src.data_pipeline.storage import list_datasets, read_table, write_table
+from src.data_pipeline.validation import validate_file
+
+
+def test_dataset_cache_hits_until_file_changes(tmp_path):
+    path = tmp_path / "materials.csv"
+    pd.DataFrame({"material_id": ["MAT001"], "weight_capacity_upto": [1]}).to_csv(path, index=False)
+
+    cache = DatasetCache(path, prepare=lambda df: df.assign(weight_capacity_upto=df["weight_capacity_upto"] * 2))
+    first = cache.get()
+    assert cache.get() is first
+    assert first.prepared["weight_capacity_upto"].tolist() == [2]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    pd.DataFrame({"material_id": ["MAT001", "MAT002"], "weight_capacity_upto": [1, 3]}).to_csv(path, index=False)
+    os.utime(path, ns=(first.version[0] + 10**9, first.version[0] + 10**9))
+    assert len(cache.get().data) == 2
+    assert cache.stats()["misses"] == 2
+
+
+def test_dataset_cache_invalidates_on_db_version(tmp_path):
+    path = tmp_path / "materials.csv"
+    pd.DataFrame({"material_id": ["MAT001"]}).to_csv(path, index=False)
+    db_version = {"value": 1}
+
+    cache = DatasetCache(path, version_fn=lambda: db_version["value"])
+    first = cache.get()
+    db_version["value"] = 2
+    assert cache.get() is not first
+
+
+def test_pipeline_reruns_only_stale_stages_and_changed_rows(tmp_path):
+    source = tmp_path / "materials.csv"
+    features = tmp_path / "features.csv"
+    summary = tmp_path / "summary.csv"
+    materials = pd.read_csv("data/processed/cleaned_material_data.csv")
+    materials.to_csv(source, index=False)
+
+    def summarize(inputs, outputs):
+        pd.read_csv(inputs[0]).describe().to_csv(outputs[0])
+
+    pipeline = Pipeline([
+        Stage("summary", [features], [summary], summarize),
+        RowLocalStage("features", source, features, add_material_features),
+    ], base_dir=tmp_path)
+
+    assert pipeline.run() == ["features", "summary"]
+    assert pipeline.run() == []
+
+    materials.loc[3, "cost_per_unit_inr"] = 99
+    materials.to_csv(source, index=False)
+    assert pipeline.run() == ["features", "summary"]
+    assert pipeline.load_state()["features"]["recomputed"] == 1
+
+    full = tmp_path / "full.csv"
+    add_material_features(materials).to_csv(full, index=False)
+    assert features.read_bytes() == full.read_bytes()
+
+
+def test_project_pipeline_only_reads_raw_files_and_stage_outputs(tmp_path):
+    pipeline = build_pipeline(tmp_path)
+    produced = {path for stage in pipeline.stages for path in stage.outputs}
+    for stage in pipeline.stages:
+        for path in stage.inputs:
+            assert path in produced or path.parent == tmp_path / "data" / "raw", (stage.name, path)
+
+
+def test_storage_round_trips_types_across_formats(tmp_path):
+    materials = pd.read_csv("data/processed/cleaned_material_data.csv")
+    # The way water_resistance arrives from a CSV export / the database
+    materials["water_resistance"] = materials["water_resistance"].astype(int).astype(str)
+    write_table(materials, tmp_path / "materials.csv")
+
+    from_csv = read_table(tmp_path / "materials.csv")
+    assert from_csv["water_resistance"].dtype == bool
+    columns = ["material_id", "water_resistance", "co2_emission_score"]
+    assert read_table(tmp_path / "materials.csv", columns=columns).equals(from_csv[columns])
+
+    # Once a newer Parquet copy exists it is what readers (and list_datasets) pick for that dataset
+    write_table(from_csv, tmp_path / "materials.parquet")
+    assert list_datasets(tmp_path) == [tmp_path / "materials.parquet"]
+    assert read_table(tmp_path / "materials.csv").equals(from_csv)
+    assert read_table(tmp_path / "materials.parquet", columns=columns).equals(from_csv[columns])
+
+    # A CSV regenerated afterwards (e.g. by a standalone script) wins over the stale Parquet copy
+    write_table(from_csv.head(3), tmp_path / "materials.csv")
+    parquet_mtime = (tmp_path / "materials.parquet").stat().st_mtime_ns
+    os.utime(tmp_path / "materials.csv", ns=(parquet_mtime + 10**9, parquet_mtime + 10**9))
+    assert list_datasets(tmp_path) == [tmp_path / "materials.csv"]
+    assert len(read_table(tmp_path / "materials.parquet")) == 3
+
+
+def test_capacity_parser_units():
+    parsed = parse_capacity_kg(["5 kg", "500 g", "2 lbs", 3, "1.5kg", "ten kg", "5 oz", None])
+    assert parsed[:5].round(4).tolist() == [5.0, 0.5, 0.9072, 3.0, 1.5]
+    assert parsed[5:].isna().all()
+
+    sheet = pd.DataFrame({"Material_ID": ["MAT001"], "Category": ["Meals"], "Weight_Capacity_Upto": ["5 kilo"]})
+    with pytest.raises(ValueError, match="5 kilo"):
+        clean_category_sheet(sheet)
+
+
+def test_ingest_workbook_partitions_and_quarantines(tmp_path):
+    rows = pd.DataFrame({
+        "Material_ID": ["MAT001", "MAT002", "MAT002", "MAT003", "MAT004"],
+        "Eco Alternative": ["Jute", "Kraft", "Kraft", "Bagasse", None],
+        "Category": ["Meals", "Snack Boxes", "Snack Boxes", "Meals", "Meals"],
+        "Weight_Capacity_Upto": ["2 kg", "500 g", "500 g", "5 stone", "1 lb"],
+    })
+    workbook = tmp_path / "Supplier.xlsx"
+    rows.to_excel(workbook, index=False)
+
+    # chunk_size=2 puts the duplicate row in a different chunk than its first occurrence
+    _, written, quarantined, categories, _ = ingest_workbook(
+        workbook, tmp_path / "out", tmp_path / "quarantine", chunk_size=2
+    )
+    assert (written, quarantined, categories) == (3, 1, ["Meals", "Snack Boxes"])
+
+    out = pd.read_parquet(tmp_path / "out").sort_values("material_id")
+    assert out["material_id"].tolist() == ["MAT001", "MAT002", "MAT004"]
+    assert out["weight_capacity_upto"].round(4).tolist() == [2.0, 0.5, 0.4536]
+    # MAT004's empty cell (alone in its chunk, same Meals file as MAT001) stays null
+    assert out["eco_alternative"].isna().tolist() == [False, False, True]
+    assert (tmp_path / "out" / "category=Snack_Boxes" / "Supplier.parquet").exists()
+
+    rejected = pd.read_csv(tmp_path / "quarantine" / "Supplier.csv")
+    assert rejected["material_id"].tolist() == ["MAT003"]
+
+
+def test_ingest_passes_options_by_name_and_quarantines_sheets_without_category(tmp_path):
+    pd.DataFrame({"Material_ID": ["MAT001"], "Category": ["Meals"], "Weight_Capacity_Upto": ["2 kg"]}).to_excel(
+        tmp_path / "Good.xlsx", index=False)
+    pd.DataFrame({"Material_ID": ["MAT002"], "Weight_Capacity_Upto": ["1 kg"]}).to_excel(
+        tmp_path / "NoCategory.xlsx", index=False)
+
+    # Keywords in a different order than ingest_workbook's parameters
+    results = ingest([tmp_path / "Good.xlsx", tmp_path / "NoCategory.xlsx"], workers=2, chunk_size=100,
+                     quarantine_dir=tmp_path / "quarantine", output_dir=tmp_path / "out")
+    assert [result[1:3] for result in results] == [(1, 0), (0, 1)]
+    assert (tmp_path / "out" / "category=Meals" / "Good.parquet").exists()
+    rejected = pd.read_csv(tmp_path / "quarantine" / "NoCategory.csv")
+    assert rejected["reason"].tolist() == ["missing column(s): category"]
+
+
+def test_validation_quarantines_bad_rows_across_chunks(tmp_path):
+    materials = pd.read_csv("data/processed/cleaned_material_data.csv")
+    materials.loc[2, "cost_per_unit_inr"] = 0
+    materials.loc[5, "strength"] = 12
+    materials.loc[30, "material_id"] = "MAT001"
+    materials.to_csv(tmp_path / "materials.csv", index=False)
+
+    report = validate_file(tmp_path / "materials.csv", tmp_path / "valid.arrow",
+                           tmp_path / "quarantine" / "rejected.csv", chunk_size=8)
+    assert (report["rows"], report["valid"], report["rejected"]) == (35, 32, 3)
+    assert report["reasons"]["cost_per_unit_inr: zero"] == 1
+
+    rejected = pd.read_csv(tmp_path / "quarantine" / "rejected.csv")
+    assert rejected["reason"].tolist() == ["cost_per_unit_inr: zero", "strength: > 10", "material_id: duplicate"]
+    valid = read_table(tmp_path / "valid.arrow")
+    assert valid["material_id"].is_unique and (valid["cost_per_unit_inr"] > 0).all()
+
+
+def test_validation_output_schema_is_stable_across_chunks(tmp_path):
+    materials = pd.read_csv("data/processed/cleaned_material_data.csv")
+    # Chunks infer their own dtypes: integer costs until a fractional one, a column missing at first
+    materials["cost_per_unit_inr"] = materials["cost_per_unit_inr"].astype(object)
+    materials.loc[30, "cost_per_unit_inr"] = 12.5
+    materials["eco_alternative"] = materials["material_type"].where(materials.index >= 10)
+    materials.to_csv(tmp_path / "materials.csv", index=False)
+
+    for suffix in (".parquet", ".arrow"):
+        report = validate_file(tmp_path / "materials.csv", tmp_path / f"valid{suffix}",
+                               tmp_path / "rejected.csv", chunk_size=10)
+        assert report["valid"] == 35
+        valid = read_table(tmp_path / f"valid{suffix}")
+        assert valid["cost_per_unit_inr"].tolist() == materials["cost_per_unit_inr"].tolist()
+        assert valid["eco_alternative"].iloc[10:].tolist() == materials["material_type"].iloc[10:].tolist()
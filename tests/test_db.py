@@ -0,0 +1,114 @@
+import sqlite3
+import time
+
+import pandas as pd
+import pytest
+
+from src.data_pipeline.catalog_provider import CatalogProvider, SQLiteCatalogSource
+from src.models.catalog_filter import CatalogFilterEngine
+
+CATALOG_PATH = "data/feature_engineered_materials.csv"
+
+
+def fake_index(df):
+    # Stands in for PackagingRecommender.index_catalog without loading the models
+    return df.assign(predicted_cost=df["cost_per_unit_inr"] * 1.0, predicted_co2=df["co2_emission_score"] * 1.0)
+
+
+def make_db(path):
+    catalog = pd.read_csv(CATALOG_PATH).head(5).assign(updated_at=1)
+    with sqlite3.connect(path) as conn:
+        catalog.to_sql("material_features", conn, index=False)
+
+
+def test_provider_applies_incremental_updates_to_a_new_snapshot(tmp_path):
+    db_path = tmp_path / "catalog.db"
+    make_db(db_path)
+    indexed_batches = []
+
+    def index_fn(df):
+        indexed_batches.append(len(df))
+        return fake_index(df)
+
+    provider = CatalogProvider(SQLiteCatalogSource(db_path), index_fn, CatalogFilterEngine)
+    assert provider.refresh()
+    first = provider.snapshot
+    assert not provider.refresh()
+
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE material_features SET cost_per_unit_inr = 1, updated_at = 2 WHERE material_id = 'MAT001'")
+
+    assert provider.refresh()
+    second = provider.snapshot
+    assert second is not first and second.version == 2
+    # The rows at the previous version (all five, updated_at = 1) are fetched again along with MAT001
+    assert indexed_batches == [5, 5]
+    assert len(second.catalog_df) == 5
+
+    updated = second.catalog_df.set_index("material_id")
+    assert updated.loc["MAT001", "predicted_cost"] == 1
+    assert first.catalog_df.set_index("material_id").loc["MAT001", "predicted_cost"] == 18
+
+    # A row committed late with the version already seen is picked up by the next refresh
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE material_features SET cost_per_unit_inr = 2, updated_at = 2 WHERE material_id = 'MAT002'")
+        conn.execute("UPDATE material_features SET cost_per_unit_inr = 3, updated_at = 3 WHERE material_id = 'MAT003'")
+
+    assert provider.refresh()
+    third = provider.snapshot.catalog_df
+    assert indexed_batches == [5, 5, 3]
+    assert len(third) == 5 and third["material_id"].is_unique
+    assert third.set_index("material_id")["predicted_cost"][["MAT001", "MAT002", "MAT003"]].tolist() == [1, 2, 3]
+
+
+def test_bulk_loader_builds_upsert_and_append_statements():
+    from database.bulk_loader import TABLES, load_file, merge_sql, table_for_file
+
+    columns, _, key = TABLES["raw.materials_data"]
+    upsert = merge_sql("raw.materials_data", columns, key, "update", touch_column="updated_at")
+    assert "ON CONFLICT (material_id) DO UPDATE SET material_type = EXCLUDED.material_type" in upsert
+    assert upsert.endswith("updated_at = now()")
+
+    columns, _, key = TABLES["raw.product_material_map"]
+    assert "ON CONFLICT" not in merge_sql("raw.product_material_map", columns, key, "update")
+    assert table_for_file("data/processed/cleaned_shopping.csv") == "raw.product_material_map"
+    # Pipeline intermediates without a table of their own are not guessed into one
+    assert table_for_file("data/processed/validated_material_data.parquet") is None
+    assert table_for_file("data/processed/feature_engineered_materials.parquet") == "ml.material_features"
+    with pytest.raises(ValueError, match="no conflict key"):
+        load_file("data/processed/cleaned_shopping.csv", on_conflict="update")
+
+
+def test_analytics_rollups_match_a_rebuild_from_events(tmp_path):
+    from src.analytics import AnalyticsStore, recommendation_event
+
+    store = AnalyticsStore(tmp_path / "analytics.db").start()
+    day = 86400 * 20000
+    for ts, category, material in [(day + 10, "Food", "MAT001"), (day + 3700, "Food", "MAT002"),
+                                   (day + 3800, "Fashion", "MAT001"), (day + 86400, "Food", "MAT001")]:
+        store.record(recommendation_event("recommend", category, material, 4, 10.0, 2.0, 12.0, 3.5, ts=ts))
+    store.flush()
+
+    hourly = store.rollup("hour", category="Food")
+    assert [row["bucket"] for row in hourly] == [day, day + 3600, day + 86400]
+    daily = store.series("co2_avoided", "day")
+    assert daily["buckets"] == [day, day + 86400]
+    assert daily["series"] == {"Fashion": [1.5, 0], "Food": [3.0, 1.5]}
+    assert store.material_usage("day", top=1) == [{"material_id": "MAT001", "recommendations": 3}]
+
+    # An unaligned range widens to whole buckets, end exclusive, in the rollups and the export alike
+    since, until = day + 1800, day + 3600 + 1800
+    rolled_up = sum(row["recommendations"] for row in store.rollup("hour", since, until))
+    assert rolled_up == len(list(store.iter_events(since, until, granularity="hour"))) == 3
+
+    # until=now keeps the current bucket
+    store.record(recommendation_event("recommend", "Food", "MAT003", 4, 10.0, 2.0, 12.0, 3.5))
+    store.flush()
+    now = time.time()
+    assert store.rollup("day", since=now, until=now)[0]["recommendations"] == 1
+    assert [row[4] for row in store.iter_events(since=now - 60, until=now)] == ["MAT003"]
+
+    before = store.rollup("hour") + store.rollup("day")
+    store.rebuild_rollups()
+    assert store.rollup("hour") + store.rollup("day") == before
+    assert store.stats() == {"queued": 0, "written": 5, "dropped": 0}
@@ -0,0 +1,167 @@
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.models.catalog_filter import CatalogFilterEngine
+from src.models.category_index import CategoryIndex
+from src.models.fused_preprocessor import FusedPreprocessor
+from src.models.recommender import PackagingRecommender, top_k_indices
+from src.models.tree_inference import compile_model
+from src.training_runner import run_search
+
+CATALOG_PATH = "data/feature_engineered_materials.csv"
+
+
+def test_filter_engine_matches_dataframe_masks():
+    catalog_df = pd.read_csv(CATALOG_PATH)
+    engine = CatalogFilterEngine(catalog_df)
+
+    for weight, strength, water in [(0, 0, False), (5, 5, True), (15, 0, False), (0, 9, False), (100, 0, False)]:
+        mask = pd.Series(True, index=catalog_df.index)
+        if weight > 0:
+            mask &= catalog_df["weight_capacity_kg"] >= weight
+        if strength > 0:
+            mask &= catalog_df["strength"] >= strength
+        if water:
+            mask &= catalog_df["water_resistance"] >= 1
+
+        rows = engine.query(weight_capacity_kg=weight, strength=strength, water_resistant=water)
+        assert np.array_equal(rows, np.flatnonzero(mask.to_numpy()))
+
+
+def synthetic_catalog(n, seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "material_id": [f"MAT{seed}-{i}" for i in range(n)],
+        "strength": rng.integers(1, 10, n),
+        "weight_capacity_kg": rng.integers(1, 30, n),
+        "water_resistance": rng.random(n) < 0.4,
+        "sustainability_score": rng.integers(0, 100, n).astype(float),
+        "predicted_cost": rng.integers(5, 80, n).astype(float),
+        "predicted_co2": rng.integers(1, 12, n) / 2,
+    })
+
+
+def test_skyline_matches_pairwise_dominance_scan():
+    catalog_df = synthetic_catalog(400, seed=1)
+    engine = CatalogFilterEngine(catalog_df)
+    objectives = np.column_stack([catalog_df["sustainability_score"], -catalog_df["predicted_cost"], -catalog_df["predicted_co2"]])
+
+    for weight, strength, water in [(0, 0, False), (5, 5, True), (15, 0, False), (25, 8, False), (100, 0, False)]:
+        rows = engine.query(weight_capacity_kg=weight, strength=strength, water_resistant=water)
+        expected = [
+            r for r in rows
+            if not any((objectives[q] >= objectives[r]).all() and (objectives[q] > objectives[r]).any() for q in rows)
+        ]
+        front = engine.skyline.query(weight, strength, water)
+        assert sorted(front) == expected
+        assert list(catalog_df["sustainability_score"].to_numpy()[front]) == sorted(catalog_df["sustainability_score"].to_numpy()[front], reverse=True)
+
+
+def test_skyline_is_maintained_incrementally_across_snapshots():
+    catalog_df = synthetic_catalog(400, seed=2)
+    previous = CatalogFilterEngine(catalog_df)
+    previous.skyline
+
+    # CatalogProvider layout: unchanged rows first, updated and inserted rows appended, some rows deleted
+    updated = synthetic_catalog(30, seed=3).assign(material_id=catalog_df["material_id"].iloc[:30].to_numpy())
+    new_df = pd.concat([catalog_df.iloc[40:], updated, synthetic_catalog(20, seed=4)], ignore_index=True)
+    engine = CatalogFilterEngine(new_df, previous=previous)
+
+    assert engine._skyline is not None
+    assert np.array_equal(engine.skyline.rows, CatalogFilterEngine(new_df).skyline.rows)
+
+
+def test_top_k_indices_matches_full_sort():
+    scores = np.random.default_rng(0).random(1000)
+    full = np.argsort(-scores)
+
+    assert np.array_equal(top_k_indices(scores, 10), full[:10])
+    assert np.array_equal(top_k_indices(scores), full)
+    assert top_k_indices(scores, 0).size == 0
+
+
+def test_category_index_matches_dataframe_masks():
+    dataset = pd.read_csv("data/final/ml_dataset.csv")
+    index = CategoryIndex(dataset)
+
+    for category in ["Clothing", "Skincare", "Meals", "Unknown"]:
+        for capacity in [0, 1, 5, 50]:
+            mask = (dataset["category"] == category) & (dataset["weight_capacity_upto"] >= capacity)
+            assert np.array_equal(index.lookup(category, capacity), np.flatnonzero(mask.to_numpy()))
+
+
+def test_recommender_loads_artifacts_lazily_and_warms_up():
+    recommender = PackagingRecommender()
+    assert recommender._artifacts == {}
+
+    recommender.warm_up()
+    assert set(recommender._artifacts) == set(PackagingRecommender.ARTIFACTS)
+
+    catalog = recommender.index_catalog(pd.read_csv(CATALOG_PATH))
+    assert catalog["predicted_cost"].notna().all() and catalog["predicted_co2"].notna().all()
+
+
+@pytest.mark.parametrize("name", ["cost_model", "co2_model", "joint_model"])
+def test_compiled_forest_matches_original_model(name):
+    model = joblib.load(f"models_artifacts/{name}.pkl")
+    compiled = compile_model(model)
+
+    X = np.vstack([np.load("data/final/X_test.npy"), np.load("data/final/X_train.npy")])
+    noise = np.random.default_rng(0).normal(size=(500, X.shape[1]))
+    noise[::7, 3] = np.nan
+    for batch in [X, X[:1], noise]:
+        assert np.array_equal(compiled.predict(batch), model.predict(batch))
+
+
+def test_compiled_and_native_backends_agree():
+    catalog_df = pd.read_csv(CATALOG_PATH)
+    compiled = PackagingRecommender(backend="compiled").index_catalog(catalog_df)
+    native = PackagingRecommender(backend="native").index_catalog(catalog_df)
+
+    assert compiled[["predicted_cost", "predicted_co2"]].equals(native[["predicted_cost", "predicted_co2"]])
+
+
+def test_joint_model_mode_predicts_both_targets_in_one_pass():
+    catalog_df = pd.read_csv(CATALOG_PATH)
+    recommender = PackagingRecommender(model_mode="joint")
+    recommender.warm_up()
+    assert set(recommender._artifacts) == set(PackagingRecommender.JOINT_ARTIFACTS)
+
+    expected = recommender.joint_model.predict(recommender.preprocessor.transform(catalog_df))
+    predicted_cost, predicted_co2 = recommender.predict_metrics(catalog_df)
+    assert np.array_equal(predicted_cost, expected[:, 0]) and np.array_equal(predicted_co2, expected[:, 1])
+
+
+def test_fused_preprocessor_is_byte_identical_to_sklearn():
+    preprocessor = joblib.load("models_artifacts/preprocessor.pkl")
+    fused = FusedPreprocessor.from_column_transformer(preprocessor)
+
+    catalog_df = pd.read_csv(CATALOG_PATH).astype({"strength": float, "water_resistance": object})
+    catalog_df.loc[0, "strength"] = np.nan
+    catalog_df.loc[1, "material_type"] = np.nan
+    catalog_df.loc[2, "material_type"] = "Unknown Material"
+    catalog_df.loc[3, "water_resistance"] = np.nan
+    catalog_df.loc[4, "water_resistance"] = None
+    expected = preprocessor.transform(catalog_df)
+
+    assert fused.transform(catalog_df).tobytes() == expected.tobytes()
+    rows = catalog_df.to_dict(orient="records")
+    assert fused.transform(rows).tobytes() == expected.tobytes()
+    assert fused.transform(rows[5]).tobytes() == expected[5:6].tobytes()
+
+
+def test_training_runner_resumes_from_cached_folds(tmp_path):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(40, 5))
+    targets = {"cost": X[:, 0] * 3 + rng.normal(size=40), "co2": X[:, 1] + rng.normal(size=40)}
+
+    board, counts = run_search(X, targets, folds=3, n_iter=2, n_jobs=2, cache_dir=tmp_path)
+    assert counts == {"fitted": 12, "cached": 0}
+    assert set(board["target"]) == {"cost", "co2"} and (board["folds"] == 3).all()
+    assert board.groupby("target")["RMSE"].apply(lambda rmse: rmse.is_monotonic_increasing).all()
+
+    resumed, counts = run_search(X, targets, folds=3, n_iter=2, n_jobs=2, cache_dir=tmp_path)
+    assert counts == {"fitted": 0, "cached": 12}
+    assert resumed.drop(columns="fit_seconds").equals(board.drop(columns="fit_seconds"))
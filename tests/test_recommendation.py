@@ -1,9 +1,31 @@
 from api.services.recommendation_service import recommend_material
+from benchmarks.api_benchmark import compare, make_category_queries, make_material_catalog
 
 input_data = {
-    "category": "electronics",
-    "weight_capacity_upto": 5
+    "category": "Clothing",
+    "weight_capacity_upto": 1
 }
 
-result = recommend_material(input_data)
-print(result)
+
+def test_recommend_material_ranks_matching_alternatives():
+    result = recommend_material(input_data)
+
+    assert len(result) == 2
+    assert all(row["category"] == "Clothing" for row in result)
+    scores = [row["final_rank_score"] for row in result]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_benchmark_inputs_are_reproducible():
+    assert make_category_queries(20) == make_category_queries(20)
+    catalog = make_material_catalog(500)
+    assert catalog.equals(make_material_catalog(500))
+    assert catalog["material_id"].is_unique and len(catalog) == 500
+
+
+def test_benchmark_baseline_check_flags_regressions():
+    baseline = {"flask_recommend@100": {"p95_ms": 1.0, "throughput_rps": 1000.0}}
+
+    assert compare(baseline, {"flask_recommend@100": {"p95_ms": 1.2, "throughput_rps": 900.0}}, 0.5) == []
+    regressions = compare(baseline, {"flask_recommend@100": {"p95_ms": 2.0, "throughput_rps": 400.0}}, 0.5)
+    assert len(regressions) == 2
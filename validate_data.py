@@ -1,6 +1,36 @@
-import pandas as pd
+"""
+Validates a materials file against the schema in src/data_pipeline/validation.py
+in one streaming pass. Valid rows are written next to the input
+(validated_<name>), rejected rows to data/processed/quarantine/ with reasons.
 
-df = pd.read_csv("data/feature_engineered_materials.csv")
+    python validate_data.py
+    python validate_data.py data/processed/cleaned_material_data.csv --chunk-size 50000
+"""
+import argparse
+import sys
+from pathlib import Path
 
-print(df.isnull().sum())
-print(df.describe())
+BASE_DIR = Path(__file__).resolve().parent
+sys.path.append(str(BASE_DIR / "src"))
+
+from data_pipeline.validation import validate_file
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("path", nargs="?", default="data/feature_engineered_materials.csv")
+parser.add_argument("--output", help="valid rows (default: validated_<name> next to the input)")
+parser.add_argument("--quarantine", help="rejected rows CSV (default: data/processed/quarantine/<name>_rejected.csv)")
+parser.add_argument("--chunk-size", type=int, default=100_000)
+args = parser.parse_args()
+
+path = Path(args.path)
+output = args.output or path.with_name(f"validated_{path.name}")
+quarantine = args.quarantine or BASE_DIR / "data" / "processed" / "quarantine" / f"{path.stem}_rejected.csv"
+
+report = validate_file(path, output, quarantine, chunk_size=args.chunk_size)
+
+print(f"{report['rows']} rows: {report['valid']} valid, {report['rejected']} rejected")
+for reason, count in report["reasons"].items():
+    print(f"{count:>8}  {reason}")
+if report["rejected"]:
+    print(f"Rejected rows written to {quarantine}")
+    sys.exit(1)